@@ -62,14 +62,26 @@ AUTH_USER_MODEL = 'inventory.User'
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.security.SecurityMiddleware',
+    'inventory.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventory.middleware.WriteConcurrencyLimitMiddleware',
+    'inventory.middleware.IdentityMapMiddleware',
+    'inventory.middleware.TenantMiddleware',
+    'inventory.middleware.QueryLogMiddleware',
 ]
 
+# Writes in flight per process before further writes are shed with a 503 (0 disables).
+WRITE_CONCURRENCY_LIMIT = env.int('WRITE_CONCURRENCY_LIMIT', default=32)
+# Seconds a shed client is told to wait before retrying.
+WRITE_RETRY_AFTER = env.int('WRITE_RETRY_AFTER', default=1)
+# Responses smaller than this many bytes are sent uncompressed.
+COMPRESS_MIN_SIZE = env.int('COMPRESS_MIN_SIZE', default=1024)
+
 # CORS_ALLOWED_ORIGINS = [
 #     "http://localhost:3000",
 # ]
@@ -79,14 +91,119 @@ MIDDLEWARE = [
 # ============================================================================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'inventory.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.OrderingFilter',
         'rest_framework.filters.SearchFilter',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'inventory.throttling.UserThrottle',
+        'inventory.throttling.AnonThrottle',
+        'inventory.throttling.WriteThrottle',
+    ),
+    # Token buckets: each rate is the burst size and how fast it refills.
+    'DEFAULT_THROTTLE_RATES': {
+        'user': env('THROTTLE_RATE_USER', default='600/min'),
+        'anon': env('THROTTLE_RATE_ANON', default='60/min'),
+        'write': env('THROTTLE_RATE_WRITE', default='120/min'),
+        'bulk_write': env('THROTTLE_RATE_BULK_WRITE', default='10/min'),
+        'login': env('THROTTLE_RATE_LOGIN', default='10/min'),
+        'register': env('THROTTLE_RATE_REGISTER', default='5/hour'),
+        'password_reset': env('THROTTLE_RATE_PASSWORD_RESET', default='5/hour'),
+    },
+}
+
+# ============================================================================
+#  RETENTION
+# ============================================================================
+# Rows older than `months` are moved out of the hot tables by the
+# apply_retention command, into the archive tables (`table`) or into gzipped
+# JSONL files under RETENTION_ARCHIVE_DIR (`jsonl`).
+RETENTION_POLICIES = {
+    'transactions': {
+        'months': env.int('RETENTION_TRANSACTION_MONTHS', default=24),
+        'target': env('RETENTION_TRANSACTION_TARGET', default='table'),
+    },
+    'audit-logs': {
+        'months': env.int('RETENTION_AUDIT_LOG_MONTHS', default=12),
+        'target': env('RETENTION_AUDIT_LOG_TARGET', default='table'),
+    },
+}
+RETENTION_ARCHIVE_DIR = env('RETENTION_ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
+
+# ============================================================================
+#  JWT AUTHENTICATION
+# ============================================================================
+# Access tokens are trusted without a user lookup when revocations can be
+# kept in a cache deny-list every worker sees (see inventory/authentication.py):
+# with a shared CACHE_URL. With the process-local default each request loads
+# its user from the database instead. STATELESS_JWT forces either behaviour.
+STATELESS_JWT = env.bool('STATELESS_JWT', default=None)
+SIMPLE_JWT = {
+    'TOKEN_REFRESH_SERIALIZER': 'inventory.serializers.RevocableTokenRefreshSerializer',
+}
+
+# ============================================================================
+#  CACHES
+# ============================================================================
+# Point CACHE_URL at a shared cache (e.g. redis://) so throttle buckets are
+# enforced across workers; the throttles fall back to a per-process cache if
+# it is unreachable.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
 }
+THROTTLE_CACHE = 'default'
+
+# ============================================================================
+#  REPORTS
+# ============================================================================
+# Seconds a report result is served from the cache before being recomputed.
+REPORTS_CACHE_TTL = env.int('REPORTS_CACHE_TTL', default=60)
+
+# ============================================================================
+#  SLOW-QUERY LOG
+# ============================================================================
+# Queries at least this slow (ms) are logged with their EXPLAIN plan, for
+# admins at /api/slow-queries/; None turns the log off.
+SLOW_QUERY_MS = env.int('SLOW_QUERY_MS', default=200)
+# Share of slow queries recorded, to bound the cost on a busy server.
+SLOW_QUERY_SAMPLE_RATE = env.float('SLOW_QUERY_SAMPLE_RATE', default=1.0)
+# Distinct query fingerprints kept per process.
+SLOW_QUERY_LOG_SIZE = env.int('SLOW_QUERY_LOG_SIZE', default=50)
+
+# ============================================================================
+#  IDEMPOTENCY KEYS
+# ============================================================================
+# Seconds a stored Idempotency-Key response is replayed before the key can be reused.
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60)
+
+# ============================================================================
+#  LIVE STOCK EVENTS
+# ============================================================================
+# Broker carrying stock events to the /api/events/stock/ streams (served under ASGI only).
+# The local broker reaches the streams of the publishing process; multi-process
+# deployments point this at a pub/sub-backed broker class.
+EVENT_BROKER = env('EVENT_BROKER', default='inventory.events.LocalBroker')
+# Events buffered per open stream before a slow client is told to resync.
+EVENT_QUEUE_SIZE = env.int('EVENT_QUEUE_SIZE', default=100)
+# Seconds between keepalive comments on an idle stream.
+EVENT_KEEPALIVE = env.int('EVENT_KEEPALIVE', default=15)
+
+# ============================================================================
+#  BACKGROUND JOBS
+# ============================================================================
+# Purchase orders with more lines than this are received by a background job (202 + job id).
+JOB_INLINE_LINE_LIMIT = env.int('JOB_INLINE_LINE_LIMIT', default=500)
+# Seconds between queue polls of an idle `runjobs` worker.
+JOB_POLL_INTERVAL = env.float('JOB_POLL_INTERVAL', default=2.0)
+# A running job whose worker has not reported for this many seconds is queued again.
+JOB_STALE_AFTER = env.int('JOB_STALE_AFTER', default=15 * 60)
+# Seconds between heartbeats of a running job; keep well under JOB_STALE_AFTER.
+JOB_HEARTBEAT_INTERVAL = env.int('JOB_HEARTBEAT_INTERVAL', default=60)
+# Seconds between each worker's sweeps for stale jobs.
+JOB_SWEEP_INTERVAL = env.int('JOB_SWEEP_INTERVAL', default=60)
 
 # ============================================================================
 #  URL CONFIGURATION
@@ -0,0 +1,57 @@
+"""
+API-only settings for serverless deployments.
+
+Everything comes from ``backend.settings``; this profile only leaves out
+what a JSON API never uses, so a cold start has fewer apps to load and
+fewer middleware to build: the admin site with its sessions, messages and
+static files, and DRF's browsable API. Select it with
+``DJANGO_SETTINGS_MODULE=backend.settings_api`` (see ``vercel.json``).
+Migrations and the admin keep running under ``backend.settings``.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+# ============================================================================
+#  APPLICATION DEFINITION
+# ============================================================================
+API_EXCLUDED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+
+# ============================================================================
+#  MIDDLEWARE
+# ============================================================================
+# API requests authenticate with JWTs through DRF, so nothing reads a session.
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in (
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+            ],
+        },
+    },
+]
+
+# ============================================================================
+#  REST FRAMEWORK
+# ============================================================================
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',),
+}
@@ -0,0 +1,40 @@
+"""
+Settings for running the test suite.
+
+``manage.py test`` selects this module unless DJANGO_SETTINGS_MODULE says
+otherwise. It keeps the project settings and only swaps what makes tests
+slow or lets parallel test processes (``manage.py test --parallel``) step on
+each other.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# ============================================================================
+#  PASSWORD HASHING
+# ============================================================================
+# Real hashers are deliberately slow; fixtures and login tests don't need that.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# ============================================================================
+#  CACHES
+# ============================================================================
+# Process-local, so parallel test processes never share throttle buckets,
+# report results or revoked tokens through an external cache.
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'inventory-tests'},
+}
+THROTTLE_CACHE = 'default'
+# A test run is one process, so its local cache sees every revocation.
+STATELESS_JWT = True
+
+# ============================================================================
+#  SLOW-QUERY LOG
+# ============================================================================
+# An EXPLAIN for a query that happened to be slow would break query-count
+# assertions; tests that cover the log turn it on themselves.
+SLOW_QUERY_MS = None
+
+# ============================================================================
+#  EMAIL
+# ============================================================================
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -1,28 +1,42 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenRefreshView
+from django_rest_passwordreset.views import ResetPasswordConfirm, ResetPasswordRequestToken, ResetPasswordValidateToken
 from inventory.views import RegisterView, MyTokenObtainPairView
+from inventory.throttling import PasswordResetThrottle
+
+# The password reset views ship with throttling disabled, so they are routed
+# here with the password_reset scope instead of through the package's urls.
+password_reset_urls = ([
+    path('validate_token/', ResetPasswordValidateToken.as_view(throttle_classes=[PasswordResetThrottle]), name='reset-password-validate'),
+    path('confirm/', ResetPasswordConfirm.as_view(throttle_classes=[PasswordResetThrottle]), name='reset-password-confirm'),
+    path('', ResetPasswordRequestToken.as_view(throttle_classes=[PasswordResetThrottle]), name='reset-password-request'),
+], 'password_reset')
 
 # ============================================================================
 #  URL PATTERNS
 # ============================================================================
 urlpatterns = [
     # ============================================================================
-    #  1. Django Admin Panel
-    # ============================================================================
-    path('admin/', admin.site.urls),
-
-    # ============================================================================
-    #  2. User Authentication Endpoints
+    #  1. User Authentication Endpoints
     # ============================================================================
     path('api/register/', RegisterView.as_view(), name='auth_register'),
     path('api/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('api/password_reset/', include('django_rest_passwordreset.urls', namespace='password_reset')),
+    path('api/password_reset/', include(password_reset_urls, namespace='password_reset')),
 
     # ============================================================================
-    #  3. Core Application API Endpoints
+    #  2. Core Application API Endpoints
     # ============================================================================
     # Includes all URLs from the 'inventory' app (Products, Orders, etc.)
     path('api/', include('inventory.urls')),
-]
\ No newline at end of file
+]
+
+# ============================================================================
+#  DJANGO ADMIN PANEL
+# ============================================================================
+# Left out by the API-only settings profile (backend.settings_api).
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
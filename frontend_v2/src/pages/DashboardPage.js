@@ -11,7 +11,7 @@ import {
   Badge,
 } from 'react-bootstrap';
 import { useAuth } from '../context/AuthContext';
-import { getDashboardStats } from '../services/api';
+import { getDashboardStats, subscribeStockEvents } from '../services/api';
 
 function DashboardPage() {
   /* ==========================================================================
@@ -37,6 +37,17 @@ function DashboardPage() {
       }
     };
     fetchStats();
+
+    // Refetch when stock changes instead of polling; bursts collapse into one request.
+    let pending = null;
+    const unsubscribe = subscribeStockEvents(() => {
+      clearTimeout(pending);
+      pending = setTimeout(fetchStats, 1000);
+    });
+    return () => {
+      clearTimeout(pending);
+      unsubscribe();
+    };
   }, []);
 
   /* ==========================================================================
@@ -41,6 +41,8 @@ function ProductsPage() {
     { value: '-name', label: 'Name (Z-A)' },
     { value: '-stock_quantity', label: 'Stock (High-Low)' },
     { value: 'stock_quantity', label: 'Stock (Low-High)' },
+    { value: 'days_of_cover', label: 'Days of Cover (Low-High)' },
+    { value: '-sales_velocity_7d', label: 'Fastest Selling (7 days)' },
   ];
 
   /* ==========================================================================
@@ -76,7 +78,7 @@ function ProductsPage() {
   const handleSave = async (formData) => {
     try {
       if (selectedProduct) {
-        await updateProduct(selectedProduct.id, formData);
+        await updateProduct(selectedProduct.id, formData, selectedProduct.version);
         showToast({ variant: 'success', message: 'Product updated' });
       } else {
         await createProduct(formData);
@@ -85,6 +87,11 @@ function ProductsPage() {
       fetchProducts();
       handleCloseModal();
     } catch (err) {
+      if (err.response?.status === 412) {
+        setError('Someone else changed this product while you were editing. Reload it and try again.');
+        fetchProducts();
+        return;
+      }
       setError(selectedProduct ? 'Failed to update product.' : 'Failed to create product.');
       showToast({ variant: 'danger', message: 'Action failed' });
     }
@@ -190,6 +197,8 @@ function ProductsPage() {
                   <th>SKU</th>
                   <th>Name</th>
                   <th>Stock</th>
+                  <th>Sold / Day</th>
+                  <th>Days of Cover</th>
                   <RoleRequired allowedRoles={['Admin', 'Manager']}>
                     <th className="text-center">Actions</th>
                   </RoleRequired>
@@ -209,6 +218,8 @@ function ProductsPage() {
                           <Badge bg="danger" pill>Out of stock</Badge>
                         )}
                       </td>
+                      <td>{Number(product.sales_velocity_7d)}</td>
+                      <td>{product.days_of_cover ?? '—'}</td>
                       <RoleRequired allowedRoles={['Admin', 'Manager']}>
                         <td className="text-center">
                           <ButtonGroup size="sm">
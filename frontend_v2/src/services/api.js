@@ -2,6 +2,7 @@
    AXIOS INSTANCE & INTERCEPTORS
 ============================================================================ */
 import axios from 'axios';
+import { COLUMNAR_MEDIA_TYPE, decodeColumnarResponse } from './columnar';
 
 const api = axios.create({
   baseURL: process.env.REACT_APP_API_URL,
@@ -72,10 +73,16 @@ export const changePassword = (passwordData) => api.put('/change-password/', pas
 /* ============================================================================
    PRODUCTS
 ============================================================================ */
-export const getProducts = (params) => api.get('/products/', { params });
+// Long lists travel in the columnar format and are decoded back into rows here.
+const getColumnar = (url, params) =>
+  api.get(url, { params, headers: { Accept: COLUMNAR_MEDIA_TYPE } }).then(decodeColumnarResponse);
+
+export const getProducts = (params) => getColumnar('/products/', params);
 export const createProduct = (product) => api.post('/products/', product);
-export const updateProduct = (id, product) => api.put(`/products/${id}/`, product);
-export const patchProduct = (id, productData) => api.patch(`/products/${id}/`, productData);
+// Edits carry the version they were based on; the API answers 412 if the product changed meanwhile.
+const ifMatch = (version) => (version ? { headers: { 'If-Match': `"${version}"` } } : undefined);
+export const updateProduct = (id, product, version) => api.put(`/products/${id}/`, product, ifMatch(version));
+export const patchProduct = (id, productData, version) => api.patch(`/products/${id}/`, productData, ifMatch(version));
 export const deleteProduct = (id) => api.delete(`/products/${id}/`);
 
 /* ============================================================================
@@ -89,14 +96,15 @@ export const deleteSupplier = (id) => api.delete(`/suppliers/${id}/`);
 /* ============================================================================
    PURCHASE ORDERS
 ============================================================================ */
-export const getPurchaseOrders = () => api.get('/purchase-orders/');
+// Order lists return header totals only; the list pages render the lines too.
+export const getPurchaseOrders = (params) => api.get('/purchase-orders/', { params: { expand: 'items', ...params } });
 export const createPurchaseOrder = (orderData) => api.post('/purchase-orders/', orderData);
 export const receivePurchaseOrder = (id) => api.post(`/purchase-orders/${id}/receive/`);
 
 /* ============================================================================
    SALES ORDERS
 ============================================================================ */
-export const getSalesOrders = () => api.get('/sales-orders/');
+export const getSalesOrders = (params) => api.get('/sales-orders/', { params: { expand: 'items', ...params } });
 export const getSalesOrderById = (id) => api.get(`/sales-orders/${id}/`);
 export const createSalesOrder = (orderData) => api.post('/sales-orders/', orderData);
 
@@ -104,8 +112,41 @@ export const createSalesOrder = (orderData) => api.post('/sales-orders/', orderD
    DASHBOARD & REPORTS
 ============================================================================ */
 export const getDashboardStats = () => api.get('/dashboard-stats/');
-export const getTransactions = (params) => api.get('/transactions/', { params });
+export const getTransactions = (params) => getColumnar('/transactions/', params);
 export const getAuditLogs = (params) => api.get('/audit-logs/', { params });
+export const getReport = (name, params) => api.get(`/reports/${name}/`, { params });
+
+/* ============================================================================
+   LIVE STOCK EVENTS
+============================================================================ */
+// Opens the stock event stream and calls onEvent(type, data); returns a function closing it.
+// EventSource can't send headers, so the access token goes in the query string.
+export const subscribeStockEvents = (onEvent) => {
+  let source = null;
+  let retry = null;
+  let closed = false;
+
+  const open = () => {
+    const authTokens = localStorage.getItem('authTokens');
+    if (closed || !authTokens || typeof EventSource === 'undefined') return;
+    const token = encodeURIComponent(JSON.parse(authTokens).access);
+    source = new EventSource(`${process.env.REACT_APP_API_URL}/events/stock/?token=${token}`);
+    ['stock', 'low_stock', 'resync'].forEach((type) =>
+      source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)))
+    );
+    // A refused stream (e.g. an expired token) is not retried by the browser; reopen with the current token.
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) retry = setTimeout(open, 5000);
+    };
+  };
+
+  open();
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    if (source) source.close();
+  };
+};
 
 /* ============================================================================
    EXPORT DEFAULT
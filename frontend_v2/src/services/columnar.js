@@ -0,0 +1,41 @@
+/* ============================================================================
+   COLUMNAR LIST DECODER
+============================================================================ */
+// Large lists can be requested as one array per field instead of one object per row
+// (see inventory/renderers.py): {length, columns: {field: [values] | nestedTable}}.
+// Nested tables have the same shape, plus `nulls`: the rows where the object is null.
+export const COLUMNAR_MEDIA_TYPE = 'application/vnd.inventory.columnar+json';
+
+export const decodeColumnar = (table) => {
+  const { length, columns } = table;
+  const names = Object.keys(columns);
+  const values = names.map((name) => {
+    const column = columns[name];
+    if (Array.isArray(column)) return column;
+    const nulls = new Set(column.nulls || []);
+    const present = decodeColumnar(column);
+    const expanded = new Array(length);
+    for (let i = 0, next = 0; i < length; i += 1) {
+      expanded[i] = nulls.has(i) ? null : present[next++];
+    }
+    return expanded;
+  });
+
+  const rows = new Array(length);
+  for (let i = 0; i < length; i += 1) {
+    const row = {};
+    for (let c = 0; c < names.length; c += 1) row[names[c]] = values[c][i];
+    rows[i] = row;
+  }
+  return rows;
+};
+
+// Decodes a list response (plain or paginated) so callers see the usual rows.
+export const decodeColumnarResponse = (response) => {
+  const { data } = response;
+  if (data && data.columns) return { ...response, data: decodeColumnar(data) };
+  if (data && data.results && data.results.columns) {
+    return { ...response, data: { ...data, results: decodeColumnar(data.results) } };
+  }
+  return response;
+};
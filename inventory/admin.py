@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import (
     User, Product, Supplier, PurchaseOrder, 
-    PurchaseOrderItem, SalesOrder, SalesOrderItem, InventoryTransaction
+    PurchaseOrderItem, SalesOrder, SalesOrderItem, InventoryTransaction,
+    ValuationPeriod, Location, StockLevel, Tenant, Category, Lot
 )
 
 # ============================================================================
@@ -10,16 +11,25 @@ from .models import (
 # ============================================================================
 # Full CRUD for User Management (superuser/admin editable)
 class CustomUserAdmin(UserAdmin):
-    list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'is_staff')
+    list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'tenant', 'is_staff')
+    list_filter = UserAdmin.list_filter + ('tenant',)
     fieldsets = UserAdmin.fieldsets + (
-        ('Role Information', {'fields': ('role',)}),
+        ('Role Information', {'fields': ('role', 'tenant')}),
     )
     add_fieldsets = UserAdmin.add_fieldsets + (
-        ('Role Information', {'fields': ('role',)}),
+        ('Role Information', {'fields': ('role', 'tenant')}),
     )
 
 admin.site.register(User, CustomUserAdmin)
 
+
+# Tenants are created and renamed by operators, so their admin stays editable.
+@admin.register(Tenant)
+class TenantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+
 # ============================================================================
 #  2. READ-ONLY ADMIN BASE CLASS
 # ============================================================================
@@ -64,6 +74,12 @@ class ProductAdmin(ReadOnlyModelAdmin):
     list_display = ('name', 'sku', 'category', 'stock_quantity', 'unit_price')
     search_fields = ('name', 'sku')
 
+@admin.register(Category)
+class CategoryAdmin(ReadOnlyModelAdmin):
+    list_display = ('full_name', 'product_count', 'stock_quantity', 'stock_value')
+    search_fields = ('full_name',)
+    ordering = ('path',)
+
 @admin.register(Supplier)
 class SupplierAdmin(ReadOnlyModelAdmin):
     list_display = ('name', 'email', 'phone')
@@ -81,4 +97,24 @@ class SalesOrderAdmin(ReadOnlyModelAdmin):
 
 @admin.register(InventoryTransaction)
 class InventoryTransactionAdmin(ReadOnlyModelAdmin):
-    list_display = ('timestamp', 'product', 'transaction_type', 'quantity_change', 'user')
\ No newline at end of file
+    list_display = ('timestamp', 'product', 'transaction_type', 'quantity_change', 'user')
+
+@admin.register(ValuationPeriod)
+class ValuationPeriodAdmin(ReadOnlyModelAdmin):
+    list_display = ('period_end', 'method', 'inventory_value', 'cogs', 'closed_by', 'closed_at')
+    list_filter = ('method',)
+
+@admin.register(Location)
+class LocationAdmin(ReadOnlyModelAdmin):
+    list_display = ('code', 'name', 'is_active', 'is_default')
+
+@admin.register(StockLevel)
+class StockLevelAdmin(ReadOnlyModelAdmin):
+    list_display = ('product', 'location', 'quantity')
+    list_filter = ('location',)
+
+@admin.register(Lot)
+class LotAdmin(ReadOnlyModelAdmin):
+    list_display = ('product', 'lot_number', 'expiry_date', 'quantity', 'remaining', 'received_at')
+    search_fields = ('lot_number', 'product__sku')
+    ordering = ('expiry_date',)
@@ -0,0 +1,313 @@
+"""
+Demand analytics for the inventory app.
+
+Computes per-product reorder points and reorder quantities from real sales
+history instead of the hand-typed ``min_stock_level``. The heavy lifting is
+done with NumPy over all products at once; the database is only asked for
+pre-grouped daily totals, which are streamed in chunks.
+
+Sales velocity and days of cover are kept on the product rows by an
+incremental pass that only revisits products with new ledger entries since
+its watermark, or with sales that just left one of the velocity windows.
+
+NumPy is imported by the functions that use it rather than at module load,
+so processes that only serve the API never pay for importing it.
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+from statistics import NormalDist
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Checkpoint, Product, PurchaseOrder, PurchaseOrderItem, InventoryTransaction
+from .tenancy import scoped
+
+# ============================================================================
+#  DEFAULTS
+# ============================================================================
+DEFAULT_HISTORY_DAYS = 730
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_REVIEW_DAYS = 30
+DEFAULT_LEAD_TIME_DAYS = 7.0
+CHUNK_SIZE = 50_000
+WRITE_BATCH_SIZE = 2_000
+VELOCITY_CHECKPOINT = 'sales_velocity'
+# Entries up to this much older than the previous run are read again, for
+# transactions that held a lower id than the watermark but committed after it.
+VELOCITY_LOOKBACK = timedelta(minutes=5)
+
+
+# ============================================================================
+#  CHUNKED LOADERS
+# ============================================================================
+def _iter_chunks(rows, chunk_size):
+    """Yields lists of at most ``chunk_size`` rows from an iterator."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _accumulate(product_ids, rows, chunk_size):
+    """
+    Streams ``(product_id, value)`` rows into per-product sums.
+
+    Returns ``(count, total, total_sq)`` arrays aligned with ``product_ids``
+    (which must be sorted). Rows for unknown products are ignored.
+    """
+    import numpy as np
+
+    n = len(product_ids)
+    count = np.zeros(n)
+    total = np.zeros(n)
+    total_sq = np.zeros(n)
+    if n == 0:
+        return count, total, total_sq
+    for chunk in _iter_chunks(rows, chunk_size):
+        data = np.asarray(chunk, dtype=float).reshape(-1, 2)
+        pids = data[:, 0].astype(np.int64)
+        values = data[:, 1]
+        idx = np.searchsorted(product_ids, pids)
+        idx[idx >= n] = 0
+        known = product_ids[idx] == pids
+        idx, values = idx[known], values[known]
+        count += np.bincount(idx, minlength=n)
+        total += np.bincount(idx, weights=values, minlength=n)
+        total_sq += np.bincount(idx, weights=values * values, minlength=n)
+    return count, total, total_sq
+
+
+def _daily_demand_rows(since, chunk_size):
+    """Per-product, per-day units sold since ``since``, grouped in the database."""
+    return (
+        InventoryTransaction.objects
+        .filter(transaction_type=InventoryTransaction.TransactionType.SALE, timestamp__gte=since)
+        .annotate(day=TruncDate('timestamp'))
+        .order_by()
+        .values('product_id', 'day')
+        .annotate(units=-Sum('quantity_change'))
+        .values_list('product_id', 'units')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _lead_time_rows(since, chunk_size):
+    """Order-to-receipt lead time in days for every received PO line since ``since``."""
+    rows = (
+        PurchaseOrderItem.objects
+        .filter(
+            purchase_order__status=PurchaseOrder.Status.RECEIVED,
+            purchase_order__received_date__isnull=False,
+            purchase_order__order_date__gte=since,
+        )
+        .order_by()
+        .values_list('product_id', 'purchase_order__order_date', 'purchase_order__received_date')
+        .iterator(chunk_size=chunk_size)
+    )
+    for product_id, ordered, received in rows:
+        yield product_id, (received - ordered).total_seconds() / 86400.0
+
+
+def _write_suggestions(product_ids, current, reorder_points, reorder_quantities, now):
+    """
+    Writes changed suggestions back with one UPDATE per distinct value pair.
+
+    Suggestions are small integers shared by many products, so grouping by
+    ``(point, quantity)`` needs far fewer statements than a per-row
+    ``bulk_update``. Unchanged rows are skipped. Returns the number of
+    products whose suggestion changed.
+    """
+    import numpy as np
+
+    suggested = np.column_stack([reorder_points, reorder_quantities])
+    changed = np.any(np.isnan(current) | (current != suggested), axis=1)
+    pairs, groups, counts = np.unique(suggested[changed], axis=0, return_inverse=True, return_counts=True)
+    order = np.argsort(groups.ravel(), kind='stable')
+    id_groups = np.split(product_ids[changed][order], np.cumsum(counts)[:-1])
+    with transaction.atomic():
+        for (point, quantity), ids in zip(pairs.tolist(), id_groups):
+            ids = ids.tolist()
+            for start in range(0, len(ids), WRITE_BATCH_SIZE):
+                Product.objects.filter(pk__in=ids[start:start + WRITE_BATCH_SIZE]).update(
+                    reorder_point=point, reorder_quantity=quantity
+                )
+        scoped(Product.objects.filter(is_active=True)).update(reorder_updated_at=now)
+    return int(changed.sum())
+
+
+# ============================================================================
+#  REORDER POINT ENGINE
+# ============================================================================
+def compute_reorder_points(history_days=DEFAULT_HISTORY_DAYS, service_level=DEFAULT_SERVICE_LEVEL,
+                           review_days=DEFAULT_REVIEW_DAYS, default_lead_time=DEFAULT_LEAD_TIME_DAYS,
+                           chunk_size=CHUNK_SIZE, commit=True):
+    """
+    Computes reorder suggestions for every active product.
+
+    Demand is the mean and standard deviation of daily units sold over the
+    history window (days without sales count as zero). Lead time is taken
+    per product from received purchase orders, falling back to the average
+    over all products and then to ``default_lead_time``. The reorder point
+    covers expected demand over the lead time plus safety stock for the
+    requested service level; the reorder quantity covers ``review_days`` of
+    demand.
+
+    Returns a summary dict. Nothing is written when ``commit`` is False.
+    """
+    import numpy as np
+
+    started = time.monotonic()
+    now = timezone.now()
+    since = now - timedelta(days=history_days)
+
+    current = np.array(
+        list(
+            scoped(Product.objects.filter(is_active=True)).order_by('pk')
+            .values_list('pk', 'reorder_point', 'reorder_quantity')
+            .iterator(chunk_size=chunk_size)
+        ),
+        dtype=float,
+    ).reshape(-1, 3)
+    product_ids = current[:, 0].astype(np.int64)
+
+    # Daily demand statistics, zero-sales days included.
+    _, units, units_sq = _accumulate(product_ids, _daily_demand_rows(since, chunk_size), chunk_size)
+    mean_demand = units / history_days
+    demand_var = np.maximum(units_sq / history_days - mean_demand ** 2, 0.0)
+
+    # Lead time statistics with a global fallback for products never received.
+    lt_count, lt_total, lt_total_sq = _accumulate(product_ids, _lead_time_rows(since, chunk_size), chunk_size)
+    has_lead = lt_count > 0
+    fallback_lead = lt_total[has_lead].sum() / lt_count[has_lead].sum() if has_lead.any() else default_lead_time
+    safe_count = np.where(has_lead, lt_count, 1.0)
+    lead_mean = np.where(has_lead, lt_total / safe_count, fallback_lead)
+    lead_var = np.where(has_lead, np.maximum(lt_total_sq / safe_count - lead_mean ** 2, 0.0), 0.0)
+
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * np.sqrt(lead_mean * demand_var + mean_demand ** 2 * lead_var)
+    reorder_points = np.ceil(mean_demand * lead_mean + safety_stock).astype(np.int64)
+    reorder_quantities = np.ceil(mean_demand * review_days).astype(np.int64)
+
+    changed = 0
+    if commit:
+        changed = _write_suggestions(product_ids, current[:, 1:], reorder_points, reorder_quantities, now)
+
+    return {
+        'products': int(len(product_ids)),
+        'products_with_demand': int(np.count_nonzero(units)),
+        'products_with_lead_time': int(np.count_nonzero(has_lead)),
+        'history_days': history_days,
+        'service_level': service_level,
+        'fallback_lead_time_days': round(float(fallback_lead), 2),
+        'committed': commit,
+        'products_changed': changed,
+        'elapsed_ms': int((time.monotonic() - started) * 1000),
+    }
+
+
+# ============================================================================
+#  SALES VELOCITY
+# ============================================================================
+def _sales():
+    return InventoryTransaction.objects.filter(transaction_type=InventoryTransaction.TransactionType.SALE).order_by()
+
+
+def _products_to_refresh(after_id, high_id, last_run, now):
+    """
+    Products whose velocity or cover may have changed since the last run.
+
+    That is every product with a ledger entry past the watermark (a sale
+    moves its velocity, any movement its cover) and every product with a
+    sale that has since dropped out of the 7- or 30-day window. Entries
+    below the watermark but recorded within ``VELOCITY_LOOKBACK`` of the
+    last run are included too: ids are handed out when a row is inserted,
+    not when it commits, so a transaction still open during the last run
+    can commit rows under its watermark.
+    """
+    moved = (
+        InventoryTransaction.objects.filter(id__gt=after_id, id__lte=high_id)
+        .order_by().values_list('product_id', flat=True).distinct()
+    )
+    late = (
+        InventoryTransaction.objects.filter(id__lte=after_id, timestamp__gte=last_run - VELOCITY_LOOKBACK)
+        .order_by().values_list('product_id', flat=True).distinct()
+    )
+    expired = Q()
+    for days in (7, 30):
+        expired |= Q(timestamp__gte=last_run - timedelta(days=days), timestamp__lt=now - timedelta(days=days))
+    expiring = _sales().filter(expired).values_list('product_id', flat=True).distinct()
+    return set(moved) | set(late) | set(expiring)
+
+
+def _refresh_velocity(product_ids, now):
+    """Recomputes velocity and cover for ``product_ids`` from their last 30 days of sales."""
+    sold = {
+        row['product_id']: row for row in
+        _sales().filter(product_id__in=product_ids, timestamp__gte=now - timedelta(days=30))
+        .values('product_id')
+        .annotate(
+            units_7d=-Sum('quantity_change', filter=Q(timestamp__gte=now - timedelta(days=7))),
+            units_30d=-Sum('quantity_change'),
+        )
+    }
+    products = list(Product.all_objects.filter(pk__in=product_ids).only('pk', 'stock_quantity'))
+    for product in products:
+        row = sold.get(product.pk, {})
+        units_7d, units_30d = row.get('units_7d') or 0, row.get('units_30d') or 0
+        product.sales_velocity_7d = round(Decimal(units_7d) / 7, 2)
+        product.sales_velocity_30d = round(Decimal(units_30d) / 30, 2)
+        product.days_of_cover = round(Decimal(product.stock_quantity * 30) / units_30d, 1) if units_30d > 0 else None
+        product.velocity_updated_at = now
+    Product.all_objects.bulk_update(
+        products, ['sales_velocity_7d', 'sales_velocity_30d', 'days_of_cover', 'velocity_updated_at'],
+        batch_size=WRITE_BATCH_SIZE,
+    )
+    return len(products)
+
+
+def update_sales_velocity(full=False, batch_size=WRITE_BATCH_SIZE):
+    """
+    Brings ``sales_velocity_7d``, ``sales_velocity_30d`` and ``days_of_cover`` up to date.
+
+    The watermark is the last ledger id processed, kept in a Checkpoint. A
+    run only reads the ledger past it plus the sales that aged out of a
+    window since the previous run, so its cost follows recent activity
+    rather than the size of the catalogue. The first run, or ``full``,
+    recomputes every active product. Velocity is per product and the run
+    creates no rows, so it covers every tenant at once under one checkpoint.
+    Entries recorded while a run is going
+    are left past the watermark for the next one, and the next run re-reads
+    a short window before it for late commits (see ``_products_to_refresh``);
+    transactions open for longer than ``VELOCITY_LOOKBACK`` are only caught
+    by a ``full`` run.
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    checkpoint, created = Checkpoint.objects.get_or_create(name=VELOCITY_CHECKPOINT)
+    high_id = InventoryTransaction.objects.aggregate(high=Max('id'))['high'] or 0
+    if full or created:
+        product_ids = set(Product.objects.values_list('pk', flat=True))
+    else:
+        product_ids = _products_to_refresh(checkpoint.position, high_id, checkpoint.updated_at, now)
+
+    product_ids = sorted(product_ids)
+    refreshed = 0
+    for start in range(0, len(product_ids), batch_size):
+        with transaction.atomic():
+            refreshed += _refresh_velocity(product_ids[start:start + batch_size], now)
+    Checkpoint.objects.filter(pk=checkpoint.pk).update(position=high_id, updated_at=now)
+
+    return {
+        'full': full or created,
+        'products_refreshed': refreshed,
+        'watermark': high_id,
+        'elapsed_ms': int((time.monotonic() - started) * 1000),
+    }
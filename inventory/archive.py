@@ -0,0 +1,192 @@
+"""
+Archival of cold rows for the inventory app.
+
+Rows are copied into their archive table and deleted from the hot table in
+small chunks, each in its own transaction, so locks are held only briefly.
+Archive rows keep their original primary keys and are inserted with
+``ignore_conflicts``, so a run interrupted between the copy and the delete
+is simply repeated by the next run.
+
+Retention policies (``RETENTION_POLICIES``) archive the ledger and
+the audit log by age, walking the table in id ranges and recording a
+checkpoint after every range so an interrupted run resumes where it stopped.
+They can write to the archive tables or to gzipped JSONL files instead.
+"""
+
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Min
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from .conf import inventory_settings
+from .models import (
+    Product, InventoryTransaction, PurchaseOrderItem, SalesOrderItem, ProductValuation, AuditLog,
+    ArchivedProduct, ArchivedInventoryTransaction, ArchivedAuditLog, Checkpoint,
+)
+
+CHUNK_SIZE = 1_000
+PRODUCT_COLUMNS = ('id', 'sku', 'name', 'deactivated_at')
+TABLE, JSONL = 'table', 'jsonl'
+
+# Hot model, archive model and the columns copied between them, per policy.
+POLICIES = {
+    'transactions': (
+        InventoryTransaction, ArchivedInventoryTransaction,
+        ('id', 'product_id', 'location_id', 'transaction_type', 'quantity_change', 'timestamp', 'user_id', 'reason'),
+    ),
+    'audit-logs': (
+        AuditLog, ArchivedAuditLog,
+        ('id', 'user_id', 'action', 'timestamp', 'content_type_id', 'object_id', 'object_repr'),
+    ),
+}
+
+
+def _copy_to_table(archive_model, rows):
+    archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+
+
+def _archive_rows(queryset, archive_model, columns, chunk_size):
+    """Moves the rows of ``queryset`` to ``archive_model`` chunk by chunk; returns how many moved."""
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.order_by('pk').values(*columns)[:chunk_size])
+            if not rows:
+                return moved
+            _copy_to_table(archive_model, rows)
+            moved += queryset.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()[0]
+
+
+def _archive_product_rows(products):
+    ArchivedProduct.objects.bulk_create(
+        [
+            ArchivedProduct(
+                **{column: getattr(product, column) for column in PRODUCT_COLUMNS},
+                data=model_to_dict(product, exclude=PRODUCT_COLUMNS),
+            )
+            for product in products
+        ],
+        ignore_conflicts=True,
+    )
+    # Stock levels of an empty product are all zero and go with it.
+    return Product.all_objects.filter(pk__in=[p.pk for p in products]).delete()[1].get(Product._meta.label, 0)
+
+
+# ============================================================================
+#  INACTIVE PRODUCTS
+# ============================================================================
+def archive_inactive_products(inactive_days=365, chunk_size=CHUNK_SIZE, commit=True):
+    """
+    Archives products that have been inactive for more than ``inactive_days``.
+
+    Their ledger entries older than the same cutoff move to the transaction
+    archive. The product row itself moves only once nothing references it
+    any more: no stock, no remaining transactions, no order or valuation
+    lines. Returns a summary dict.
+    """
+    cutoff = timezone.now() - timedelta(days=inactive_days)
+    candidates = Product.all_objects.filter(is_active=False, deactivated_at__lt=cutoff)
+    summary = {'candidates': candidates.count(), 'transactions_archived': 0, 'products_archived': 0}
+    if not commit:
+        summary['transactions_archived'] = InventoryTransaction.objects.filter(
+            product__in=candidates, timestamp__lt=cutoff).count()
+        return summary
+
+    _, archive_model, columns = POLICIES['transactions']
+    last_pk = 0
+    while True:
+        ids = list(candidates.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return summary
+        last_pk = ids[-1]
+        summary['transactions_archived'] += _archive_rows(
+            InventoryTransaction.objects.filter(product_id__in=ids, timestamp__lt=cutoff), archive_model, columns, chunk_size,
+        )
+        with transaction.atomic():
+            referenced = set()
+            for model in (InventoryTransaction, PurchaseOrderItem, SalesOrderItem, ProductValuation):
+                referenced.update(model.objects.filter(product_id__in=ids).values_list('product_id', flat=True).distinct())
+            movable = list(
+                Product.all_objects.select_for_update()
+                .filter(pk__in=ids, is_active=False, stock_quantity=0)
+                .exclude(pk__in=referenced)
+            )
+            if movable:
+                summary['products_archived'] += _archive_product_rows(movable)
+
+
+# ============================================================================
+#  RETENTION POLICIES
+# ============================================================================
+def months_ago(moment, months):
+    """``moment`` moved back by whole calendar months, clamping to the month's last day."""
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    month += 1
+    next_month = moment.replace(year=year + month // 12, month=month % 12 + 1, day=1)
+    last_day = (next_month - timedelta(days=1)).day
+    return moment.replace(year=year, month=month, day=min(moment.day, last_day))
+
+
+def _write_jsonl(path, rows):
+    """Writes ``rows`` to a gzipped JSONL file, atomically replacing any earlier attempt at the same range."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.partial'
+    with gzip.open(partial, 'wt', encoding='utf-8') as archive_file:
+        for row in rows:
+            archive_file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+    os.replace(partial, path)
+
+
+def apply_retention(name, months=None, target=None, chunk_size=CHUNK_SIZE, archive_dir=None,
+                    max_chunks=None, commit=True):
+    """
+    Archives the rows of policy ``name`` older than ``months`` months.
+
+    The table is walked in id ranges of ``chunk_size``; each range is copied
+    and deleted in one short transaction together with the checkpoint, so a
+    run stopped at any point (or after ``max_chunks`` ranges) picks up at the
+    next range. ``target`` is ``'table'`` for the archive table or
+    ``'jsonl'`` for one gzipped file per range under ``archive_dir``.
+    Returns a summary dict.
+    """
+    model, archive_model, columns = POLICIES[name]
+    policy = inventory_settings.RETENTION_POLICIES.get(name, {})
+    months = months if months is not None else policy.get('months', 24)
+    target = target or policy.get('target', TABLE)
+    archive_dir = archive_dir or inventory_settings.RETENTION_ARCHIVE_DIR
+    cutoff = months_ago(timezone.now(), months)
+
+    eligible = model.objects.filter(timestamp__lt=cutoff)
+    bounds = eligible.aggregate(low=Min('pk'), high=Max('pk'))
+    summary = {'policy': name, 'cutoff': cutoff, 'target': target, 'archived': 0, 'chunks': 0}
+    if bounds['high'] is None or not commit:
+        summary['eligible'] = eligible.count()
+        return summary
+
+    checkpoint, _ = Checkpoint.objects.get_or_create(name=f'retention:{name}')
+    low = max(checkpoint.position, bounds['low'] - 1)
+    while low < bounds['high']:
+        if max_chunks is not None and summary['chunks'] >= max_chunks:
+            return summary
+        high = min(low + chunk_size, bounds['high'])
+        with transaction.atomic():
+            rows = list(eligible.filter(pk__gt=low, pk__lte=high).order_by('pk').values(*columns))
+            if rows:
+                if target == JSONL:
+                    _write_jsonl(os.path.join(archive_dir, name, f'{name}-{low + 1:012d}-{high:012d}.jsonl.gz'), rows)
+                else:
+                    _copy_to_table(archive_model, rows)
+                summary['archived'] += model.objects.filter(pk__in=[row['id'] for row in rows]).delete()[0]
+            Checkpoint.objects.filter(pk=checkpoint.pk).update(position=high, updated_at=timezone.now())
+        summary['chunks'] += 1
+        low = high
+
+    # A finished run starts the next one from the oldest remaining row.
+    Checkpoint.objects.filter(pk=checkpoint.pk).update(position=0, updated_at=timezone.now())
+    return summary
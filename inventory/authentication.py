@@ -0,0 +1,149 @@
+"""
+Stateless JWT authentication for the inventory API.
+
+Access tokens already carry the user's id, username, role and tenant,
+which is all the permission classes and tenant scoping look at, so
+requests are authenticated from the token alone. Views that need the real ``User`` (to save it, compare it or
+read another field) get it loaded on first use.
+
+Because the database is no longer consulted, revocation goes through a
+small deny-list in the cache: changing a user's role, password or active
+flag records the time, and tokens issued before it are refused. Entries
+only need to outlive the tokens they cancel, so they expire with the
+refresh token lifetime.
+
+The deny-list only protects every worker when they share the cache. With
+a process-local default cache (the LocMem default) the claims are not
+trusted and each request loads the user from the database as plain
+``JWTAuthentication`` does; ``STATELESS_JWT`` overrides the detection.
+"""
+
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import identity, tenancy
+from .conf import inventory_settings
+from .models import User
+
+CLAIMS = ('username', 'role', 'tenant')
+# When the token was issued, to the microsecond; ``iat`` is whole seconds.
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+# ============================================================================
+#  TOKEN DENY-LIST
+# ============================================================================
+def _deny_key(user_id):
+    return f'jwt-deny:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """Refuses every token issued to ``user_id`` up to now."""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    cache.set(_deny_key(user_id), time.time(), int(lifetime.total_seconds()))
+
+
+def is_revoked(token):
+    revoked_at = cache.get(_deny_key(token[api_settings.USER_ID_CLAIM]))
+    # Compared to the sub-second claim, so a login straight after a revocation isn't caught by it;
+    # older tokens only have ``iat`` and are refused for the whole second.
+    issued_at = token.get(ISSUED_AT_CLAIM, token.get('iat', 0))
+    return revoked_at is not None and issued_at < revoked_at
+
+
+def claims_trusted():
+    """Whether token claims may stand in for the user row: only when every worker sees the deny-list."""
+    if inventory_settings.STATELESS_JWT is not None:
+        return inventory_settings.STATELESS_JWT
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def is_refused(token):
+    """Whether ``token`` is revoked or, when claims aren't trusted, belongs to a user who is no longer active."""
+    if is_revoked(token):
+        return True
+    if claims_trusted():
+        return False
+    return not User.objects.filter(pk=token[api_settings.USER_ID_CLAIM], is_active=True).exists()
+
+
+# ============================================================================
+#  LAZY TOKEN USER
+# ============================================================================
+class TokenUser(SimpleLazyObject):
+    """
+    A ``User`` stand-in answering ``pk``, ``username``, ``role`` and the auth
+    flags from token claims. Any other access loads the user from the database.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        user_id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        super().__init__(lambda: self._load(user_id))
+        self.__dict__['_claims'] = {
+            'pk': user_id, 'username': token['username'], 'role': token['role'], 'tenant_id': token['tenant'],
+        }
+
+    @staticmethod
+    def _load(user_id):
+        user = identity.get(User, user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code='user_not_found')
+        return user
+
+    @property
+    def pk(self):
+        return self.__dict__['_claims']['pk']
+
+    id = pk
+
+    @property
+    def username(self):
+        return self.__dict__['_claims']['username']
+
+    @property
+    def role(self):
+        return self.__dict__['_claims']['role']
+
+    @property
+    def tenant_id(self):
+        return self.__dict__['_claims']['tenant_id']
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return self.username
+
+
+# ============================================================================
+#  AUTHENTICATION CLASS
+# ============================================================================
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token's claims instead of selecting the
+    user row when revocations are shared (see ``claims_trusted``), and scopes
+    the request to the user's tenant.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("Token has been revoked.", code='token_revoked')
+        if not claims_trusted() or any(claim not in validated_token for claim in CLAIMS):
+            # Also tokens minted before the custom claims existed.
+            user = super().get_user(validated_token)
+        else:
+            user = TokenUser(validated_token)
+        tenancy.activate(user.tenant_id)
+        return user
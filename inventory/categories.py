@@ -0,0 +1,152 @@
+"""
+Category tree service for the inventory app.
+
+Categories form a tree stored with materialized paths (see ``Category``).
+Every node carries rollups of the active products in its subtree: how
+many there are, their units on hand and the value of those units. They
+are kept current incrementally:
+
+* stock movements add their deltas to the categories of the moved products
+  and all their ancestors with one UPDATE (``apply_stock_deltas``), and
+* product edits that change a category, price or activity recompute just
+  the affected branches (``refresh_category_totals``).
+
+``resolve`` turns a name like ``"Electronics > Cables"`` into its node,
+creating missing levels, which is how free-text categories are converted.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Concat, Substr
+
+from . import tenancy
+from .models import Category, Product
+
+SEPARATOR = '>'
+# Product fields the rollups depend on.
+ROLLUP_FIELDS = frozenset({'category', 'stock_quantity', 'unit_price', 'is_active'})
+VALUE = DecimalField(max_digits=16, decimal_places=2)
+
+
+def ancestor_ids(path):
+    """The ids on ``path``, root first; the last one is the node itself."""
+    return [int(part) for part in path.split('/') if part]
+
+
+def subtree(category):
+    """``category`` and its descendants, as one range scan on the path index."""
+    return Category.objects.filter(path__startswith=category.path)
+
+
+def split_name(full_name):
+    return [part.strip() for part in full_name.split(SEPARATOR) if part.strip()]
+
+
+def resolve(full_name, tenant_id=None):
+    """The node for ``"Parent > Child"`` in the current tenant (or ``tenant_id``), creating missing levels."""
+    tenant_id = tenancy.current_tenant_id() if tenant_id is None else tenant_id
+    category = None
+    for name in split_name(full_name):
+        category, _ = Category.objects.get_or_create(tenant_id=tenant_id, parent=category, name=name)
+    return category
+
+
+# ============================================================================
+#  TREE EDITS
+# ============================================================================
+@transaction.atomic
+def move(category, parent=None, name=None):
+    """
+    Renames ``category`` and/or moves it under ``parent`` (None for a root).
+
+    Descendant paths are rewritten with one UPDATE and their names in one
+    bulk update; the rollups of the old and new ancestors are recomputed.
+    """
+    if parent is not None and parent.path.startswith(category.path):
+        raise ValueError("A category can't be moved into its own subtree.")
+    old_path, old_name = category.path, category.full_name
+    old_ancestors = ancestor_ids(old_path)[:-1]
+    category.parent = parent
+    category.name = name or category.name
+    category.save()
+
+    Category.objects.filter(path__startswith=old_path).exclude(pk=category.pk).update(
+        path=Concat(Value(category.path), Substr('path', len(old_path) + 1)),
+        depth=F('depth') + (category.depth - old_path.count('/') + 1),
+    )
+    renamed = []
+    for node in subtree(category).exclude(pk=category.pk).only('pk', 'full_name'):
+        node.full_name = category.full_name + node.full_name[len(old_name):]
+        renamed.append(node)
+    Category.objects.bulk_update(renamed, ['full_name'], batch_size=500)
+    refresh_category_totals(old_ancestors + [category.pk])
+
+
+# ============================================================================
+#  ROLLUPS
+# ============================================================================
+def refresh_category_totals(category_ids):
+    """Recomputes the rollups of the given categories and all their ancestors."""
+    paths = list(Category.objects.filter(pk__in=category_ids).values_list('path', flat=True))
+    ids = {pk for path in paths for pk in ancestor_ids(path)}
+    if not ids:
+        return 0
+    # One grouped scan over the subtrees of the affected roots, rolled up to every ancestor here.
+    roots = {path[:9] for path in paths}
+    rows = (
+        Product.objects.filter(Q(*[Q(category__path__startswith=root) for root in roots], _connector=Q.OR))
+        .values('category__path')
+        .annotate(
+            count=Count('pk'),
+            units=Sum('stock_quantity'),
+            value=Sum(F('stock_quantity') * F('unit_price'), output_field=VALUE),
+        )
+        .order_by()
+    )
+    totals = {pk: [0, 0, Decimal(0)] for pk in ids}
+    for row in rows:
+        for pk in ancestor_ids(row['category__path']):
+            if pk in totals:
+                totals[pk][0] += row['count']
+                totals[pk][1] += row['units'] or 0
+                totals[pk][2] += row['value'] or 0
+
+    def column(index, output_field):
+        return Case(*[When(pk=pk, then=Value(values[index])) for pk, values in totals.items()],
+                    output_field=output_field)
+
+    return Category.objects.filter(pk__in=totals).update(
+        product_count=column(0, IntegerField()),
+        stock_quantity=column(1, IntegerField()),
+        stock_value=column(2, VALUE),
+    )
+
+
+def apply_stock_deltas(product_deltas):
+    """Adds unit deltas of products to the rollups of their categories and ancestors, in one UPDATE."""
+    rows = (
+        Product.objects.filter(pk__in=product_deltas, category__isnull=False)
+        .values_list('pk', 'category__path', 'unit_price')
+    )
+    units, value = defaultdict(int), defaultdict(Decimal)
+    for product_id, path, unit_price in rows:
+        delta = product_deltas[product_id]
+        for pk in ancestor_ids(path):
+            units[pk] += delta
+            value[pk] += delta * unit_price
+    if not units:
+        return 0
+    return Category.objects.filter(pk__in=units).update(
+        stock_quantity=F('stock_quantity') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in units.items()], output_field=IntegerField()),
+        stock_value=F('stock_value') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in value.items()], output_field=VALUE),
+    )
+
+
+def rebuild_category_totals():
+    """Recomputes every category's rollups; for imports and repairs."""
+    return refresh_category_totals(list(Category.objects.values_list('pk', flat=True)))
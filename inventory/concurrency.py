@@ -0,0 +1,60 @@
+"""
+Optimistic concurrency for the product and order APIs.
+
+Products and orders carry a ``version`` that every edit bumps (see
+``VersionedModel``). Single-object responses send it as the ``ETag``; an
+update with ``If-Match`` only goes through while the row is still at that
+version, and otherwise answers 412 Precondition Failed so the client can
+reload and retry instead of silently overwriting someone else's change.
+Updates without ``If-Match`` are still checked against the version the
+request itself read.
+"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import VersionConflict
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was read; reload it and try again.'
+    default_code = 'precondition_failed'
+
+
+def etag(version):
+    return f'"{version}"'
+
+
+def if_match_version(request):
+    """The version an ``If-Match`` header asks for; None when absent or ``*``."""
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+    # Compressed responses carry weakened ETags (W/"3"), which clients echo back as they got them.
+    value = header.split(',')[0].strip().removeprefix('W/').strip('"')
+    if not value.isdigit():
+        raise PreconditionFailed()
+    return int(value)
+
+
+# ============================================================================
+#  VIEWS
+# ============================================================================
+class OptimisticConcurrencyMixin:
+    """Serves versions as ETags and turns stale updates into 412 responses."""
+
+    def perform_update(self, serializer):
+        return serializer.save(expected_version=if_match_version(self.request))
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except VersionConflict:
+            raise PreconditionFailed()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.detail and response.status_code == status.HTTP_200_OK and 'version' in (response.data or {}):
+            response['ETag'] = etag(response.data['version'])
+        return response
@@ -0,0 +1,67 @@
+"""
+Settings of the inventory app, with their defaults in one place.
+
+``inventory_settings.NAME`` is ``settings.NAME`` when the project sets it
+and the default below otherwise. Each value is resolved once and kept for
+the life of the process; the snapshot is dropped whenever a setting
+changes, which is what ``override_settings`` does in tests.
+"""
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+DEFAULTS = {
+    # Load shedding and throttling
+    'WRITE_CONCURRENCY_LIMIT': 0,
+    'WRITE_RETRY_AFTER': 1,
+    'THROTTLE_CACHE': 'default',
+    # Authentication; None trusts token claims only with a shared default cache
+    'STATELESS_JWT': None,
+    # Responses
+    'COMPRESS_MIN_SIZE': 1024,
+    # Slow-query log
+    'SLOW_QUERY_MS': 200,
+    'SLOW_QUERY_SAMPLE_RATE': 1.0,
+    'SLOW_QUERY_LOG_SIZE': 50,
+    # Idempotency keys and reports
+    'IDEMPOTENCY_KEY_TTL': 24 * 60 * 60,
+    'REPORTS_CACHE_TTL': 60,
+    # Retention
+    'RETENTION_POLICIES': {},
+    'RETENTION_ARCHIVE_DIR': 'archive',
+    # Live stock events
+    'EVENT_BROKER': 'inventory.events.LocalBroker',
+    'EVENT_QUEUE_SIZE': 100,
+    'EVENT_KEEPALIVE': 15,
+    'CORS_ALLOWED_ORIGINS': [],
+    # Background jobs
+    'JOB_INLINE_LINE_LIMIT': 500,
+    'JOB_POLL_INTERVAL': 2.0,
+    'JOB_STALE_AFTER': 15 * 60,
+    'JOB_HEARTBEAT_INTERVAL': 60,
+    'JOB_SWEEP_INTERVAL': 60,
+}
+
+
+class InventorySettings:
+    """Attribute access to the inventory settings, cached after the first read."""
+    def __getattr__(self, name):
+        if name not in DEFAULTS:
+            raise AttributeError(f"Unknown inventory setting: {name}")
+        value = getattr(settings, name, DEFAULTS[name])
+        setattr(self, name, value)
+        return value
+
+    def reload(self):
+        self.__dict__.clear()
+
+
+inventory_settings = InventorySettings()
+
+
+def _reload_settings(*, setting, **kwargs):
+    if setting in DEFAULTS:
+        inventory_settings.reload()
+
+
+setting_changed.connect(_reload_settings)
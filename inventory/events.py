@@ -0,0 +1,160 @@
+"""
+Live stock events for the inventory app.
+
+The stock service publishes an event for every product whose stock moved,
+once the movement has committed, plus a ``low_stock`` event for products
+that dropped to their minimum level. Events go through a broker to the
+``EventHub`` of each server process, which fans them out to the open
+``/api/events/stock/`` streams (see ``inventory.sse``).
+
+Events carry the tenant of the product they describe and a stream only
+receives its own tenant's events.
+
+Every subscriber has a bounded queue. A client that stops reading doesn't
+hold events in memory: when its queue is full the backlog is dropped and
+it gets a single ``resync`` event telling it to refetch.
+
+``EVENT_BROKER`` picks the broker class. ``LocalBroker`` hands
+events straight to the hub of the publishing process, which is all a
+single-process server needs. Setups with several worker processes plug in
+a broker with the same two methods that also carries events between
+processes over their pub/sub, and feeds what it receives to ``hub.dispatch``.
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import defaultdict
+
+from django.utils.module_loading import import_string
+
+from .conf import inventory_settings
+from .models import Product, StockLevel
+
+STOCK, LOW_STOCK, RESYNC = 'stock', 'low_stock', 'resync'
+
+
+# ============================================================================
+#  HUB
+# ============================================================================
+class Subscription:
+    """One stream's bounded event queue, fed from any thread onto the stream's event loop."""
+    def __init__(self, loop, maxsize, tenant_id=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.tenant_id = tenant_id
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'id': event['id'], 'type': RESYNC, 'tenant': event.get('tenant'), 'data': {}})
+
+
+class EventHub:
+    """Fans events out to the subscriptions of this process."""
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, maxsize=None, loop=None, tenant_id=None):
+        maxsize = maxsize or inventory_settings.EVENT_QUEUE_SIZE
+        subscription = Subscription(loop or asyncio.get_running_loop(), maxsize, tenant_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.tenant_id == event.get('tenant')]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The stream's loop has closed under it.
+                self.unsubscribe(subscription)
+
+
+hub = EventHub()
+
+
+# ============================================================================
+#  BROKERS
+# ============================================================================
+class LocalBroker:
+    """Delivers events to the streams of the publishing process only."""
+    def __init__(self, hub):
+        self.hub = hub
+
+    def has_listeners(self):
+        return self.hub.has_subscribers()
+
+    def publish(self, event):
+        self.hub.dispatch(event)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(inventory_settings.EVENT_BROKER)(hub)
+    return _broker
+
+
+# ============================================================================
+#  PUBLISHING
+# ============================================================================
+def publish(event_type, data, tenant_id=None):
+    get_broker().publish({'id': hub.next_id(), 'type': event_type, 'tenant': tenant_id, 'data': data})
+
+
+def publish_stock_changes(level_keys, decreased=()):
+    """
+    Publishes the current stock of the products moved at the given
+    ``(product_id, location_id)`` pairs; called once the movement commits.
+    Products in ``decreased`` at or below their minimum also get a
+    ``low_stock`` event. Nothing is read when no one is listening.
+    """
+    if not get_broker().has_listeners():
+        return
+    level_keys = set(level_keys)
+    product_ids = {product_id for product_id, _ in level_keys}
+    levels = defaultdict(dict)
+    for product_id, location_id, quantity in StockLevel.objects.filter(
+        product_id__in=product_ids, location_id__in={location_id for _, location_id in level_keys},
+    ).values_list('product_id', 'location_id', 'quantity'):
+        if (product_id, location_id) in level_keys:
+            levels[product_id][location_id] = quantity
+
+    products = Product.all_objects.filter(pk__in=product_ids).order_by('pk').values(
+        'id', 'sku', 'name', 'stock_quantity', 'min_stock_level', 'is_active', 'tenant_id')
+    for product in products:
+        publish(STOCK, {
+            'product': product['id'],
+            'sku': product['sku'],
+            'stock_quantity': product['stock_quantity'],
+            'levels': levels[product['id']],
+        }, product['tenant_id'])
+        if product['id'] in decreased and product['is_active'] and product['stock_quantity'] <= product['min_stock_level']:
+            publish(LOW_STOCK, {
+                'product': product['id'],
+                'sku': product['sku'],
+                'name': product['name'],
+                'stock_quantity': product['stock_quantity'],
+                'min_stock_level': product['min_stock_level'],
+            }, product['tenant_id'])
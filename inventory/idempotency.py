@@ -0,0 +1,105 @@
+"""
+Idempotency-Key support for the inventory API.
+
+A client that retries a request with the same ``Idempotency-Key`` header gets
+the stored response of the first attempt instead of running the action
+again. The key row is inserted in the same transaction as the action's own
+writes, so a duplicate sent while the first request is still running blocks
+on the unique (user, key) index until that request commits, then replays
+its response. A request that fails, whether the action raises or returns a
+4xx or 5xx response, rolls its key back with the rest of its writes and can
+be retried.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .conf import inventory_settings
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def key_ttl():
+    return timedelta(seconds=inventory_settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f'{request.method} {request.path}\n{body}'.encode()).hexdigest()
+
+
+def _replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {'error': f'This {HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+# ============================================================================
+#  VIEW DECORATOR
+# ============================================================================
+def idempotent(view_method):
+    """Makes a viewset action honour the ``Idempotency-Key`` request header."""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        fingerprint = _fingerprint(request)
+
+        # Fast path: a completed key is replayed with one lookup on the unique index.
+        record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if record is not None:
+            if record.created_at >= timezone.now() - key_ttl():
+                return _replay(record, fingerprint)
+            IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=request.user, key=key, method=request.method,
+                        path=request.path[:255], fingerprint=fingerprint,
+                    )
+            except IntegrityError:
+                # A duplicate got in first; the insert waited for it to commit.
+                record = IdempotencyKey.objects.select_for_update().get(user=request.user, key=key)
+                return _replay(record, fingerprint)
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+                return response
+            record.status_code = response.status_code
+            record.response_body = json.loads(JSONRenderer().render(response.data) or 'null')
+            record.save(update_fields=['status_code', 'response_body'])
+        return response
+    return wrapper
+
+
+def purge_expired_keys(chunk_size=5_000):
+    """Deletes keys older than the TTL in pk-ordered chunks; returns how many were removed."""
+    cutoff = timezone.now() - key_ttl()
+    removed = 0
+    while True:
+        pks = list(IdempotencyKey.objects.filter(created_at__lt=cutoff).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return removed
+        removed += IdempotencyKey.objects.filter(pk__in=pks).delete()[0]
@@ -0,0 +1,100 @@
+"""
+Request-scoped identity map for the inventory app.
+
+Inside a scope (every API request through ``IdentityMapMiddleware``, and
+every background job) each Product and User row is loaded at most once.
+Repeated lookups are answered from memory, ``prime`` loads all the ids a
+request refers to with one query before they are validated one by one, and
+``memo`` keeps small per-request results such as the default location or
+the low-stock alert recipients. Outside a scope every call goes to the
+database, as before.
+
+Stock is still written by the stock service, as one set-based UPDATE per
+batch while the stock levels are locked; products whose stock moved are
+evicted so the next lookup reads their new totals.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+
+_current = ContextVar('inventory_identity_map', default=None)
+
+
+class IdentityMap:
+    """Loaded rows by model and primary key, including remembered misses."""
+    def __init__(self):
+        self.rows = defaultdict(dict)
+        self.memos = {}
+
+    def get_many(self, model, pks):
+        rows = self.rows[model]
+        missing = [pk for pk in pks if pk not in rows]
+        if missing:
+            found = model._base_manager.in_bulk(missing)
+            for pk in missing:
+                rows[pk] = found.get(pk)
+        return {pk: rows[pk] for pk in pks if rows[pk] is not None}
+
+
+@contextmanager
+def identity_scope():
+    """Runs the block with a fresh identity map; nested scopes share the outer one."""
+    if _current.get() is not None:
+        yield _current.get()
+        return
+    token = _current.set(IdentityMap())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def _clean_pks(model, values):
+    pks = []
+    for value in values:
+        try:
+            pks.append(model._meta.pk.to_python(value))
+        except (TypeError, ValueError, ValidationError):
+            continue
+    return pks
+
+
+# ============================================================================
+#  LOOKUPS
+# ============================================================================
+def get_many(model, pks):
+    """Maps each existing pk of ``pks`` to its instance, loading the unseen ones with one query."""
+    identity_map = _current.get()
+    if identity_map is None:
+        return model._base_manager.in_bulk(list(pks))
+    return identity_map.get_many(model, list(pks))
+
+
+def get(model, pk):
+    return get_many(model, [pk]).get(pk)
+
+
+def prime(model, values):
+    """Loads the rows behind raw, unvalidated pk ``values`` in one query so later lookups are free."""
+    if _current.get() is not None:
+        get_many(model, set(_clean_pks(model, values)))
+
+
+def evict(model, pks):
+    identity_map = _current.get()
+    if identity_map is not None:
+        for pk in pks:
+            identity_map.rows[model].pop(pk, None)
+
+
+def memo(key, loader):
+    """``loader()``, called once per scope for ``key``."""
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader()
+    if key not in identity_map.memos:
+        identity_map.memos[key] = loader()
+    return identity_map.memos[key]
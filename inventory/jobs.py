@@ -0,0 +1,191 @@
+"""
+Background jobs for the inventory app.
+
+Long operations are queued as ``Job`` rows and run by the ``runjobs``
+command instead of inside the request, so the API can answer 202 with the
+job id straight away and clients follow it at ``/api/jobs/<id>/``.
+
+The queue lives in the database and needs no broker. A worker claims the
+oldest queued job with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it (PostgreSQL, MySQL 8), so concurrent workers never
+wait on each other; the claim itself is a conditional UPDATE, which is
+also what keeps two workers apart on SQLite. Handlers report progress
+with ``report_progress``.
+
+While a handler runs, a heartbeat thread touches the job every
+``JOB_HEARTBEAT_INTERVAL`` seconds, however long the handler goes without
+reporting. Every worker sweeps the queue every ``JOB_SWEEP_INTERVAL``
+seconds and queues running jobs whose heartbeat went stale again, so jobs
+of a crashed worker are picked up by the ones still alive. A job's outcome
+is only recorded by the worker that still holds it, so a run that was
+given up on can't overwrite the result of its retry.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .conf import inventory_settings
+from .identity import identity_scope
+from .models import Job, Location, PurchaseOrder, SalesOrder
+from .querylog import capture
+from .replenishment import generate_purchase_orders
+from .tenancy import tenant_scope
+from .workflow import transition_orders
+
+MAX_ATTEMPTS = 3
+HANDLERS = {}
+ORDER_MODELS = {'purchase': PurchaseOrder, 'sales': SalesOrder}
+
+
+def job(kind):
+    """Registers a handler for jobs of ``kind``; it is called with the job and returns its JSON result."""
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def enqueue(kind, user=None, **params):
+    """Queues a job of ``kind``; ``params`` must be JSON serializable."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, params=params, created_by_id=getattr(user, 'pk', None))
+
+
+def report_progress(job, done, total, message=''):
+    job.progress_done, job.progress_total, job.message = done, total, message
+    Job.objects.filter(pk=job.pk, worker=job.worker).update(
+        progress_done=done, progress_total=total, message=message, heartbeat_at=timezone.now(),
+    )
+
+
+# ============================================================================
+#  WORKER
+# ============================================================================
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next(worker):
+    """Marks the oldest queued job as running for ``worker`` and returns it, or None if the queue is empty."""
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    while True:
+        # Without SKIP LOCKED (SQLite) the read stays outside a transaction, which
+        # could not be upgraded to a write, and the conditional UPDATE alone decides.
+        with transaction.atomic() if skip_locked else nullcontext():
+            queued = Job.objects.filter(status=Job.Status.QUEUED).order_by('id')
+            if skip_locked:
+                queued = queued.select_for_update(skip_locked=True)
+            candidate = queued.only('pk').first()
+            if candidate is None:
+                return None
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=candidate.pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+                attempts=F('attempts') + 1,
+            )
+        # Losing the UPDATE means another worker took it first; try the next one.
+        if claimed:
+            return Job.objects.get(pk=candidate.pk)
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a claimed job's heartbeat fresh for as long as the block runs."""
+    def __init__(self, job):
+        super().__init__(name=f'job-{job.pk}-heartbeat', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(inventory_settings.JOB_HEARTBEAT_INTERVAL):
+                Job.objects.filter(pk=self.job.pk, status=Job.Status.RUNNING, worker=self.job.worker).update(
+                    heartbeat_at=timezone.now())
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job):
+    """Runs a claimed job and records its outcome; returns whether it succeeded."""
+    # Only while this worker still holds it: a job requeued as stale belongs to its next run.
+    held = Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, worker=job.worker)
+    try:
+        handler = HANDLERS[job.kind]
+        with Heartbeat(job), identity_scope(), tenant_scope(job.tenant_id), capture(view=f'job {job.kind}'):
+            result = handler(job)
+    except Exception:
+        held.update(status=Job.Status.FAILED, error=traceback.format_exc(), finished_at=timezone.now())
+        return False
+    return bool(held.update(status=Job.Status.SUCCEEDED, result=result, error='', finished_at=timezone.now()))
+
+
+def requeue_stale_jobs(stale_after=None):
+    """Queues running jobs whose worker stopped reporting again, or fails them after MAX_ATTEMPTS."""
+    stale_after = stale_after if stale_after is not None else inventory_settings.JOB_STALE_AFTER
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING, heartbeat_at__lt=timezone.now() - timedelta(seconds=stale_after),
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=Job.Status.FAILED, error="The worker stopped responding.", finished_at=timezone.now(),
+    )
+    return stale.update(status=Job.Status.QUEUED, worker=''), failed
+
+
+def work(once=False, max_jobs=None, poll_interval=None):
+    """
+    Runs queued jobs until stopped; returns how many ran.
+
+    Stale jobs are requeued on start and every ``JOB_SWEEP_INTERVAL``
+    seconds. With ``once`` the worker exits as soon as the queue is empty.
+    """
+    poll_interval = poll_interval if poll_interval is not None else inventory_settings.JOB_POLL_INTERVAL
+    name, processed, next_sweep = worker_name(), 0, 0
+    while max_jobs is None or processed < max_jobs:
+        if time.monotonic() >= next_sweep:
+            requeue_stale_jobs()
+            next_sweep = time.monotonic() + inventory_settings.JOB_SWEEP_INTERVAL
+        claimed = claim_next(name)
+        if claimed is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(claimed)
+        processed += 1
+    return processed
+
+
+# ============================================================================
+#  HANDLERS
+# ============================================================================
+@job('order_transition')
+def _order_transition(job):
+    params = job.params
+    location = Location.objects.get(pk=params['location']) if params.get('location') else None
+    return transition_orders(
+        ORDER_MODELS[params['model']], params['status'],
+        ids=params.get('ids'), from_status=params.get('from_status'), user=job.created_by, location=location,
+        progress=lambda done, total: report_progress(job, done, total),
+    )
+
+
+@job('auto_replenish')
+def _auto_replenish(job):
+    return generate_purchase_orders(user=job.created_by, commit=job.params.get('commit', True))
@@ -0,0 +1,127 @@
+"""
+Lot and expiry tracking for the inventory app.
+
+Receiving a purchase order turns each of its lines into a ``Lot`` carrying
+the line's lot number and expiry date. Sales draw lots down
+first-expiry-first-out: ``allocate`` locks the open lots of every product
+on the order with one query, walks them in expiry order (lots without an
+expiry go last) and records what it took as ``LotAllocation`` rows, which
+``release`` puts back when the order is cancelled.
+
+Stock written off by a negative adjustment (a cycle count below the books,
+a manual stock edit) is drawn from the lots the same way, earliest expiry
+first, through ``draw_down`` in the stock service, so lots never hold units
+the product no longer has. Units that never came in on a purchase order
+(opening stock, positive adjustments) have no lot and are sold without an
+allocation once a product's lots run out.
+
+Lots are tracked per product only: a lot has no location, so allocation
+draws from a product's lots wherever its stock is held.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from .models import Lot, LotAllocation, PurchaseOrderItem
+from .tenancy import scoped
+
+DEFAULT_EXPIRY_DAYS = 30
+
+
+def _fefo_key(lot):
+    # NULLs sort first on some backends; lots that never expire are used last.
+    return (lot.product_id, lot.expiry_date is None, lot.expiry_date, lot.pk)
+
+
+def _add_remaining(deltas):
+    """Adds per-lot unit deltas to ``remaining`` with one UPDATE."""
+    if deltas:
+        Lot.objects.filter(pk__in=deltas).update(remaining=F('remaining') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()], output_field=IntegerField()))
+
+
+# ============================================================================
+#  RECEIVING AND ALLOCATION
+# ============================================================================
+def receive_lots(order_ids):
+    """Creates a lot for every line of the given purchase orders."""
+    lines = PurchaseOrderItem.objects.filter(purchase_order_id__in=order_ids).values_list(
+        'pk', 'product_id', 'quantity', 'lot_number', 'expiry_date')
+    return Lot.objects.bulk_create([
+        Lot(purchase_order_item_id=pk, product_id=product_id, quantity=quantity, remaining=quantity,
+            lot_number=lot_number, expiry_date=expiry_date)
+        for pk, product_id, quantity, lot_number, expiry_date in lines
+    ])
+
+
+def _take(wanted):
+    """
+    Takes ``wanted`` units per product id from open lots, earliest expiry first.
+
+    The lots are locked with one query and drawn down with one UPDATE; must
+    run inside a transaction. Returns the units taken per lot id.
+    """
+    wanted = dict(wanted)
+    lots = sorted(
+        Lot.objects.select_for_update()
+        .filter(product_id__in=wanted, remaining__gt=0)
+        .order_by('product_id', 'expiry_date', 'pk')
+        .only('pk', 'product_id', 'expiry_date', 'remaining'),
+        key=_fefo_key,
+    )
+    taken = {}
+    for lot in lots:
+        quantity = min(lot.remaining, wanted[lot.product_id])
+        if quantity:
+            wanted[lot.product_id] -= quantity
+            taken[lot.pk] = quantity
+    _add_remaining({pk: -quantity for pk, quantity in taken.items()})
+    return taken
+
+
+def allocate(sales_order, lines):
+    """
+    Takes the units of ``lines`` (``(product_id, quantity)`` pairs) from open lots, earliest expiry first.
+
+    Must run inside the order's transaction. Returns the allocations made.
+    """
+    wanted = defaultdict(int)
+    for product_id, quantity in lines:
+        wanted[product_id] += quantity
+    return LotAllocation.objects.bulk_create([
+        LotAllocation(sales_order=sales_order, lot_id=lot_id, quantity=quantity)
+        for lot_id, quantity in _take(wanted).items()
+    ])
+
+
+def draw_down(product_units):
+    """Removes written-off units (per product id) from open lots, earliest expiry first; nothing puts them back."""
+    return _take(product_units)
+
+
+def release(sales_order_ids):
+    """Puts the lot allocations of cancelled sales orders back on their lots."""
+    allocations = LotAllocation.objects.filter(sales_order_id__in=sales_order_ids)
+    _add_remaining({
+        row['lot_id']: row['units']
+        for row in allocations.values('lot_id').annotate(units=Sum('quantity')).order_by()
+    })
+    allocations.delete()
+
+
+# ============================================================================
+#  REPORTS
+# ============================================================================
+def expiring_lots(days=DEFAULT_EXPIRY_DAYS, **kwargs):
+    """Open lots expiring within ``days`` (expired ones included), soonest first."""
+    today = timezone.localdate()
+    return list(
+        scoped(Lot.objects.all(), 'product__tenant')
+        .filter(remaining__gt=0, expiry_date__lte=today + timedelta(days=days))
+        .values('id', 'lot_number', 'expiry_date', 'remaining', 'product_id',
+                name=F('product__name'), sku=F('product__sku'))
+        .order_by('expiry_date', 'id')
+    )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.archive import CHUNK_SIZE, JSONL, POLICIES, TABLE, apply_retention
+
+
+# ============================================================================
+#  APPLY RETENTION COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Moves inventory transactions and audit logs older than their retention period to the archive "
+        "tables or to gzipped JSONL files. Safe to interrupt; the next run resumes from its checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('policies', nargs='*', help=f"Policies to apply: {', '.join(POLICIES)} (default: all).")
+        parser.add_argument('--months', type=int, help="Override the policy's retention period.")
+        parser.add_argument('--target', choices=[TABLE, JSONL], help="Override the policy's archive target.")
+        parser.add_argument('--archive-dir', help="Directory for JSONL archives (default: RETENTION_ARCHIVE_DIR).")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Ids per chunk.")
+        parser.add_argument('--max-chunks', type=int, help="Stop after this many chunks per policy.")
+        parser.add_argument('--dry-run', action='store_true', help="Count eligible rows without moving anything.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['policies']) - set(POLICIES)
+        if unknown:
+            raise CommandError(f"Unknown retention policies: {', '.join(sorted(unknown))}")
+        for name in options['policies'] or POLICIES:
+            summary = apply_retention(
+                name,
+                months=options['months'],
+                target=options['target'],
+                chunk_size=options['chunk_size'],
+                archive_dir=options['archive_dir'],
+                max_chunks=options['max_chunks'],
+                commit=not options['dry_run'],
+            )
+            self.stdout.write(", ".join(f"{key}: {value}" for key, value in summary.items()))
+        self.stdout.write(self.style.SUCCESS("Retention complete."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from inventory.archive import CHUNK_SIZE, archive_inactive_products
+
+
+# ============================================================================
+#  ARCHIVE PRODUCTS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = "Moves long-inactive products and their old transactions to the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inactive-days', type=int, default=365,
+                            help="Archive products deactivated more than this many days ago.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be archived without moving anything.")
+
+    def handle(self, *args, **options):
+        summary = archive_inactive_products(
+            inactive_days=options['inactive_days'],
+            chunk_size=options['chunk_size'],
+            commit=not options['dry_run'],
+        )
+        for key, value in summary.items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(self.style.SUCCESS("Archive complete."))
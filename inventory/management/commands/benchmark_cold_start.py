@@ -0,0 +1,68 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ('backend.settings_api', 'backend.settings')
+
+# Runs in a fresh interpreter: everything a serverless cold start does before serving its first request.
+CHILD = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ['DJANGO_SETTINGS_MODULE'] = sys.argv[1]
+import backend.asgi
+from django.apps import apps
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'ms': (time.perf_counter() - started) * 1000,
+    'modules': len(sys.modules),
+    'admin': apps.is_installed('django.contrib.admin'),
+    'numpy': 'numpy' in sys.modules,
+}))
+"""
+
+
+# ============================================================================
+#  BENCHMARK COLD START COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Times the cold start of the ASGI app (settings, app loading, URLconf and views) in fresh "
+        "interpreters. With --max-ms it fails when the median goes over budget, as a regression gate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*', default=list(PROFILES), help="Settings modules to time.")
+        parser.add_argument('--runs', type=int, default=5, help="Cold starts per profile; the median is reported.")
+        parser.add_argument('--max-ms', type=float, help="Fail when a profile's median cold start exceeds this.")
+
+    def _cold_start(self, profile):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-c', CHILD, profile], cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        wall = (time.perf_counter() - started) * 1000
+        if completed.returncode:
+            raise CommandError(f"{profile} failed to start:\n{completed.stderr}")
+        return {**json.loads(completed.stdout.strip().splitlines()[-1]), 'wall': wall}
+
+    def handle(self, *args, **options):
+        over_budget = []
+        for profile in options['profiles']:
+            runs = [self._cold_start(profile) for _ in range(options['runs'])]
+            median = statistics.median(run['ms'] for run in runs)
+            self.stdout.write(
+                f"{profile}: median {median:.0f} ms, best {min(run['ms'] for run in runs):.0f} ms, "
+                f"with interpreter {statistics.median(run['wall'] for run in runs):.0f} ms, "
+                f"{runs[0]['modules']} modules, admin installed: {runs[0]['admin']}, numpy loaded: {runs[0]['numpy']}"
+            )
+            if options['max_ms'] is not None and median > options['max_ms']:
+                over_budget.append(f"{profile} ({median:.0f} ms)")
+        if over_budget:
+            raise CommandError(f"Cold start over the {options['max_ms']:.0f} ms budget: {', '.join(over_budget)}")
+        self.stdout.write(self.style.SUCCESS("Cold start benchmark complete."))
@@ -0,0 +1,83 @@
+import gzip
+import json
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from inventory.middleware import BROTLI_QUALITY, brotli
+from inventory.models import Category, InventoryTransaction, Product, User
+from inventory.renderers import ColumnarJSONRenderer, from_columns
+from inventory.serializers import InventoryTransactionSerializer, ProductSerializer
+
+
+# ============================================================================
+#  BENCHMARK PAYLOADS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Compares the product and transaction list payloads as plain and columnar JSON: bytes on the wire "
+        "uncompressed, gzipped and (when Brotli is installed) brotli'd, and the time to parse them back into rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5_000, help="Rows per list.")
+        parser.add_argument('--runs', type=int, default=5, help="Parses per payload; the best is reported.")
+
+    def _lists(self, count):
+        """Serialized synthetic rows, built in memory so the benchmark needs no data."""
+        rng = random.Random(42)
+        now = timezone.now()
+        user = User(pk=1, username='bench', email='bench@example.com', role='Staff')
+        categories = [
+            Category(pk=pk, name=name, full_name=name, path=f'{pk:08d}/')
+            for pk, name in enumerate(['Electronics', 'Hardware', 'Office'], start=1)
+        ]
+        products = [
+            Product(
+                pk=i, name=f'Product {i}', sku=f'BENCH-{i}', category=rng.choice(categories),
+                unit_price=Decimal(rng.randint(100, 50_000)) / 100, stock_quantity=rng.randint(0, 500),
+                sales_velocity_7d=Decimal(rng.randint(0, 900)) / 100, sales_velocity_30d=Decimal(rng.randint(0, 900)) / 100,
+            )
+            for i in range(1, count + 1)
+        ]
+        transactions = [
+            InventoryTransaction(
+                pk=i, product=rng.choice(products), location_id=1, transaction_type='Sale',
+                quantity_change=-rng.randint(1, 10), timestamp=now - timedelta(minutes=i), user=user,
+            )
+            for i in range(1, count + 1)
+        ]
+        return {
+            'products': ProductSerializer(products, many=True).data,
+            'transactions': InventoryTransactionSerializer(transactions, many=True).data,
+        }
+
+    def _best_ms(self, runs, parse):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            parse()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        header = f"{'list':<14}{'format':<10}{'bytes':>12}{'gzip':>10}"
+        header += f"{'brotli':>10}" if brotli else ''
+        self.stdout.write(header + f"{'parse ms':>10}")
+        for name, rows in self._lists(options['rows']).items():
+            for label, renderer, decode in (
+                ('json', JSONRenderer(), lambda data: data),
+                ('columnar', ColumnarJSONRenderer(), from_columns),
+            ):
+                body = renderer.render(rows)
+                line = f"{name:<14}{label:<10}{len(body):>12,}{len(gzip.compress(body, 6)):>10,}"
+                if brotli:
+                    line += f"{len(brotli.compress(body, quality=BROTLI_QUALITY)):>10,}"
+                parse_ms = self._best_ms(options['runs'], lambda: decode(json.loads(body)))
+                self.stdout.write(line + f"{parse_ms:>10.1f}")
+        self.stdout.write(self.style.SUCCESS("Payload benchmark complete."))
@@ -0,0 +1,165 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from inventory.categories import refresh_category_totals, resolve, subtree
+from inventory.models import (
+    Category, Supplier, Product, PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem,
+)
+from inventory.orders import refresh_order_totals
+from inventory.reports import REPORTS, run_report
+
+BENCH_TAG = 'benchmark'
+CATEGORIES = ['Electronics', 'Office Supplies', 'Furniture', 'Hardware', 'Software']
+
+
+# ============================================================================
+#  BENCHMARK REPORTS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Seeds a synthetic order dataset (10M lines by default) and times every report, "
+        "cold and from the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=10_000_000, help="Sales order lines to generate.")
+        parser.add_argument('--lines-per-order', type=int, default=5)
+        parser.add_argument('--products', type=int, default=10_000)
+        parser.add_argument('--suppliers', type=int, default=100)
+        parser.add_argument('--days', type=int, default=730, help="Spread orders over this many days.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--runs', type=int, default=3, help="Cold runs per report; the best is reported.")
+        parser.add_argument('--skip-seed', action='store_true', help="Reuse a previously seeded dataset.")
+        parser.add_argument('--cleanup', action='store_true', help="Delete the benchmark dataset and exit.")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            self._cleanup()
+            return
+        if not options['skip_seed']:
+            self._seed(options)
+        self._run(options['runs'])
+
+    # ------------------------------------------------------------------------
+    #  Seeding
+    # ------------------------------------------------------------------------
+    def _next_id(self, model):
+        return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+    def _spread_dates(self, model, first_id, count, field, days):
+        """Backdates rows evenly over ``days`` with one UPDATE per day (auto_now_add ignores given values)."""
+        now = timezone.now()
+        per_day = max(count // days, 1)
+        for day, start in enumerate(range(first_id, first_id + count, per_day)):
+            model.objects.filter(pk__gte=start, pk__lt=start + per_day).update(**{field: now - timedelta(days=day % days)})
+
+    def _seed(self, options):
+        rng = random.Random(42)
+        batch = options['batch_size']
+        started = time.monotonic()
+
+        supplier_id = self._next_id(Supplier)
+        suppliers = [
+            Supplier(pk=supplier_id + i, name=f'{BENCH_TAG} supplier {i}', email=f'{BENCH_TAG}-{supplier_id + i}@example.com', phone='0')
+            for i in range(options['suppliers'])
+        ]
+        Supplier.objects.bulk_create(suppliers, batch_size=batch)
+
+        # Under their own root so cleanup never touches real categories.
+        categories = [resolve(f'{BENCH_TAG} > {name}') for name in CATEGORIES]
+        product_id = self._next_id(Product)
+        products = [
+            Product(
+                pk=product_id + i, name=f'{BENCH_TAG} product {i}', sku=f'BENCH-{product_id + i}',
+                category=rng.choice(categories), unit_price=Decimal(rng.randint(100, 50_000)) / 100,
+                supplier_id=rng.choice(suppliers).pk,
+            )
+            for i in range(options['products'])
+        ]
+        Product.objects.bulk_create(products, batch_size=batch)
+        refresh_category_totals([c.pk for c in categories])
+        product_ids = [p.pk for p in products]
+
+        per_order = options['lines_per_order']
+        orders = max(options['lines'] // per_order, 1)
+        order_id = self._next_id(SalesOrder)
+        statuses = [SalesOrder.Status.FULFILLED] * 8 + [SalesOrder.Status.PENDING, SalesOrder.Status.CANCELLED]
+        for start in range(0, orders, batch):
+            count = min(batch, orders - start)
+            with transaction.atomic():
+                SalesOrder.objects.bulk_create([
+                    SalesOrder(pk=order_id + start + i, customer_name=BENCH_TAG, status=rng.choice(statuses))
+                    for i in range(count)
+                ])
+                SalesOrderItem.objects.bulk_create([
+                    SalesOrderItem(
+                        sales_order_id=order_id + start + i, product_id=rng.choice(product_ids),
+                        quantity=rng.randint(1, 10), unit_price=Decimal(rng.randint(100, 50_000)) / 100,
+                    )
+                    for i in range(count) for _ in range(per_order)
+                ])
+                refresh_order_totals(SalesOrder, range(order_id + start, order_id + start + count))
+            self.stdout.write(f"  sales lines: {(start + count) * per_order:,}", ending='\r')
+        self.stdout.write('')
+        self._spread_dates(SalesOrder, order_id, orders, 'order_date', options['days'])
+
+        purchase_orders = max(orders // 10, 1)
+        po_id = self._next_id(PurchaseOrder)
+        po_statuses = [PurchaseOrder.Status.RECEIVED] * 7 + [PurchaseOrder.Status.PENDING, PurchaseOrder.Status.SHIPPED]
+        for start in range(0, purchase_orders, batch):
+            count = min(batch, purchase_orders - start)
+            with transaction.atomic():
+                PurchaseOrder.objects.bulk_create([
+                    PurchaseOrder(pk=po_id + start + i, supplier_id=rng.choice(suppliers).pk, status=rng.choice(po_statuses))
+                    for i in range(count)
+                ])
+                PurchaseOrderItem.objects.bulk_create([
+                    PurchaseOrderItem(
+                        purchase_order_id=po_id + start + i, product_id=rng.choice(product_ids),
+                        quantity=rng.randint(10, 100), unit_price=Decimal(rng.randint(50, 30_000)) / 100,
+                    )
+                    for i in range(count) for _ in range(per_order)
+                ])
+                refresh_order_totals(PurchaseOrder, range(po_id + start, po_id + start + count))
+        self._spread_dates(PurchaseOrder, po_id, purchase_orders, 'order_date', options['days'])
+        self.stdout.write(f"Seeded {orders * per_order:,} sales lines in {time.monotonic() - started:.1f}s")
+
+    def _cleanup(self):
+        SalesOrderItem.objects.filter(sales_order__customer_name=BENCH_TAG).delete()
+        SalesOrder.objects.filter(customer_name=BENCH_TAG).delete()
+        PurchaseOrderItem.objects.filter(product__sku__startswith='BENCH-').delete()
+        PurchaseOrder.objects.filter(supplier__name__startswith=BENCH_TAG, items__isnull=True).delete()
+        Product.all_objects.filter(sku__startswith='BENCH-').delete()
+        Supplier.objects.filter(name__startswith=BENCH_TAG, purchase_orders__isnull=True).delete()
+        root = Category.objects.filter(parent__isnull=True, name=BENCH_TAG).first()
+        if root:
+            for depth in sorted(set(subtree(root).values_list('depth', flat=True)), reverse=True):
+                subtree(root).filter(depth=depth).delete()
+        self.stdout.write(self.style.SUCCESS("Benchmark dataset removed."))
+
+    # ------------------------------------------------------------------------
+    #  Timing
+    # ------------------------------------------------------------------------
+    def _run(self, runs):
+        last_90_days = {'start': timezone.localdate() - timedelta(days=90), 'end': timezone.localdate()}
+        self.stdout.write(f"{'report':<22}{'range':<10}{'cold ms':>10}{'cached ms':>12}")
+        for name in REPORTS:
+            for label, params in (('all', {}), ('90 days', last_90_days)):
+                cold = []
+                for _ in range(runs):
+                    cache.clear()
+                    started = time.perf_counter()
+                    run_report(name, **params)
+                    cold.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                run_report(name, **params)
+                cached = (time.perf_counter() - started) * 1000
+                self.stdout.write(f"{name:<22}{label:<10}{min(cold):>10.1f}{cached:>12.2f}")
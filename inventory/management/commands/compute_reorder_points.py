@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.analytics import (
+    compute_reorder_points, DEFAULT_HISTORY_DAYS, DEFAULT_SERVICE_LEVEL,
+    DEFAULT_REVIEW_DAYS, DEFAULT_LEAD_TIME_DAYS, CHUNK_SIZE,
+)
+from inventory.tenancy import each_tenant
+
+
+# ============================================================================
+#  COMPUTE REORDER POINTS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = "Computes suggested reorder points and quantities for all active products from sales history, per tenant."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-days', type=int, default=DEFAULT_HISTORY_DAYS)
+        parser.add_argument('--service-level', type=float, default=DEFAULT_SERVICE_LEVEL)
+        parser.add_argument('--review-days', type=int, default=DEFAULT_REVIEW_DAYS)
+        parser.add_argument('--default-lead-time', type=float, default=DEFAULT_LEAD_TIME_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Compute without writing suggestions back.")
+        parser.add_argument('--tenant', help="Slug of the only tenant to run for (default: every tenant and the untenanted rows).")
+
+    def handle(self, *args, **options):
+        try:
+            for tenant in each_tenant(options['tenant']):
+                # Lead-time fallbacks are averaged within the tenant, not across customers.
+                summary = compute_reorder_points(
+                    history_days=options['history_days'],
+                    service_level=options['service_level'],
+                    review_days=options['review_days'],
+                    default_lead_time=options['default_lead_time'],
+                    chunk_size=options['chunk_size'],
+                    commit=not options['dry_run'],
+                )
+                self.stdout.write(self.style.MIGRATE_HEADING(tenant.name if tenant else "Untenanted"))
+                for key, value in summary.items():
+                    self.stdout.write(f"{key}: {value}")
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS("Reorder points computed."))
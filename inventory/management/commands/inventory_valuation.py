@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory.models import ValuationPeriod
+from inventory.tenancy import each_tenant
+from inventory.utils import end_of_day
+from inventory.valuation import valuation_report, close_period
+
+
+# ============================================================================
+#  INVENTORY VALUATION COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = "Reports each tenant's on-hand inventory value and COGS, optionally closing the period."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--method', choices=ValuationPeriod.Method.values, default=ValuationPeriod.Method.FIFO)
+        parser.add_argument('--as-of', type=date.fromisoformat, help="Value inventory at the end of this day (YYYY-MM-DD).")
+        parser.add_argument('--close', action='store_true', help="Persist the results as a closed period ending on --as-of.")
+        parser.add_argument('--tenant', help="Slug of the only tenant to run for (default: every tenant and the untenanted rows).")
+
+    def handle(self, *args, **options):
+        method = options['method']
+        as_of = end_of_day(options['as_of']) if options['as_of'] else timezone.now()
+        if options['close'] and not options['as_of']:
+            raise CommandError("--close requires --as-of.")
+        try:
+            for tenant in each_tenant(options['tenant']):
+                self.stdout.write(self.style.MIGRATE_HEADING(tenant.name if tenant else "Untenanted"))
+                if options['close']:
+                    period = close_period(as_of, method)
+                    self.stdout.write(f"Closed {period}: value {period.inventory_value}, COGS {period.cogs}")
+                    continue
+                report = valuation_report(as_of, method)
+                for key, value in report.items():
+                    self.stdout.write(f"{key}: {value}")
+        except ValueError as exc:
+            raise CommandError(str(exc))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from inventory.idempotency import purge_expired_keys
+
+
+# ============================================================================
+#  PURGE IDEMPOTENCY KEYS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = "Deletes stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        removed = purge_expired_keys(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired idempotency keys."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.replenishment import generate_purchase_orders
+from inventory.tenancy import each_tenant
+
+
+# ============================================================================
+#  REPLENISH STOCK COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = "Creates draft purchase orders for every low-stock product, grouped by supplier, for each tenant."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report the plan without creating any orders.")
+        parser.add_argument('--tenant', help="Slug of the only tenant to run for (default: every tenant and the untenanted rows).")
+
+    def handle(self, *args, **options):
+        try:
+            for tenant in each_tenant(options['tenant']):
+                summary = generate_purchase_orders(commit=not options['dry_run'])
+                self.stdout.write(self.style.MIGRATE_HEADING(tenant.name if tenant else "Untenanted"))
+                for key, value in summary.items():
+                    self.stdout.write(f"{key}: {value}")
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS("Replenishment complete."))
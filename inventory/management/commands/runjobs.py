@@ -0,0 +1,36 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from inventory.jobs import work
+
+
+# ============================================================================
+#  RUN JOBS COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs. Each worker process claims jobs from the database on its own, "
+        "so several instances of this command can run side by side, and each requeues the jobs of workers that died."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Worker processes to run.")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty.")
+        parser.add_argument('--max-jobs', type=int, help="Exit after each worker has run this many jobs.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds between polls of an empty queue.")
+
+    def handle(self, *args, **options):
+        kwargs = {'once': options['once'], 'max_jobs': options['max_jobs'], 'poll_interval': options['poll_interval']}
+
+        if options['workers'] <= 1:
+            processed = work(**kwargs)
+        else:
+            # Worker processes open their own connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+                futures = [pool.submit(work, **kwargs) for _ in range(options['workers'])]
+                processed = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} jobs."))
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from inventory.models import User
+from inventory.querylog import slow_query_log
+
+DEFAULT_PATHS = [
+    '/api/dashboard-stats/',
+    '/api/products/',
+    '/api/purchase-orders/',
+    '/api/sales-orders/',
+    '/api/transactions/',
+    '/api/stock-levels/',
+]
+
+
+# ============================================================================
+#  SLOW QUERIES COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Requests API endpoints in-process as the given user and prints the slowest queries they ran, "
+        "with the views and serializers that issued them and their EXPLAIN plans. "
+        "Point it at a copy of production data to find the queries worth an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f"API paths to request (default: {' '.join(DEFAULT_PATHS)}).")
+        parser.add_argument('--user', required=True, help="Username to request the endpoints as.")
+        parser.add_argument('--threshold', type=float, default=0, help="Log queries at least this slow (ms).")
+        parser.add_argument('--runs', type=int, default=1, help="Requests per path.")
+        parser.add_argument('--limit', type=int, default=10, help="Queries to print.")
+        parser.add_argument('--explain', action='store_true', help="Print the EXPLAIN plan of every query.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user named {options['user']!r}.")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        slow_query_log.clear()
+        # The test client's requests come from 'testserver'.
+        capture_settings = override_settings(
+            SLOW_QUERY_MS=options['threshold'], SLOW_QUERY_SAMPLE_RATE=1.0,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        with capture_settings:
+            for path in options['paths'] or DEFAULT_PATHS:
+                for _ in range(options['runs']):
+                    status = client.get(path).status_code
+                if status != 200:
+                    self.stderr.write(f"{path} answered {status}.")
+
+        for rank, entry in enumerate(slow_query_log.top(options['limit']), start=1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {entry['total_ms']:.1f} ms total, {entry['count']} calls, "
+                f"{entry['avg_ms']:.1f} ms avg, {entry['max_ms']:.1f} ms max"
+            ))
+            self.stdout.write(f"   views: {', '.join(entry['views']) or '-'}")
+            self.stdout.write(f"   serializers: {', '.join(entry['serializers']) or '-'}")
+            self.stdout.write(f"   {entry['fingerprint']}")
+            if options['explain'] and entry['explain']:
+                for line in entry['explain'].splitlines():
+                    self.stdout.write(f"     {line}")
+        self.stdout.write(self.style.SUCCESS("Slow-query capture complete."))
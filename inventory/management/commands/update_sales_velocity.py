@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from inventory.analytics import update_sales_velocity, WRITE_BATCH_SIZE
+
+
+# ============================================================================
+#  UPDATE SALES VELOCITY COMMAND
+# ============================================================================
+class Command(BaseCommand):
+    help = (
+        "Updates each product's 7- and 30-day sales velocity and days of cover, revisiting only products "
+        "with ledger entries since the last run or sales that just left a window. Run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every active product.")
+        parser.add_argument('--batch-size', type=int, default=WRITE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        summary = update_sales_velocity(full=options['full'], batch_size=options['batch_size'])
+        for key, value in summary.items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(self.style.SUCCESS("Sales velocity updated."))
@@ -0,0 +1,140 @@
+import re
+import threading
+
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from .conf import inventory_settings
+from .identity import identity_scope
+from .querylog import capture
+from .tenancy import tenant_scope
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available.
+    brotli = None
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Brotli's default quality (11) is meant for static assets; 5 compresses about as well as gzip -9, faster.
+BROTLI_QUALITY = 5
+ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+# ============================================================================
+#  WRITE CONCURRENCY LIMITER
+# ============================================================================
+class WriteConcurrencyLimitMiddleware:
+    """
+    Sheds write requests once too many are already running in this process.
+
+    Reads are never limited. When ``WRITE_CONCURRENCY_LIMIT`` writes are in
+    flight, further writes get an immediate 503 with a ``Retry-After`` header
+    instead of queueing behind the database.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limit = inventory_settings.WRITE_CONCURRENCY_LIMIT
+        self.retry_after = inventory_settings.WRITE_RETRY_AFTER
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        if not self.limit or request.method in SAFE_METHODS:
+            return self.get_response(request)
+        with self.lock:
+            if self.in_flight >= self.limit:
+                return self._overloaded()
+            self.in_flight += 1
+        try:
+            return self.get_response(request)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _overloaded(self):
+        response = JsonResponse({'detail': 'The server is busy, please retry shortly.'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+
+# ============================================================================
+#  IDENTITY MAP
+# ============================================================================
+class IdentityMapMiddleware:
+    """Gives every request its own identity map (see ``inventory.identity``)."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_scope():
+            return self.get_response(request)
+
+
+# ============================================================================
+#  TENANCY
+# ============================================================================
+class TenantMiddleware:
+    """Opens a tenant scope per request; token authentication sets its tenant (see ``inventory.tenancy``)."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with tenant_scope():
+            return self.get_response(request)
+
+
+# ============================================================================
+#  SLOW-QUERY LOG
+# ============================================================================
+class QueryLogMiddleware:
+    """Records the request's slow queries in the slow-query log (see ``inventory.querylog``)."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with capture(view=request.path):
+            return self.get_response(request)
+
+
+# ============================================================================
+#  RESPONSE COMPRESSION
+# ============================================================================
+class CompressionMiddleware:
+    """
+    Compresses responses with Brotli or gzip, whichever the client accepts (Brotli first).
+
+    Streaming responses are left alone so they keep flowing as they are
+    produced, and so are bodies under ``COMPRESS_MIN_SIZE`` bytes, which
+    would barely shrink. A body is only replaced when compressing made it
+    smaller.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = inventory_settings.COMPRESS_MIN_SIZE
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding') or len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and ACCEPTS_BROTLI.search(accept_encoding):
+            encoding, compressed = 'br', brotli.compress(response.content, quality=BROTLI_QUALITY)
+        elif ACCEPTS_GZIP.search(accept_encoding):
+            encoding, compressed = 'gzip', compress_string(response.content)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The encoded bytes differ from what a strong ETag promised (as in Django's GZipMiddleware).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
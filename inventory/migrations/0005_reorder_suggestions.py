@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_auditlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reorder_point',
+            field=models.PositiveIntegerField(blank=True, help_text='Suggested reorder point computed from sales history.', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_quantity',
+            field=models.PositiveIntegerField(blank=True, help_text='Suggested reorder quantity computed from sales history.', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_updated_at',
+            field=models.DateTimeField(blank=True, help_text='When the reorder suggestion was last computed.', null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='received_date',
+            field=models.DateTimeField(blank=True, help_text='When the order was received into stock.', null=True),
+        ),
+    ]
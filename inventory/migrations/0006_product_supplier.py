@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_reorder_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='supplier',
+            field=models.ForeignKey(blank=True, help_text='The preferred supplier used for automatic replenishment.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='inventory.supplier'),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='status',
+            field=models.CharField(choices=[('Draft', 'Draft'), ('Pending', 'Pending'), ('Shipped', 'Shipped'), ('Received', 'Received')], default='Pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'stock_quantity', 'min_stock_level', 'supplier'], name='product_low_stock_idx'),
+        ),
+    ]
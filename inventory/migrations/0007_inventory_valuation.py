@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_product_supplier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValuationPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('FIFO', 'FIFO'), ('AVERAGE', 'Weighted Average')], max_length=10)),
+                ('period_end', models.DateTimeField(help_text='Movements up to and including this instant belong to the period.')),
+                ('closed_at', models.DateTimeField(auto_now_add=True)),
+                ('quantity', models.IntegerField(default=0, help_text='Units on hand at period end.')),
+                ('inventory_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cogs', models.DecimalField(decimal_places=2, default=0, help_text='Cost of goods sold within the period.', max_digits=16)),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Valuation Period',
+                'verbose_name_plural': 'Valuation Periods',
+                'ordering': ['-period_end'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cogs', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('uncosted_quantity', models.PositiveIntegerField(default=0, help_text='Units sold with no purchase layer to cost them from.')),
+                ('layers', models.JSONField(blank=True, default=list, help_text='Open cost layers as [quantity, unit cost in cents] pairs.')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valuations', to='inventory.product')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.valuationperiod')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='valuationperiod',
+            constraint=models.UniqueConstraint(fields=('method', 'period_end'), name='unique_valuation_period'),
+        ),
+        migrations.AddConstraint(
+            model_name='productvaluation',
+            constraint=models.UniqueConstraint(fields=('period', 'product'), name='unique_product_valuation'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_inventory_valuation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['order_date'], name='po_order_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=models.Index(fields=['order_date'], name='so_order_date_idx'),
+        ),
+    ]
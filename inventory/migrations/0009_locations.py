@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_default_location(apps, schema_editor):
+    """Moves all existing stock into a default location."""
+    Location = apps.get_model('inventory', 'Location')
+    Product = apps.get_model('inventory', 'Product')
+    StockLevel = apps.get_model('inventory', 'StockLevel')
+    InventoryTransaction = apps.get_model('inventory', 'InventoryTransaction')
+
+    location, _ = Location.objects.get_or_create(code='MAIN', defaults={'name': 'Main Warehouse', 'is_default': True})
+    stocked = Product.objects.filter(stock_quantity__gt=0).order_by('pk').values_list('pk', 'stock_quantity')
+    batch = []
+    for product_id, quantity in stocked.iterator(chunk_size=2000):
+        batch.append(StockLevel(product_id=product_id, location_id=location.pk, quantity=quantity))
+        if len(batch) >= 2000:
+            StockLevel.objects.bulk_create(batch)
+            batch = []
+    StockLevel.objects.bulk_create(batch)
+    InventoryTransaction.objects.filter(location__isnull=True).update(location=location)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_order_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorytransaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('Purchase', 'Purchase'), ('Sale', 'Sale'), ('Adjustment', 'Adjustment'), ('Transfer', 'Transfer')], max_length=10),
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The name of the warehouse or site.', max_length=255)),
+                ('code', models.CharField(help_text='Short unique code for the location.', max_length=20, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_default', models.BooleanField(default=False, help_text='Stock movements without an explicit location use this one.')),
+            ],
+            options={
+                'verbose_name': 'Location',
+                'verbose_name_plural': 'Locations',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('is_default',), name='single_default_location')],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventorytransaction',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='inventory.location'),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='location',
+            field=models.ForeignKey(blank=True, help_text='Where the order is received. Defaults to the default location.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='purchase_orders', to='inventory.location'),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='location',
+            field=models.ForeignKey(blank=True, help_text='Where the order ships from. Defaults to the default location.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='sales_orders', to='inventory.location'),
+        ),
+        migrations.CreateModel(
+            name='StockLevel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_levels', to='inventory.location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_levels', to='inventory.product')),
+            ],
+            options={
+                'verbose_name': 'Stock Level',
+                'verbose_name_plural': 'Stock Levels',
+                'indexes': [models.Index(fields=['location', 'product'], name='stocklevel_location_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'location'), name='unique_stock_level')],
+            },
+        ),
+        migrations.RunPython(seed_default_location, migrations.RunPython.noop),
+    ]
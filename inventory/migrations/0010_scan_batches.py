@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_locations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(help_text='Client-generated identifier of the scan batch.', max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('result', models.JSONField(default=dict, help_text='The response returned for this batch.')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='scan_batches', to='inventory.location')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Scan Batch',
+                'verbose_name_plural': 'Scan Batches',
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:29
+
+import django.core.serializers.json
+import django.db.models.manager
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def stamp_inactive_products(apps, schema_editor):
+    """Starts the archive clock for products that were already inactive."""
+    Product = apps.get_model('inventory', 'Product')
+    Product.objects.filter(is_active=False, deactivated_at__isnull=True).update(deactivated_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInventoryTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('product_id', models.BigIntegerField(db_index=True)),
+                ('location_id', models.BigIntegerField(blank=True, null=True)),
+                ('transaction_type', models.CharField(choices=[('Purchase', 'Purchase'), ('Sale', 'Sale'), ('Adjustment', 'Adjustment'), ('Transfer', 'Transfer')], max_length=10)),
+                ('quantity_change', models.IntegerField()),
+                ('timestamp', models.DateTimeField()),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Inventory Transaction',
+                'verbose_name_plural': 'Archived Inventory Transactions',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedProduct',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('sku', models.CharField(db_index=True, max_length=100)),
+                ('name', models.CharField(max_length=255)),
+                ('deactivated_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The remaining columns of the product row.')),
+            ],
+            options={
+                'verbose_name': 'Archived Product',
+                'verbose_name_plural': 'Archived Products',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='product',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'Product', 'verbose_name_plural': 'Products'},
+        ),
+        migrations.AlterModelManagers(
+            name='product',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='deactivated_at',
+            field=models.DateTimeField(blank=True, help_text='When the product was soft-deleted.', null=True),
+        ),
+        migrations.RunPython(stamp_inactive_products, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-id'], name='product_active_idx'),
+        ),
+    ]
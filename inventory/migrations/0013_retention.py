@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('inventory', '0012_product_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAuditLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('CREATED', 'Created'), ('UPDATED', 'Updated'), ('DELETED', 'Deleted'), ('RECEIVED', 'Received PO')], max_length=10)),
+                ('timestamp', models.DateTimeField()),
+                ('content_type_id', models.IntegerField()),
+                ('object_id', models.PositiveIntegerField()),
+                ('object_repr', models.CharField(max_length=255)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Audit Log',
+                'verbose_name_plural': 'Archived Audit Logs',
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='archivedinventorytransaction',
+            options={'ordering': ['-id'], 'verbose_name': 'Archived Inventory Transaction', 'verbose_name_plural': 'Archived Inventory Transactions'},
+        ),
+        migrations.AlterModelOptions(
+            name='auditlog',
+            options={'ordering': ['-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='inventorytransaction',
+            options={'ordering': ['-id'], 'verbose_name': 'Inventory Transaction', 'verbose_name_plural': 'Inventory Transactions'},
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='auditlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['timestamp'], name='transaction_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:37
+
+from django.db import migrations, models
+from django.db.models import Max
+
+from inventory.orders import refresh_order_totals
+
+
+def backfill_order_totals(apps, schema_editor):
+    """Computes the stored totals of existing orders, 10,000 orders per UPDATE."""
+    for model_name in ('SalesOrder', 'PurchaseOrder'):
+        model = apps.get_model('inventory', model_name)
+        top = model.objects.aggregate(top=Max('pk'))['top'] or 0
+        for start in range(0, top, 10_000):
+            refresh_order_totals(model, model.objects.filter(pk__gt=start, pk__lte=start + 10_000).values_list('pk', flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of quantity x unit price over the lines.', max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of quantity x unit price over the lines.', max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_order_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='status',
+            field=models.CharField(choices=[('Draft', 'Draft'), ('Pending', 'Pending'), ('Shipped', 'Shipped'), ('Received', 'Received'), ('Cancelled', 'Cancelled')], default='Pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='salesorder',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Picked', 'Picked'), ('Fulfilled', 'Fulfilled'), ('Cancelled', 'Cancelled')], default='Pending', max_length=10),
+        ),
+    ]
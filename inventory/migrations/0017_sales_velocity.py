@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='days_of_cover',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Days the current stock lasts at the 30-day sales velocity; empty without recent sales.', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_velocity_30d',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Average units sold per day over the last 30 days.', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_velocity_7d',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Average units sold per day over the last 7 days.', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='velocity_updated_at',
+            field=models.DateTimeField(blank=True, help_text='When the sales velocity was last computed.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'days_of_cover'], name='product_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'sales_velocity_7d'], name='product_velocity_idx'),
+        ),
+    ]
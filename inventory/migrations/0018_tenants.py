@@ -0,0 +1,128 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:15
+
+import django.db.models.deletion
+import inventory.tenancy
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('inventory', '0017_sales_velocity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tenant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('slug', models.SlugField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='location',
+            name='single_default_location',
+        ),
+        migrations.RemoveConstraint(
+            model_name='valuationperiod',
+            name='unique_valuation_period',
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='inventorytransaction',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddField(
+            model_name='valuationperiod',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['tenant', 'timestamp'], name='auditlog_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['tenant', 'timestamp'], name='transaction_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['tenant', 'id'], name='job_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['tenant', 'code'], name='location_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['tenant', 'is_active', 'id'], name='product_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['tenant', 'order_date'], name='po_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesorder',
+            index=models.Index(fields=['tenant', 'order_date'], name='so_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['tenant', 'name'], name='supplier_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['tenant', 'role'], name='user_tenant_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('tenant', 'is_default'), name='single_default_location'),
+        ),
+        migrations.AddConstraint(
+            model_name='valuationperiod',
+            constraint=models.UniqueConstraint(fields=('tenant', 'method', 'period_end'), name='unique_valuation_period'),
+        ),
+    ]
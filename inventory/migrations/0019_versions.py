@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_tenants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Bumped on every edit; the API serves it as the ETag.'),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Bumped on every edit; the API serves it as the ETag.'),
+        ),
+        migrations.AddField(
+            model_name='salesorder',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Bumped on every edit; the API serves it as the ETag.'),
+        ),
+    ]
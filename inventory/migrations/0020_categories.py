@@ -0,0 +1,117 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:28
+
+import django.db.models.deletion
+import inventory.tenancy
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+
+
+def convert_categories(apps, schema_editor):
+    """Turns the free-text product categories into tree nodes; "A > B" becomes B under A."""
+    Category = apps.get_model('inventory', 'Category')
+    Product = apps.get_model('inventory', 'Product')
+
+    nodes = {}
+    def node(tenant_id, parent, name):
+        key = (tenant_id, parent and parent.pk, name)
+        if key not in nodes:
+            category = Category.objects.create(tenant_id=tenant_id, parent=parent, name=name)
+            category.path = f"{parent.path if parent else ''}{category.pk:08d}/"
+            category.depth = category.path.count('/') - 1
+            category.full_name = f'{parent.full_name} > {name}' if parent else name
+            category.save(update_fields=['path', 'depth', 'full_name'])
+            nodes[key] = category
+        return nodes[key]
+
+    texts = Product.objects.exclude(category_name='').values_list('tenant_id', 'category_name').distinct()
+    for tenant_id, text in list(texts):
+        category = None
+        for name in [part.strip() for part in text.split('>') if part.strip()]:
+            category = node(tenant_id, category, name)
+        if category is not None:
+            # One UPDATE per distinct category string, however many products share it.
+            Product.objects.filter(tenant_id=tenant_id, category_name=text).update(category=category)
+
+    totals = defaultdict(lambda: [0, 0, Decimal(0)])
+    rows = (
+        Product.objects.filter(is_active=True, category__isnull=False)
+        .values('category__path')
+        .annotate(count=Count('pk'), units=Sum('stock_quantity'),
+                  value=Sum(F('stock_quantity') * F('unit_price'), output_field=DecimalField(max_digits=16, decimal_places=2)))
+        .order_by()
+    )
+    for row in rows:
+        for pk in [int(part) for part in row['category__path'].split('/') if part]:
+            totals[pk][0] += row['count']
+            totals[pk][1] += row['units'] or 0
+            totals[pk][2] += row['value'] or 0
+    categories = list(Category.objects.filter(pk__in=totals))
+    for category in categories:
+        category.product_count, category.stock_quantity, category.stock_value = totals[category.pk]
+    Category.objects.bulk_update(categories, ['product_count', 'stock_quantity', 'stock_value'], batch_size=500)
+
+
+def restore_category_names(apps, schema_editor):
+    Category = apps.get_model('inventory', 'Category')
+    Product = apps.get_model('inventory', 'Product')
+    for pk, full_name in Category.objects.values_list('pk', 'full_name'):
+        Product.objects.filter(category_id=pk).update(category_name=full_name[:100])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('path', models.CharField(editable=False, help_text='Zero-padded ids from the root down to this node.', max_length=255)),
+                ('depth', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('full_name', models.CharField(editable=False, help_text='Names from the root down, e.g. "Electronics > Cables".', max_length=1000)),
+                ('product_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('stock_quantity', models.PositiveBigIntegerField(default=0, editable=False, help_text='Units on hand in the subtree.')),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Units on hand times unit price in the subtree.', max_digits=16)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='children', to='inventory.category')),
+                ('tenant', models.ForeignKey(blank=True, db_index=False, default=inventory.tenancy.current_tenant_id, help_text='The customer the row belongs to; empty for the untenanted deployment.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.tenant')),
+            ],
+            options={
+                'verbose_name': 'Category',
+                'verbose_name_plural': 'Categories',
+            },
+        ),
+        migrations.RenameField(
+            model_name='product',
+            old_name='category',
+            new_name='category_name',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='inventory.category'),
+        ),
+        migrations.RunPython(convert_categories, restore_category_names),
+        migrations.RemoveField(
+            model_name='product',
+            name='category_name',
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='category_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['tenant', 'path'], name='category_tenant_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('tenant', 'parent', 'name'), name='unique_category_name'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0020_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorderitem',
+            name='expiry_date',
+            field=models.DateField(blank=True, help_text='When the received units expire, if they do.', null=True),
+        ),
+        migrations.AddField(
+            model_name='purchaseorderitem',
+            name='lot_number',
+            field=models.CharField(blank=True, help_text="The supplier's lot or batch number.", max_length=64),
+        ),
+        migrations.CreateModel(
+            name='Lot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lot_number', models.CharField(blank=True, max_length=64)),
+                ('expiry_date', models.DateField(blank=True, null=True)),
+                ('quantity', models.PositiveIntegerField(help_text='Units received.')),
+                ('remaining', models.PositiveIntegerField(help_text='Units not yet sold.')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lots', to='inventory.product')),
+                ('purchase_order_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lots', to='inventory.purchaseorderitem')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LotAllocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='inventory.lot')),
+                ('sales_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lot_allocations', to='inventory.salesorder')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(condition=models.Q(('remaining__gt', 0)), fields=['product', 'expiry_date'], name='lot_fefo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(condition=models.Q(('remaining__gt', 0)), fields=['expiry_date'], name='lot_expiry_idx'),
+        ),
+    ]
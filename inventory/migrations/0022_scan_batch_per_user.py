@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0021_lots'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scanbatch',
+            name='batch_id',
+            field=models.CharField(help_text='Client-generated identifier of the scan batch.', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='scanbatch',
+            constraint=models.UniqueConstraint(fields=('user', 'batch_id'), name='unique_scan_batch'),
+        ),
+    ]
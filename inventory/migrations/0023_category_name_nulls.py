@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:46
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0022_scan_batch_per_user'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='category',
+            name='unique_category_name',
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('tenant', models.Value(0)), django.db.models.functions.comparison.Coalesce('parent', models.Value(0)), models.F('name'), name='unique_category_name'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:55
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0023_category_name_nulls'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='location',
+            name='code',
+            field=models.CharField(help_text='Short code for the location; unique within a tenant.', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(help_text='Stock Keeping Unit (SKU) for the product; unique within a tenant.', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='supplier',
+            name='email',
+            field=models.EmailField(help_text='Contact email for the supplier; unique within a tenant.', max_length=254),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['tenant', 'sku'], name='product_sku_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('tenant', models.Value(0)), models.F('code'), name='unique_location_code'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('tenant', models.Value(0)), models.F('sku'), name='unique_product_sku'),
+        ),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('tenant', models.Value(0)), models.F('email'), name='unique_supplier_email'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0024_per_tenant_unique_codes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lot',
+            name='lot_fefo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lot',
+            name='lot_expiry_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['product', 'expiry_date', 'remaining'], name='lot_fefo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(fields=['expiry_date', 'remaining'], name='lot_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0025_plain_lot_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', '-id'], name='product_active_idx'),
+        ),
+    ]
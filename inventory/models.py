@@ -1,8 +1,77 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from . import identity, tenancy
+
+# ============================================================================
+#  TENANT MODEL
+# ============================================================================
+class Tenant(models.Model):
+    """A customer organisation; its users only ever see its own data."""
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=50, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+def tenant_field():
+    """The tenant key of a partitioned model; new rows belong to the current tenant (see ``inventory.tenancy``)."""
+    return models.ForeignKey(
+        Tenant, on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        default=tenancy.current_tenant_id, db_index=False,
+        help_text="The customer the row belongs to; empty for the untenanted deployment.",
+    )
+
+
+# ============================================================================
+#  OPTIMISTIC CONCURRENCY
+# ============================================================================
+class VersionConflict(Exception):
+    """Raised when a compare-and-swap save finds the row at another version."""
+    def __init__(self, instance, expected_version):
+        self.instance = instance
+        self.expected_version = expected_version
+        super().__init__(f"{instance._meta.label} {instance.pk} is no longer at version {expected_version}.")
+
+
+class VersionedModel(models.Model):
+    """
+    A model whose edits are checked against a version number instead of a lock.
+
+    ``save_versioned`` writes only the given fields with
+    ``UPDATE ... SET version = version + 1 WHERE id = ? AND version = n``, so
+    an edit based on a stale read fails instead of overwriting newer data.
+    Bulk writers that change the row (stock movements, status transitions)
+    bump the version with ``F('version') + 1``.
+    """
+    version = models.PositiveIntegerField(default=1, help_text="Bumped on every edit; the API serves it as the ETag.")
+
+    class Meta:
+        abstract = True
+
+    def save_versioned(self, update_fields, expected_version=None):
+        """Saves ``update_fields`` if the row is still at ``expected_version`` (by default the one loaded)."""
+        expected_version = self.version if expected_version is None else expected_version
+        values = {}
+        for name in update_fields:
+            field = self._meta.get_field(name)
+            values[field.attname] = getattr(self, field.attname)
+        updated = type(self)._base_manager.filter(pk=self.pk, version=expected_version).update(
+            version=models.F('version') + 1, **values
+        )
+        if not updated:
+            raise VersionConflict(self, expected_version)
+        self.version = expected_version + 1
+
 
 # ============================================================================
 #  USER AND SUPPLIER MODELS
@@ -18,18 +87,23 @@ class User(AbstractUser):
         STAFF = 'Staff', 'Staff'
 
     role = models.CharField(max_length=10, choices=Role.choices, default=Role.STAFF)
+    tenant = tenant_field()
 
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            models.Index(fields=['tenant', 'role'], name='user_tenant_idx'),
+        ]
 
 
 class Supplier(models.Model):
     """Represents a supplier or vendor who provides products."""
     name = models.CharField(max_length=255, help_text="The name of the supplier company.")
     contact_info = models.TextField(blank=True, help_text="Physical address or other contact details.")
-    email = models.EmailField(unique=True, help_text="Contact email for the supplier.")
+    email = models.EmailField(help_text="Contact email for the supplier; unique within a tenant.")
     phone = models.CharField(max_length=255, help_text="Contact phone number for the supplier.")
+    tenant = tenant_field()
 
     def __str__(self):
         return self.name
@@ -37,42 +111,253 @@ class Supplier(models.Model):
     class Meta:
         verbose_name = 'Supplier'
         verbose_name_plural = 'Suppliers'
+        constraints = [
+            # Compared as 0 for the untenanted deployment, as in unique_category_name.
+            models.UniqueConstraint(Coalesce('tenant', Value(0)), 'email', name='unique_supplier_email'),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'name'], name='supplier_tenant_idx'),
+        ]
+
+
+# ============================================================================
+#  LOCATION MODEL
+# ============================================================================
+class Location(models.Model):
+    """A warehouse or other site that holds stock."""
+    name = models.CharField(max_length=255, help_text="The name of the warehouse or site.")
+    code = models.CharField(max_length=20, help_text="Short code for the location; unique within a tenant.")
+    is_active = models.BooleanField(default=True)
+    is_default = models.BooleanField(default=False, help_text="Stock movements without an explicit location use this one.")
+    tenant = tenant_field()
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+    @classmethod
+    def get_default(cls):
+        """Returns the current tenant's default location, creating it on first use."""
+        tenant_id = tenancy.current_tenant_id()
+        return identity.memo(('default-location', tenant_id), lambda: cls._load_default(tenant_id))
+
+    @classmethod
+    def _load_default(cls, tenant_id):
+        location = cls.objects.filter(is_default=True, tenant_id=tenant_id).first()
+        if location is None:
+            location, _ = cls.objects.get_or_create(
+                code='MAIN', tenant_id=tenant_id, defaults={'name': 'Main Warehouse', 'is_default': True},
+            )
+        return location
+
+    class Meta:
+        verbose_name = 'Location'
+        verbose_name_plural = 'Locations'
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'is_default'], condition=models.Q(is_default=True), name='single_default_location'),
+            models.UniqueConstraint(Coalesce('tenant', Value(0)), 'code', name='unique_location_code'),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'code'], name='location_tenant_idx'),
+        ]
+
+
+# ============================================================================
+#  CATEGORY TREE
+# ============================================================================
+class Category(models.Model):
+    """
+    A node of the product category tree.
+
+    ``path`` is the materialized path of ids from the root down to the node
+    (``00000003/00000011/``), so a subtree is every row whose path starts
+    with the node's: one range scan on ``category_path_idx``. The rollups
+    cover the active products of the whole subtree and are kept current by
+    ``inventory.categories``.
+    """
+    name = models.CharField(max_length=100)
+    parent = models.ForeignKey('self', on_delete=models.PROTECT, null=True, blank=True, related_name='children')
+    path = models.CharField(max_length=255, editable=False, help_text="Zero-padded ids from the root down to this node.")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    full_name = models.CharField(max_length=1000, editable=False, help_text='Names from the root down, e.g. "Electronics > Cables".')
+    tenant = tenant_field()
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    stock_quantity = models.PositiveBigIntegerField(default=0, editable=False, help_text="Units on hand in the subtree.")
+    stock_value = models.DecimalField(max_digits=16, decimal_places=2, default=0, editable=False, help_text="Units on hand times unit price in the subtree.")
+
+    def __str__(self):
+        return self.full_name
+
+    def save(self, *args, **kwargs):
+        # The path holds the node's own id, so a new node is written twice.
+        if self.pk is None:
+            super().save(*args, **kwargs)
+            kwargs = {'update_fields': ['path', 'depth', 'full_name']}
+        prefix, names = (self.parent.path, self.parent.full_name) if self.parent_id else ('', '')
+        self.path = f'{prefix}{self.pk:08d}/'
+        self.depth = self.path.count('/') - 1
+        self.full_name = f'{names} > {self.name}' if names else self.name
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = 'Category'
+        verbose_name_plural = 'Categories'
+        constraints = [
+            # NULLs never collide in a unique index, so the untenanted deployment and roots
+            # (no parent) are compared as 0; an expression index works on every supported backend.
+            models.UniqueConstraint(
+                Coalesce('tenant', Value(0)), Coalesce('parent', Value(0)), 'name', name='unique_category_name',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['path'], name='category_path_idx'),
+            models.Index(fields=['tenant', 'path'], name='category_tenant_idx'),
+        ]
 
 
 # ============================================================================
 #  PRODUCT AND STOCK MODELS
 # ============================================================================
-class Product(models.Model):
+class ActiveManager(models.Manager):
+    """Hides soft-deleted (inactive) rows; use ``all_objects`` to see them."""
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
+class Product(VersionedModel):
     """Represents an item in the inventory."""
     name = models.CharField(max_length=255, help_text="The name of the product.")
-    sku = models.CharField(max_length=100, unique=True, help_text="Unique Stock Keeping Unit (SKU) for the product.")
-    category = models.CharField(max_length=100, blank=True)
+    sku = models.CharField(max_length=100, help_text="Stock Keeping Unit (SKU) for the product; unique within a tenant.")
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, help_text="The selling price for one unit of the product.")
     stock_quantity = models.PositiveIntegerField(default=0, help_text="Current number of units in stock.")
     min_stock_level = models.PositiveIntegerField(default=10, help_text="The stock level at which a reorder alert is triggered.")
     is_active = models.BooleanField(default=True) 
+    deactivated_at = models.DateTimeField(null=True, blank=True, help_text="When the product was soft-deleted.")
+    supplier = models.ForeignKey('Supplier', on_delete=models.SET_NULL, null=True, blank=True, related_name='products', help_text="The preferred supplier used for automatic replenishment.")
+    reorder_point = models.PositiveIntegerField(null=True, blank=True, help_text="Suggested reorder point computed from sales history.")
+    reorder_quantity = models.PositiveIntegerField(null=True, blank=True, help_text="Suggested reorder quantity computed from sales history.")
+    reorder_updated_at = models.DateTimeField(null=True, blank=True, help_text="When the reorder suggestion was last computed.")
+    tenant = tenant_field()
+    sales_velocity_7d = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Average units sold per day over the last 7 days.")
+    sales_velocity_30d = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Average units sold per day over the last 30 days.")
+    days_of_cover = models.DecimalField(max_digits=10, decimal_places=1, null=True, blank=True, help_text="Days the current stock lasts at the 30-day sales velocity; empty without recent sales.")
+    velocity_updated_at = models.DateTimeField(null=True, blank=True, help_text="When the sales velocity was last computed.")
+
+    # Inactive products are soft-deleted: hidden from the default manager,
+    # kept for the orders and ledger entries that still reference them.
+    objects = ActiveManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        product = super().from_db(db, field_names, values)
+        # Remembered so a move between categories refreshes the rollups of both.
+        product._loaded_category_id = product.__dict__.get('category_id')
+        return product
+
+    def _refresh_category_totals(self, update_fields):
+        from .categories import ROLLUP_FIELDS, refresh_category_totals
+
+        if update_fields is None or ROLLUP_FIELDS.intersection(update_fields):
+            category_ids = {self.category_id, getattr(self, '_loaded_category_id', None)} - {None}
+            if category_ids:
+                refresh_category_totals(category_ids)
+            self._loaded_category_id = self.category_id
+
+    def _sync_deactivated_at(self, update_fields):
+        # Keep deactivated_at in step with is_active however the flag is changed.
+        if self.is_active == (self.deactivated_at is not None):
+            self.deactivated_at = None if self.is_active else timezone.now()
+            if update_fields is not None:
+                update_fields = {*update_fields, 'deactivated_at'}
+        return update_fields
+
+    def save(self, *args, **kwargs):
+        update_fields = self._sync_deactivated_at(kwargs.get('update_fields'))
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        self._refresh_category_totals(update_fields)
+
+    def save_versioned(self, update_fields, expected_version=None):
+        update_fields = self._sync_deactivated_at(update_fields)
+        super().save_versioned(update_fields, expected_version)
+        self._refresh_category_totals(update_fields)
+
+    def deactivate(self):
+        """Soft-deletes the product."""
+        self.is_active = False
+        self.save(update_fields=['is_active'])
+
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
+        base_manager_name = 'all_objects'
+        constraints = [
+            models.UniqueConstraint(Coalesce('tenant', Value(0)), 'sku', name='unique_product_sku'),
+        ]
+        indexes = [
+            # Covers the low-stock scan so it never touches the table rows.
+            models.Index(fields=['is_active', 'stock_quantity', 'min_stock_level', 'supplier'], name='product_low_stock_idx'),
+            # The product list shows active rows newest first; a plain composite index so MySQL has it too.
+            models.Index(fields=['is_active', '-id'], name='product_active_idx'),
+            # "Runs out soonest" and "sells fastest" lists; plain composite indexes so MySQL has them too.
+            models.Index(fields=['is_active', 'days_of_cover'], name='product_cover_idx'),
+            models.Index(fields=['is_active', 'sales_velocity_7d'], name='product_velocity_idx'),
+            models.Index(fields=['tenant', 'is_active', 'id'], name='product_tenant_idx'),
+            # SKU lookups (cycle-count scans) within a tenant; the unique expression index can't serve them.
+            models.Index(fields=['tenant', 'sku'], name='product_sku_idx'),
+        ]
+
+
+class StockLevel(models.Model):
+    """
+    The quantity of a product held at one location.
+    Product.stock_quantity is kept equal to the sum over all locations.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_levels')
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='stock_levels')
+    quantity = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product.name} at {self.location.code}"
+
+    class Meta:
+        verbose_name = 'Stock Level'
+        verbose_name_plural = 'Stock Levels'
+        constraints = [
+            # Also serves product-first lookups.
+            models.UniqueConstraint(fields=['product', 'location'], name='unique_stock_level'),
+        ]
+        indexes = [
+            models.Index(fields=['location', 'product'], name='stocklevel_location_idx'),
+        ]
 
 
 # ============================================================================
 #  ORDER MODELS
 # ============================================================================
-class PurchaseOrder(models.Model):
+class PurchaseOrder(VersionedModel):
     """Represents an order placed with a supplier to replenish stock."""
     class Status(models.TextChoices):
+        DRAFT = 'Draft', 'Draft'
         PENDING = 'Pending', 'Pending'
         SHIPPED = 'Shipped', 'Shipped'
         RECEIVED = 'Received', 'Received'
+        CANCELLED = 'Cancelled', 'Cancelled'
 
     supplier = models.ForeignKey(Supplier, on_delete=models.PROTECT, related_name='purchase_orders')
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name='purchase_orders', help_text="Where the order is received. Defaults to the default location.")
     order_date = models.DateTimeField(auto_now_add=True)
+    received_date = models.DateTimeField(null=True, blank=True, help_text="When the order was received into stock.")
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of quantity x unit price over the lines.")
+    line_count = models.PositiveIntegerField(default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    tenant = tenant_field()
 
     def __str__(self):
         return f"PO-{self.id} from {self.supplier.name}"
@@ -80,6 +365,10 @@ class PurchaseOrder(models.Model):
     class Meta:
         verbose_name = 'Purchase Order'
         verbose_name_plural = 'Purchase Orders'
+        indexes = [
+            models.Index(fields=['order_date'], name='po_order_date_idx'),
+            models.Index(fields=['tenant', 'order_date'], name='po_tenant_idx'),
+        ]
 
 
 class PurchaseOrderItem(models.Model):
@@ -88,21 +377,29 @@ class PurchaseOrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, help_text="The cost per unit from the supplier.")
+    lot_number = models.CharField(max_length=64, blank=True, help_text="The supplier's lot or batch number.")
+    expiry_date = models.DateField(null=True, blank=True, help_text="When the received units expire, if they do.")
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in PO-{self.purchase_order.id}"
 
 
-class SalesOrder(models.Model):
+class SalesOrder(VersionedModel):
     """Represents a sales order from a customer."""
     class Status(models.TextChoices):
         PENDING = 'Pending', 'Pending'
+        PICKED = 'Picked', 'Picked'
         FULFILLED = 'Fulfilled', 'Fulfilled'
         CANCELLED = 'Cancelled', 'Cancelled'
     
     order_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name='sales_orders', help_text="Where the order ships from. Defaults to the default location.")
     customer_name = models.CharField(max_length=255, blank=True)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of quantity x unit price over the lines.")
+    line_count = models.PositiveIntegerField(default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    tenant = tenant_field()
 
     def __str__(self):
         return f"SO-{self.id} for {self.customer_name or 'N/A'}"
@@ -110,6 +407,10 @@ class SalesOrder(models.Model):
     class Meta:
         verbose_name = 'Sales Order'
         verbose_name_plural = 'Sales Orders'
+        indexes = [
+            models.Index(fields=['order_date'], name='so_order_date_idx'),
+            models.Index(fields=['tenant', 'order_date'], name='so_tenant_idx'),
+        ]
 
 
 class SalesOrderItem(models.Model):
@@ -123,6 +424,45 @@ class SalesOrderItem(models.Model):
         return f"{self.quantity} x {self.product.name} in SO-{self.sales_order.id}"
 
 
+class Lot(models.Model):
+    """
+    A batch of one product received on a purchase order line.
+
+    ``remaining`` is what is left of it; sales draw lots down
+    first-expiry-first-out (see ``inventory.lots``). Lots are tracked per
+    product, not per location.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='lots')
+    purchase_order_item = models.ForeignKey(PurchaseOrderItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='lots')
+    lot_number = models.CharField(max_length=64, blank=True)
+    expiry_date = models.DateField(null=True, blank=True)
+    quantity = models.PositiveIntegerField(help_text="Units received.")
+    remaining = models.PositiveIntegerField(help_text="Units not yet sold.")
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # FEFO allocation walks a product's open lots in expiry order; plain composite
+            # indexes so MySQL has them too, with remaining checked from the index.
+            models.Index(fields=['product', 'expiry_date', 'remaining'], name='lot_fefo_idx'),
+            # The expiring-soon report is a range scan over open lots.
+            models.Index(fields=['expiry_date', 'remaining'], name='lot_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"Lot {self.lot_number or self.pk} of {self.product.name}"
+
+
+class LotAllocation(models.Model):
+    """Units of a lot taken by a sales order; put back if the order is cancelled."""
+    sales_order = models.ForeignKey(SalesOrder, on_delete=models.CASCADE, related_name='lot_allocations')
+    lot = models.ForeignKey(Lot, on_delete=models.CASCADE, related_name='allocations')
+    quantity = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.quantity} from {self.lot} for SO-{self.sales_order_id}"
+
+
 # ============================================================================
 #  INVENTORY TRANSACTION LOGS
 # ============================================================================
@@ -132,13 +472,16 @@ class InventoryTransaction(models.Model):
         PURCHASE = 'Purchase', 'Purchase'
         SALE = 'Sale', 'Sale'
         ADJUSTMENT = 'Adjustment', 'Adjustment'
+        TRANSFER = 'Transfer', 'Transfer'
 
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='transactions')
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name='transactions')
     transaction_type = models.CharField(max_length=10, choices=TransactionType.choices)
     quantity_change = models.IntegerField(help_text="Positive for stock in, negative for stock out.")
     timestamp = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     reason = models.CharField(max_length=255, blank=True, help_text="Reason for a manual adjustment.")
+    tenant = tenant_field()
 
     def __str__(self):
         return f"{self.transaction_type} of {self.product.name}: {self.quantity_change}"
@@ -146,7 +489,139 @@ class InventoryTransaction(models.Model):
     class Meta:
         verbose_name = 'Inventory Transaction'
         verbose_name_plural = 'Inventory Transactions'
-        ordering = ['-timestamp']
+        # Ids follow insertion time, so this is newest-first without sorting the table.
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['timestamp'], name='transaction_timestamp_idx'),
+            models.Index(fields=['tenant', 'timestamp'], name='transaction_tenant_idx'),
+        ]
+
+
+class ScanBatch(models.Model):
+    """A batch of cycle-count scans, recorded once per user and client batch id so retries don't re-apply it."""
+    batch_id = models.CharField(max_length=64, help_text="Client-generated identifier of the scan batch.")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='scan_batches')
+    created_at = models.DateTimeField(auto_now_add=True)
+    result = models.JSONField(default=dict, help_text="The response returned for this batch.")
+
+    def __str__(self):
+        return f"Scan batch {self.batch_id}"
+
+    class Meta:
+        verbose_name = 'Scan Batch'
+        verbose_name_plural = 'Scan Batches'
+        constraints = [
+            # Per user, like idempotency keys, so one tenant's batch ids never collide with another's.
+            models.UniqueConstraint(fields=['user', 'batch_id'], name='unique_scan_batch'),
+        ]
+
+
+# ============================================================================
+#  ARCHIVE MODELS
+# ============================================================================
+class ArchivedProduct(models.Model):
+    """A long-inactive product moved out of the product table, keeping its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    sku = models.CharField(max_length=100, db_index=True)
+    name = models.CharField(max_length=255)
+    deactivated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder, help_text="The remaining columns of the product row.")
+
+    def __str__(self):
+        return f"{self.name} ({self.sku})"
+
+    class Meta:
+        verbose_name = 'Archived Product'
+        verbose_name_plural = 'Archived Products'
+
+
+class ArchivedInventoryTransaction(models.Model):
+    """An inventory transaction moved out of the ledger table, keeping its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    product_id = models.BigIntegerField(db_index=True)
+    location_id = models.BigIntegerField(null=True, blank=True)
+    transaction_type = models.CharField(max_length=10, choices=InventoryTransaction.TransactionType.choices)
+    quantity_change = models.IntegerField()
+    timestamp = models.DateTimeField()
+    user_id = models.BigIntegerField(null=True, blank=True)
+    reason = models.CharField(max_length=255, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.transaction_type} of product {self.product_id}: {self.quantity_change}"
+
+    class Meta:
+        verbose_name = 'Archived Inventory Transaction'
+        verbose_name_plural = 'Archived Inventory Transactions'
+        ordering = ['-id']
+
+
+# ============================================================================
+#  IDEMPOTENCY KEY MODEL
+# ============================================================================
+class IdempotencyKey(models.Model):
+    """The stored outcome of a request sent with an Idempotency-Key header."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, help_text="Hash of the method, path and body of the original request.")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.key}]"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+
+# ============================================================================
+#  BACKGROUND JOB MODEL
+# ============================================================================
+class Job(models.Model):
+    """A long-running operation queued for the `runjobs` workers."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'Queued', 'Queued'
+        RUNNING = 'Running', 'Running'
+        SUCCEEDED = 'Succeeded', 'Succeeded'
+        FAILED = 'Failed', 'Failed'
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, help_text="The worker process running or last running the job.")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last time the worker reported progress.")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    tenant = tenant_field()
+
+    def __str__(self):
+        return f"Job #{self.id} {self.kind} ({self.status})"
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+            models.Index(fields=['tenant', 'id'], name='job_tenant_idx'),
+        ]
 
 
 # ============================================================================
@@ -176,9 +651,95 @@ class AuditLog(models.Model):
     content_object = GenericForeignKey('content_type', 'object_id')
     
     object_repr = models.CharField(max_length=255)  # String representation of the object
+    tenant = tenant_field()
 
     def __str__(self):
         return f"{self.user} {self.action} {self.object_repr} at {self.timestamp}"
 
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['timestamp'], name='auditlog_timestamp_idx'),
+            models.Index(fields=['tenant', 'timestamp'], name='auditlog_tenant_idx'),
+        ]
+
+
+class ArchivedAuditLog(models.Model):
+    """An audit log entry moved out of the audit log table, keeping its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=10, choices=AuditLog.Action.choices)
+    timestamp = models.DateTimeField()
+    content_type_id = models.IntegerField()
+    object_id = models.PositiveIntegerField()
+    object_repr = models.CharField(max_length=255)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.action} {self.object_repr} at {self.timestamp}"
+
+    class Meta:
+        verbose_name = 'Archived Audit Log'
+        verbose_name_plural = 'Archived Audit Logs'
+        ordering = ['-id']
+
+
+# ============================================================================
+#  CHECKPOINT MODEL
+# ============================================================================
+class Checkpoint(models.Model):
+    """The resume position of a long-running batch job, such as the last id it processed."""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+# ============================================================================
+#  INVENTORY VALUATION MODELS
+# ============================================================================
+class ValuationPeriod(models.Model):
+    """A closed accounting period with the inventory value and COGS at its end."""
+    class Method(models.TextChoices):
+        FIFO = 'FIFO', 'FIFO'
+        AVERAGE = 'AVERAGE', 'Weighted Average'
+
+    method = models.CharField(max_length=10, choices=Method.choices)
+    period_end = models.DateTimeField(help_text="Movements up to and including this instant belong to the period.")
+    closed_at = models.DateTimeField(auto_now_add=True)
+    closed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    quantity = models.IntegerField(default=0, help_text="Units on hand at period end.")
+    inventory_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cogs = models.DecimalField(max_digits=16, decimal_places=2, default=0, help_text="Cost of goods sold within the period.")
+    tenant = tenant_field()
+
+    def __str__(self):
+        return f"{self.method} valuation to {self.period_end:%Y-%m-%d}"
+
+    class Meta:
+        verbose_name = 'Valuation Period'
+        verbose_name_plural = 'Valuation Periods'
+        ordering = ['-period_end']
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'method', 'period_end'], name='unique_valuation_period'),
+        ]
+
+
+class ProductValuation(models.Model):
+    """Per-product closing position of a valuation period, used to resume the next one."""
+    period = models.ForeignKey(ValuationPeriod, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='valuations')
+    quantity = models.IntegerField(default=0)
+    value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cogs = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    uncosted_quantity = models.PositiveIntegerField(default=0, help_text="Units sold with no purchase layer to cost them from.")
+    layers = models.JSONField(default=list, blank=True, help_text="Open cost layers as [quantity, unit cost in cents] pairs.")
+
+    def __str__(self):
+        return f"{self.product} in {self.period}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'product'], name='unique_product_valuation'),
+        ]
@@ -0,0 +1,33 @@
+"""
+Order header helpers for the inventory app.
+
+Sales and purchase orders store ``total_amount``, ``line_count`` and
+``total_quantity`` so order lists can be shown without reading their lines.
+Every code path that writes order lines calls ``refresh_order_totals`` in
+the same transaction; single line saves and deletes are covered by signals.
+"""
+
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+AMOUNT = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _line_aggregate(lines, expression, output_field):
+    return Coalesce(Subquery(lines.annotate(value=expression).values('value')[:1]), Value(0), output_field=output_field)
+
+
+def refresh_order_totals(order_model, order_ids):
+    """Recomputes the stored totals of the given orders from their lines with one UPDATE."""
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+    relation = order_model._meta.get_field('items')
+    foreign_key = relation.field.name
+    lines = relation.related_model.objects.filter(**{foreign_key: OuterRef('pk')}).order_by().values(foreign_key)
+    return order_model.objects.filter(pk__in=order_ids).update(
+        total_amount=_line_aggregate(lines, Sum(F('quantity') * F('unit_price'), output_field=AMOUNT), AMOUNT),
+        line_count=_line_aggregate(lines, Count('pk'), IntegerField()),
+        total_quantity=_line_aggregate(lines, Sum('quantity'), IntegerField()),
+    )
+
@@ -12,6 +12,14 @@ class IsAdminOrManager(BasePermission):
         return request.user and request.user.is_authenticated and (request.user.role in ['Admin', 'Manager'])
 
 
+class IsAdmin(BasePermission):
+    """
+    Allows access only to users with the 'Admin' role.
+    """
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and request.user.role == 'Admin'
+
+
 class IsStaffReadOnly(BasePermission):
     """
     Allows read-only access to any authenticated user (including 'Staff'),
@@ -0,0 +1,172 @@
+"""
+Slow-query log for the ORM queries behind the API.
+
+``QueryLogMiddleware`` (and the job runner) install a database execute
+wrapper for the duration of a request. Queries slower than
+``SLOW_QUERY_MS`` (None turns the log off) are sampled at
+``SLOW_QUERY_SAMPLE_RATE`` and recorded under a fingerprint of their SQL,
+with literals and ``IN`` lists folded so the same query with other values
+lands on the same entry. Each entry keeps
+its call count, total and worst latency, the views and serializers that
+issued it, and the EXPLAIN plan of its first sample.
+
+The log lives in process memory and keeps the ``SLOW_QUERY_LOG_SIZE``
+entries with the most total time, so it is bounded however many distinct
+queries run. Admins read it at ``/api/slow-queries/``; the ``slow_queries``
+command exercises API endpoints in-process and prints what they logged.
+"""
+
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import DatabaseError, connections
+
+from .conf import inventory_settings
+
+_origin = ContextVar('inventory_query_origin', default=None)
+_explaining = threading.local()
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """``sql`` with literals, placeholder lists and whitespace normalized."""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+# ============================================================================
+#  THE LOG
+# ============================================================================
+class SlowQueryLog:
+    """The slowest query fingerprints of this process, keyed by fingerprint and bounded in size."""
+    ATTRIBUTIONS = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, sql, duration_ms, origin, explain):
+        """Adds one sample; ``explain`` is called for the plan when the fingerprint is new."""
+        key = fingerprint(sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= inventory_settings.SLOW_QUERY_LOG_SIZE:
+                    # Make room by dropping the entry with the least total time.
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]['total_ms'])
+                    if self._entries[cheapest]['total_ms'] > duration_ms:
+                        return
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {
+                    'fingerprint': key, 'sample': sql, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'views': {}, 'serializers': {}, 'explain': None,
+                }
+                new = True
+            else:
+                new = False
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            for kind, name in (('views', origin.get('view')), ('serializers', origin.get('serializer'))):
+                if name and (name in entry[kind] or len(entry[kind]) < self.ATTRIBUTIONS):
+                    entry[kind][name] = entry[kind].get(name, 0) + 1
+        if new:
+            # Outside the lock: EXPLAIN is a round trip to the database.
+            entry['explain'] = explain()
+
+    def top(self, limit=None):
+        """The entries with the most total time first."""
+        with self._lock:
+            entries = [{**entry, 'views': dict(entry['views']), 'serializers': dict(entry['serializers'])}
+                       for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        for entry in entries:
+            entry['total_ms'] = round(entry['total_ms'], 2)
+            entry['max_ms'] = round(entry['max_ms'], 2)
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 2)
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+# ============================================================================
+#  CAPTURE
+# ============================================================================
+def _calling_code():
+    """The innermost serializer and the view on the stack; only looked up for slow queries."""
+    from rest_framework.serializers import BaseSerializer
+    from rest_framework.views import APIView
+
+    found = {}
+    frame = sys._getframe(2)
+    while frame is not None and len(found) < 2:
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, BaseSerializer) and 'serializer' not in found:
+            found['serializer'] = type(owner).__name__
+        elif isinstance(owner, APIView) and 'view' not in found:
+            action = getattr(owner, 'action', None)
+            found['view'] = f'{type(owner).__name__}.{action}' if action else type(owner).__name__
+        frame = frame.f_back
+    return found
+
+
+def _explain(connection, sql, params):
+    if not sql.lstrip()[:6].upper() == 'SELECT':
+        return None
+    _explaining.active = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f'EXPLAIN failed: {exc}'
+    finally:
+        _explaining.active = False
+
+
+class SlowQueryWrapper:
+    """Execute wrapper that times every query and records the slow ones."""
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_explaining, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= inventory_settings.SLOW_QUERY_MS and random.random() < inventory_settings.SLOW_QUERY_SAMPLE_RATE:
+            origin = {**(_origin.get() or {}), **_calling_code()}
+            explain = (lambda: None) if many else (lambda: _explain(self.connection, sql, params))
+            slow_query_log.record(sql, duration_ms, origin, explain)
+        return result
+
+
+@contextmanager
+def capture(view=None):
+    """Records slow queries on every database connection for the block; ``view`` names them when no view is found."""
+    if inventory_settings.SLOW_QUERY_MS is None:
+        yield
+        return
+    token = _origin.set({'view': view} if view else {})
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(SlowQueryWrapper(connection)))
+            yield
+    finally:
+        _origin.reset(token)
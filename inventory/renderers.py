@@ -0,0 +1,83 @@
+"""
+Compact columnar JSON for large list responses.
+
+A client that sends ``Accept: application/vnd.inventory.columnar+json`` (or
+``?format=columnar``) gets a list as one array per field instead of one
+object per row, so every key is sent once rather than once per row::
+
+    {"length": 2, "columns": {"id": [7, 9], "sku": ["KEY-1", "KEY-2"]}}
+
+Nested objects, such as the product of a transaction, become nested tables
+of the same shape; rows where the object is null are listed in ``nulls``.
+Paginated responses keep their envelope and only ``results`` is columnar.
+Anything that isn't a list (single objects, errors) is plain JSON.
+``frontend_v2/src/services/columnar.js`` turns the payload back into rows.
+"""
+
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+COLUMNAR_MEDIA_TYPE = 'application/vnd.inventory.columnar+json'
+
+
+# ============================================================================
+#  ENCODING
+# ============================================================================
+def _is_table(values):
+    return any(isinstance(value, dict) for value in values) and all(value is None or isinstance(value, dict) for value in values)
+
+
+def to_columns(rows):
+    """Turns a list of serialized rows into a columnar table."""
+    columns = {}
+    for key in (rows[0] if rows else ()):
+        values = [row.get(key) for row in rows]
+        if _is_table(values):
+            table = to_columns([value for value in values if value is not None])
+            nulls = [i for i, value in enumerate(values) if value is None]
+            if nulls:
+                table['nulls'] = nulls
+            columns[key] = table
+        else:
+            columns[key] = values
+    return {'length': len(rows), 'columns': columns}
+
+
+def from_columns(table):
+    """Rebuilds the rows of a columnar table; the inverse of ``to_columns``."""
+    length = table['length']
+    columns = {}
+    for key, column in table['columns'].items():
+        if isinstance(column, dict):
+            nulls = set(column.get('nulls', ()))
+            present = iter(from_columns(column))
+            column = [None if i in nulls else next(present) for i in range(length)]
+        columns[key] = column
+    return [{key: column[i] for key, column in columns.items()} for i in range(length)]
+
+
+# ============================================================================
+#  RENDERER
+# ============================================================================
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = COLUMNAR_MEDIA_TYPE
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            data = to_columns(data)
+        elif isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = {**data, 'results': to_columns(data['results'])}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class ColumnarRenderingMixin:
+    """Offers the columnar format next to the default renderers of a viewset."""
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # The same URL has two representations, so caches must key on Accept.
+        patch_vary_headers(response, ('Accept',))
+        return response
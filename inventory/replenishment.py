@@ -0,0 +1,138 @@
+"""
+Automatic replenishment for the inventory app.
+
+Turns the low-stock set into draft purchase orders grouped by each product's
+preferred supplier, netting out quantities that are already on order.
+"""
+
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import AuditLog, Product, PurchaseOrder, PurchaseOrderItem
+from .orders import refresh_order_totals
+from .tenancy import scoped
+from .utils import log_activity_bulk
+
+# Orders whose quantities are already counted as on the way.
+OPEN_STATUSES = [
+    PurchaseOrder.Status.DRAFT,
+    PurchaseOrder.Status.PENDING,
+    PurchaseOrder.Status.SHIPPED,
+]
+BATCH_SIZE = 2_000
+
+
+# ============================================================================
+#  QUERIES
+# ============================================================================
+def low_stock_products():
+    """Active products with a preferred supplier at or below their minimum level."""
+    return scoped(Product.objects.all()).filter(
+        is_active=True,
+        supplier__isnull=False,
+        stock_quantity__lte=F('min_stock_level'),
+    )
+
+
+def open_order_quantities(products):
+    """Maps product id to the units on open purchase orders, in one aggregate."""
+    rows = (
+        PurchaseOrderItem.objects
+        .filter(purchase_order__status__in=OPEN_STATUSES, product__in=products.values('pk'))
+        .order_by()
+        .values('product_id')
+        .annotate(on_order=Sum('quantity'))
+        .values_list('product_id', 'on_order')
+    )
+    return dict(rows)
+
+
+# ============================================================================
+#  PLANNING
+# ============================================================================
+def plan_replenishment():
+    """
+    Builds the replenishment plan as ``{supplier_id: [(product_id, quantity, unit_cost), ...]}``.
+
+    Each product is ordered up to its minimum level plus one reorder lot (the
+    suggested ``reorder_quantity`` when available, otherwise the minimum level
+    itself). The unit cost is the last price paid for the product, falling
+    back to its selling price for products never purchased.
+    """
+    products = low_stock_products()
+    on_order = open_order_quantities(products)
+    last_cost = (
+        PurchaseOrderItem.objects
+        .filter(product=OuterRef('pk'))
+        .order_by('-pk')
+        .values('unit_price')[:1]
+    )
+    rows = (
+        products
+        .annotate(unit_cost=Coalesce(Subquery(last_cost), F('unit_price')))
+        .order_by()
+        .values_list('pk', 'supplier_id', 'stock_quantity', 'min_stock_level', 'reorder_quantity', 'unit_cost')
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    plan = defaultdict(list)
+    for pk, supplier_id, stock, minimum, reorder_quantity, unit_cost in rows:
+        position = stock + on_order.get(pk, 0)
+        if position > minimum:
+            continue
+        quantity = minimum + (reorder_quantity or minimum) - position
+        if quantity > 0:
+            plan[supplier_id].append((pk, quantity, unit_cost))
+    return plan
+
+
+# ============================================================================
+#  PURCHASE ORDER GENERATION
+# ============================================================================
+def _create_draft_orders(supplier_ids):
+    """Creates one draft PO per supplier and returns them keyed by supplier id."""
+    orders = [PurchaseOrder(supplier_id=supplier_id, status=PurchaseOrder.Status.DRAFT) for supplier_id in supplier_ids]
+    if connection.features.can_return_rows_from_bulk_insert:
+        PurchaseOrder.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+    else:
+        # Backends such as MySQL don't return primary keys from bulk inserts.
+        for order in orders:
+            order.save()
+    return {order.supplier_id: order for order in orders}
+
+
+def generate_purchase_orders(user=None, commit=True):
+    """
+    Creates draft purchase orders for everything that needs replenishing.
+
+    Returns a summary dict. Nothing is written when ``commit`` is False.
+    """
+    plan = plan_replenishment()
+    summary = {
+        'suppliers': len(plan),
+        'lines': sum(len(lines) for lines in plan.values()),
+        'units': sum(quantity for lines in plan.values() for _, quantity, _ in lines),
+        'purchase_orders': [],
+        'committed': commit,
+    }
+    if not commit or not plan:
+        return summary
+
+    with transaction.atomic():
+        orders = _create_draft_orders(plan)
+        PurchaseOrderItem.objects.bulk_create(
+            [
+                PurchaseOrderItem(purchase_order=orders[supplier_id], product_id=product_id, quantity=quantity, unit_price=unit_cost)
+                for supplier_id, lines in plan.items()
+                for product_id, quantity, unit_cost in lines
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        refresh_order_totals(PurchaseOrder, [order.pk for order in orders.values()])
+        if user is not None:
+            log_activity_bulk(user, AuditLog.Action.CREATED, orders.values())
+
+    summary['purchase_orders'] = sorted(order.pk for order in orders.values())
+    return summary
@@ -0,0 +1,169 @@
+"""
+Sales and purchasing reports for the inventory app.
+
+Every report is a single aggregate query evaluated by the database, with
+optional date filters. Results are cached for a short time because the same
+dashboards are refreshed by many managers at once.
+"""
+
+import hashlib
+import inspect
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+from .conf import inventory_settings
+from .lots import expiring_lots
+from .models import PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem
+from .tenancy import cache_key, scoped
+from .utils import start_of_day, end_of_day
+
+DEFAULT_LIMIT = 10
+
+LINE_TOTAL = Sum(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=20, decimal_places=2))
+
+
+# ============================================================================
+#  BASE QUERYSETS
+# ============================================================================
+def _date_range(field, start, end):
+    """Filter kwargs selecting whole days, kept sargable so ``field``'s index applies."""
+    bounds = {}
+    if start:
+        bounds[f'{field}__gte'] = start_of_day(start)
+    if end:
+        bounds[f'{field}__lte'] = end_of_day(end)
+    return bounds
+
+
+def _sales_lines(start=None, end=None, include_cancelled=False):
+    lines = scoped(SalesOrderItem.objects.all(), 'sales_order__tenant')
+    lines = lines.filter(**_date_range('sales_order__order_date', start, end))
+    if not include_cancelled:
+        lines = lines.exclude(sales_order__status=SalesOrder.Status.CANCELLED)
+    return lines.order_by()
+
+
+def _purchase_lines(start=None, end=None):
+    return (
+        scoped(PurchaseOrderItem.objects.all(), 'purchase_order__tenant')
+        .filter(**_date_range('purchase_order__order_date', start, end))
+        .exclude(purchase_order__status__in=[PurchaseOrder.Status.DRAFT, PurchaseOrder.Status.CANCELLED])
+        .order_by()
+    )
+
+
+# ============================================================================
+#  REPORTS
+# ============================================================================
+def revenue_by_day(start=None, end=None, **kwargs):
+    """Revenue, units and order count per calendar day."""
+    return list(
+        _sales_lines(start, end)
+        .annotate(day=TruncDate('sales_order__order_date'))
+        .values('day')
+        .annotate(revenue=LINE_TOTAL, units=Sum('quantity'), orders=Count('sales_order', distinct=True))
+        .order_by('day')
+    )
+
+
+def revenue_by_category(start=None, end=None, **kwargs):
+    """Revenue and units per product category, highest revenue first."""
+    return list(
+        _sales_lines(start, end)
+        .values(category=F('product__category__full_name'))
+        .annotate(revenue=LINE_TOTAL, units=Sum('quantity'))
+        .order_by('-revenue')
+    )
+
+
+def top_products(start=None, end=None, limit=DEFAULT_LIMIT, by='revenue', **kwargs):
+    """The best-selling products by revenue or by units."""
+    return list(
+        _sales_lines(start, end)
+        .values('product_id', name=F('product__name'), sku=F('product__sku'))
+        .annotate(revenue=LINE_TOTAL, units=Sum('quantity'))
+        .order_by(f'-{by}', 'product_id')[:limit]
+    )
+
+
+def supplier_spend(start=None, end=None, **kwargs):
+    """Purchase spend, units and order count per supplier, highest spend first."""
+    return list(
+        _purchase_lines(start, end)
+        .values(supplier_id=F('purchase_order__supplier_id'), supplier=F('purchase_order__supplier__name'))
+        .annotate(spend=LINE_TOTAL, units=Sum('quantity'), orders=Count('purchase_order', distinct=True))
+        .order_by('-spend')
+    )
+
+
+def sales_fill_rate(start=None, end=None, **kwargs):
+    """Share of ordered sales units and orders that have been fulfilled."""
+    fulfilled = Q(sales_order__status=SalesOrder.Status.FULFILLED)
+    totals = (
+        _sales_lines(start, end, include_cancelled=True)
+        .aggregate(
+            orders=Count('sales_order', distinct=True),
+            fulfilled_orders=Count('sales_order', distinct=True, filter=fulfilled),
+            cancelled_orders=Count('sales_order', distinct=True, filter=Q(sales_order__status=SalesOrder.Status.CANCELLED)),
+            units=Sum('quantity'),
+            fulfilled_units=Sum('quantity', filter=fulfilled),
+        )
+    )
+    return _with_rates(totals)
+
+
+def purchase_fill_rate(start=None, end=None, **kwargs):
+    """Share of ordered purchase units and orders that have been received."""
+    received = Q(purchase_order__status=PurchaseOrder.Status.RECEIVED)
+    totals = (
+        _purchase_lines(start, end)
+        .aggregate(
+            orders=Count('purchase_order', distinct=True),
+            fulfilled_orders=Count('purchase_order', distinct=True, filter=received),
+            units=Sum('quantity'),
+            fulfilled_units=Sum('quantity', filter=received),
+        )
+    )
+    return _with_rates(totals)
+
+
+def _with_rates(totals):
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals['order_fill_rate'] = round(totals['fulfilled_orders'] / totals['orders'], 4) if totals['orders'] else None
+    totals['unit_fill_rate'] = round(totals['fulfilled_units'] / totals['units'], 4) if totals['units'] else None
+    return totals
+
+
+REPORTS = {
+    'revenue-by-day': revenue_by_day,
+    'revenue-by-category': revenue_by_category,
+    'top-products': top_products,
+    'supplier-spend': supplier_spend,
+    'sales-fill-rate': sales_fill_rate,
+    'purchase-fill-rate': purchase_fill_rate,
+    'expiring-lots': expiring_lots,
+}
+
+
+# ============================================================================
+#  CACHED ENTRY POINT
+# ============================================================================
+def _accepted(report, params):
+    """The ``params`` that ``report`` takes by name, so the ones it ignores don't split its cache entries."""
+    names = inspect.signature(report).parameters
+    return {name: value for name, value in params.items() if name in names}
+
+
+def run_report(name, **params):
+    """Runs the named report, serving repeated requests from the cache."""
+    params = _accepted(REPORTS[name], params)
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = cache_key(f'reports:{name}:{digest}')
+    result = cache.get(key)
+    if result is None:
+        result = REPORTS[name](**params)
+        cache.set(key, result, inventory_settings.REPORTS_CACHE_TTL)
+    return result
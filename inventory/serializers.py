@@ -5,28 +5,52 @@ Defines how complex data, such as model instances, are converted to
 native Python datatypes for JSON rendering in the API.
 """
 
+import time
+
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import AuditLog
+from .analytics import DEFAULT_HISTORY_DAYS, DEFAULT_SERVICE_LEVEL, DEFAULT_REVIEW_DAYS
 from .models import (
     User, Supplier, Product, PurchaseOrder, PurchaseOrderItem, 
-    SalesOrder, SalesOrderItem, InventoryTransaction
+    SalesOrder, SalesOrderItem, InventoryTransaction, ValuationPeriod,
+    Location, StockLevel, ArchivedInventoryTransaction, ArchivedAuditLog, Job, Category
 )
+from .stock import Movement, InsufficientStock, apply_movements
+from .authentication import ISSUED_AT_CLAIM, is_revoked
+from .orders import refresh_order_totals
+from .lots import DEFAULT_EXPIRY_DAYS
+from .workflow import INITIAL_STATUSES
+from . import categories, identity, lots, tenancy
 
 # ============================================================================
 #  AUTHENTICATION AND USER MANAGEMENT SERIALIZERS
 # ============================================================================
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
-    """Customizes the JWT token to include user's role and username."""
+    """Customizes the JWT token to include user's role, username and tenant."""
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token['username'] = user.username
         token['role'] = user.role
+        token['tenant'] = user.tenant_id
+        token[ISSUED_AT_CLAIM] = time.time()
         return token
 
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses to refresh tokens issued before the user's tokens were revoked."""
+    def validate(self, attrs):
+        if is_revoked(RefreshToken(attrs['refresh'])):
+            raise InvalidToken("Token has been revoked.")
+        return super().validate(attrs)
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     """Serializer for new user registration."""
     password2 = serializers.CharField(style={'input_type': 'password'}, write_only=True)
@@ -95,18 +119,109 @@ class ChangePasswordSerializer(serializers.Serializer):
 # ============================================================================
 #  CORE MODEL SERIALIZERS (READ/WRITE)
 # ============================================================================
+class VersionedModelSerializer(serializers.ModelSerializer):
+    """Updates write only the fields that changed, with a compare-and-swap on the row's version."""
+    def update(self, instance, validated_data):
+        expected_version = validated_data.pop('expected_version', None)
+        changed = []
+        for name, value in validated_data.items():
+            field = instance._meta.get_field(name)
+            if field.is_relation:
+                current, value_key = getattr(instance, field.attname), getattr(value, 'pk', value)
+            else:
+                current, value_key = getattr(instance, name), value
+            if current != value_key:
+                setattr(instance, name, value)
+                changed.append(name)
+        # The version moves even when nothing changed, so a stale request still fails.
+        instance.save_versioned(changed, expected_version)
+        return instance
+
+
+class TenantRelatedField(serializers.PrimaryKeyRelatedField):
+    """A related object by primary key, limited to the request's tenant."""
+    def get_queryset(self):
+        return tenancy.scoped(super().get_queryset())
+
+
+class TenantUniqueValidator(UniqueValidator):
+    """A unique field checked only against the rows of the request's tenant."""
+    def filter_queryset(self, value, queryset, field_name):
+        return tenancy.scoped(super().filter_queryset(value, queryset, field_name))
+
+
 class SupplierSerializer(serializers.ModelSerializer):
     """Serializer for reading and writing Supplier data."""
     class Meta:
         model = Supplier
         fields = ['id', 'name', 'contact_info', 'email', 'phone']
+        extra_kwargs = {'email': {'validators': [TenantUniqueValidator(queryset=Supplier.objects.all())]}}
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    """Serializer for reading and writing Location data."""
+    class Meta:
+        model = Location
+        fields = ['id', 'name', 'code', 'is_active', 'is_default']
+        read_only_fields = ['is_default']
+        extra_kwargs = {'code': {'validators': [TenantUniqueValidator(queryset=Location.objects.all())]}}
+
+
+class StockLevelSerializer(serializers.ModelSerializer):
+    """Read-only serializer for the stock of a product at one location."""
+    class Meta:
+        model = StockLevel
+        fields = ['id', 'product', 'location', 'quantity']
+
+
+class CategorySerializer(serializers.ModelSerializer):
+    """Serializer for a category tree node and its stock rollups."""
+    serializer_related_field = TenantRelatedField
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'parent', 'full_name', 'path', 'depth', 'product_count', 'stock_quantity', 'stock_value']
+
+
+class CategoryNameField(serializers.CharField):
+    """A product's category as its full name (``"Electronics > Cables"``); unknown levels are created."""
+    def __init__(self, **kwargs):
+        super().__init__(max_length=1000, allow_blank=True, allow_null=True, required=False, **kwargs)
+
+    def to_representation(self, category):
+        return category.full_name
 
+    def run_validation(self, data=serializers.empty):
+        name = super().run_validation(data)
+        return categories.resolve(name) if name and categories.split_name(name) else None
 
-class ProductSerializer(serializers.ModelSerializer):
+
+class ProductSerializer(VersionedModelSerializer):
     """Serializer for reading and writing Product data."""
+    serializer_related_field = TenantRelatedField
+    category = CategoryNameField()
     class Meta:
         model = Product
-        fields = ['id', 'name', 'sku', 'category', 'unit_price', 'stock_quantity', 'min_stock_level','is_active']
+        fields = ['id', 'name', 'sku', 'category', 'category_id', 'unit_price', 'stock_quantity', 'min_stock_level','is_active',
+                  'deactivated_at', 'supplier', 'reorder_point', 'reorder_quantity', 'reorder_updated_at',
+                  'sales_velocity_7d', 'sales_velocity_30d', 'days_of_cover', 'velocity_updated_at', 'version']
+        read_only_fields = ['deactivated_at', 'reorder_point', 'reorder_quantity', 'reorder_updated_at',
+                            'sales_velocity_7d', 'sales_velocity_30d', 'days_of_cover', 'velocity_updated_at', 'version']
+        # SKUs stay reserved by soft-deleted products too.
+        extra_kwargs = {'sku': {'validators': [TenantUniqueValidator(queryset=Product.all_objects.all())]}}
+
+
+class ReorderPointRunSerializer(serializers.Serializer):
+    """Validates the parameters of a reorder point computation run."""
+    history_days = serializers.IntegerField(min_value=1, default=DEFAULT_HISTORY_DAYS)
+    service_level = serializers.FloatField(min_value=0.5, max_value=0.9999, default=DEFAULT_SERVICE_LEVEL)
+    review_days = serializers.IntegerField(min_value=1, default=DEFAULT_REVIEW_DAYS)
+    commit = serializers.BooleanField(default=True)
+
+
+class AutoReplenishSerializer(serializers.Serializer):
+    """Validates the options of an auto-replenishment run."""
+    commit = serializers.BooleanField(default=True)
+    background = serializers.BooleanField(default=False, help_text="Run as a background job and answer 202.")
 
 
 # ============================================================================
@@ -117,38 +232,100 @@ class PurchaseOrderItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     class Meta:
         model = PurchaseOrderItem
-        fields = ['id', 'product', 'quantity', 'unit_price']
+        fields = ['id', 'product', 'quantity', 'unit_price', 'lot_number', 'expiry_date']
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
-    """Read-only serializer for a complete Purchase Order."""
-    items = PurchaseOrderItemSerializer(many=True, read_only=True)
+class PurchaseOrderSummarySerializer(serializers.ModelSerializer):
+    """Read-only serializer for a Purchase Order header, without its lines."""
     supplier = SupplierSerializer(read_only=True)
     class Meta:
         model = PurchaseOrder
-        fields = ['id', 'supplier', 'order_date', 'status', 'items']
+        fields = ['id', 'supplier', 'location', 'order_date', 'received_date', 'status',
+                  'total_amount', 'line_count', 'total_quantity', 'version']
+        # Status only changes through the receive and transition actions.
+        read_only_fields = ['status', 'version']
+
+
+class PurchaseOrderSerializer(PurchaseOrderSummarySerializer):
+    """Read-only serializer for a complete Purchase Order."""
+    items = PurchaseOrderItemSerializer(many=True, read_only=True)
+    class Meta(PurchaseOrderSummarySerializer.Meta):
+        fields = PurchaseOrderSummarySerializer.Meta.fields + ['items']
+
+
+class ActiveProductField(serializers.PrimaryKeyRelatedField):
+    """An active product by primary key, looked up through the request's identity map."""
+    def __init__(self, **kwargs):
+        super().__init__(queryset=Product.objects.all(), **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = Product._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        product = identity.get(Product, pk)
+        if product is None or not product.is_active or not tenancy.owns(product):
+            self.fail('does_not_exist', pk_value=data)
+        return product
+
+
+class OrderLineListSerializer(serializers.ListSerializer):
+    """Loads every product the lines refer to with one query before the lines are validated."""
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            identity.prime(Product, [line.get('product') for line in data if isinstance(line, dict)])
+        return super().to_internal_value(data)
 
 
 class PurchaseOrderItemWriteSerializer(serializers.ModelSerializer):
     """Write-only serializer for creating items within a Purchase Order."""
+    product = ActiveProductField()
     class Meta:
         model = PurchaseOrderItem
-        fields = ['product', 'quantity', 'unit_price']
+        fields = ['product', 'quantity', 'unit_price', 'lot_number', 'expiry_date']
+        list_serializer_class = OrderLineListSerializer
+
+
+class OrderWriteSerializer(VersionedModelSerializer):
+    """
+    Creates an order with its lines, or edits the header of an existing one.
+
+    Lines are fixed once the order exists, and its status only changes
+    through the receive and transition actions.
+    """
+    serializer_related_field = TenantRelatedField
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance is not None:
+            self.fields['items'].required = False
+            self.fields['status'].read_only = True
+
+    def validate_items(self, value):
+        if self.instance is not None:
+            raise serializers.ValidationError("The lines of an existing order can't be changed.")
+        return value
 
 
-class PurchaseOrderWriteSerializer(serializers.ModelSerializer):
+class PurchaseOrderWriteSerializer(OrderWriteSerializer):
     """Write-only serializer for creating a complete Purchase Order."""
     items = PurchaseOrderItemWriteSerializer(many=True)
     class Meta:
         model = PurchaseOrder
-        fields = ['supplier', 'status', 'items']
+        fields = ['supplier', 'location', 'status', 'items', 'version']
+        read_only_fields = ['version']
+        extra_kwargs = {'status': {'choices': INITIAL_STATUSES[PurchaseOrder]}}
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         with transaction.atomic():
             purchase_order = PurchaseOrder.objects.create(**validated_data)
-            for item_data in items_data:
-                PurchaseOrderItem.objects.create(purchase_order=purchase_order, **item_data)
+            PurchaseOrderItem.objects.bulk_create([
+                PurchaseOrderItem(purchase_order=purchase_order, **item_data) for item_data in items_data
+            ])
+            refresh_order_totals(PurchaseOrder, [purchase_order.pk])
         return purchase_order
 
 
@@ -163,22 +340,33 @@ class SalesOrderItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'quantity', 'unit_price']
 
 
-class SalesOrderSerializer(serializers.ModelSerializer):
-    """Read-only serializer for a complete Sales Order."""
-    items = SalesOrderItemSerializer(many=True, read_only=True)
+class SalesOrderSummarySerializer(serializers.ModelSerializer):
+    """Read-only serializer for a Sales Order header, without its lines."""
     class Meta:
         model = SalesOrder
-        fields = ['id', 'customer_name', 'order_date', 'status', 'items']
+        fields = ['id', 'customer_name', 'location', 'order_date', 'status',
+                  'total_amount', 'line_count', 'total_quantity', 'version']
+        # Status only changes through the transition action.
+        read_only_fields = ['status', 'version']
+
+
+class SalesOrderSerializer(SalesOrderSummarySerializer):
+    """Read-only serializer for a complete Sales Order."""
+    items = SalesOrderItemSerializer(many=True, read_only=True)
+    class Meta(SalesOrderSummarySerializer.Meta):
+        fields = SalesOrderSummarySerializer.Meta.fields + ['items']
 
 
 class SalesOrderItemWriteSerializer(serializers.ModelSerializer):
     """Write-only serializer for creating items within a Sales Order."""
+    product = ActiveProductField()
     class Meta:
         model = SalesOrderItem
         fields = ['product', 'quantity', 'unit_price']
+        list_serializer_class = OrderLineListSerializer
 
 
-class SalesOrderWriteSerializer(serializers.ModelSerializer):
+class SalesOrderWriteSerializer(OrderWriteSerializer):
     """
     Write-only serializer for creating a Sales Order.
     Includes logic to deduct stock and log the transaction.
@@ -186,30 +374,54 @@ class SalesOrderWriteSerializer(serializers.ModelSerializer):
     items = SalesOrderItemWriteSerializer(many=True)
     class Meta:
         model = SalesOrder
-        fields = ['customer_name', 'status', 'items']
+        fields = ['customer_name', 'location', 'status', 'items', 'version']
+        read_only_fields = ['version']
+        extra_kwargs = {'status': {'choices': INITIAL_STATUSES[SalesOrder]}}
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         user = self.context['request'].user
+        location = validated_data.get('location') or Location.get_default()
+        validated_data['location'] = location
         with transaction.atomic():
             sales_order = SalesOrder.objects.create(**validated_data)
-            for item_data in items_data:
-                product = item_data['product']
-                quantity = item_data['quantity']
-                if product.stock_quantity < quantity:
-                    raise serializers.ValidationError(f"Not enough stock for {product.name}.")
-                SalesOrderItem.objects.create(sales_order=sales_order, **item_data)
-                product.stock_quantity -= quantity
-                product.save()
-                InventoryTransaction.objects.create(
-                    product=product,
-                    transaction_type=InventoryTransaction.TransactionType.SALE,
-                    quantity_change=-quantity,
-                    user=user
+            SalesOrderItem.objects.bulk_create([
+                SalesOrderItem(sales_order=sales_order, **item_data) for item_data in items_data
+            ])
+            refresh_order_totals(SalesOrder, [sales_order.pk])
+            try:
+                apply_movements(
+                    [Movement(item['product'].pk, location.pk, -item['quantity']) for item in items_data],
+                    InventoryTransaction.TransactionType.SALE,
+                    user=user,
                 )
+            except InsufficientStock as exc:
+                product = next(item['product'] for item in items_data if item['product'].pk == exc.product_id)
+                raise serializers.ValidationError(f"Not enough stock for {product.name}.")
+            lots.allocate(sales_order, [(item['product'].pk, item['quantity']) for item in items_data])
         return sales_order
 
 
+class OrderTransitionSerializer(serializers.Serializer):
+    """Validates a bulk status transition; the order model is passed in the context."""
+    status = serializers.ChoiceField(choices=[])
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=10_000)
+    from_status = serializers.ChoiceField(choices=[], required=False)
+    location = TenantRelatedField(queryset=Location.objects.filter(is_active=True), required=False)
+    background = serializers.BooleanField(default=False, help_text="Run as a background job and answer 202.")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        choices = self.context['model'].Status.choices
+        self.fields['status'].choices = choices
+        self.fields['from_status'].choices = choices
+
+    def validate(self, attrs):
+        if 'ids' not in attrs and 'from_status' not in attrs:
+            raise serializers.ValidationError("Give the order ids, a from_status, or both.")
+        return attrs
+
+
 # ============================================================================
 #  LOGGING SERIALIZERS
 # ============================================================================
@@ -219,7 +431,7 @@ class InventoryTransactionSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     class Meta:
         model = InventoryTransaction
-        fields = ['id', 'product', 'transaction_type', 'quantity_change', 'timestamp', 'user', 'reason']
+        fields = ['id', 'product', 'location', 'transaction_type', 'quantity_change', 'timestamp', 'user', 'reason']
 
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -227,4 +439,133 @@ class AuditLogSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     class Meta:
         model = AuditLog
-        fields = ['id', 'user', 'action', 'timestamp', 'object_repr']
\ No newline at end of file
+        fields = ['id', 'user', 'action', 'timestamp', 'object_repr']
+
+
+class ArchivedInventoryTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for reading archived transaction logs."""
+    class Meta:
+        model = ArchivedInventoryTransaction
+        fields = ['id', 'product_id', 'location_id', 'transaction_type', 'quantity_change', 'timestamp', 'user_id',
+                  'reason', 'archived_at']
+
+
+class ArchivedAuditLogSerializer(serializers.ModelSerializer):
+    """Serializer for reading archived audit logs."""
+    class Meta:
+        model = ArchivedAuditLog
+        fields = ['id', 'user_id', 'action', 'timestamp', 'object_repr', 'archived_at']
+
+
+# ============================================================================
+#  BACKGROUND JOB SERIALIZERS
+# ============================================================================
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for following a background job."""
+    percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'progress_done', 'progress_total', 'percent', 'message',
+                  'result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at']
+
+    def get_percent(self, obj):
+        if obj.status == Job.Status.SUCCEEDED:
+            return 100
+        return int(100 * obj.progress_done / obj.progress_total) if obj.progress_total else 0
+
+
+# ============================================================================
+#  VALUATION SERIALIZERS
+# ============================================================================
+class ValuationPeriodSerializer(serializers.ModelSerializer):
+    """Serializer for reading closed valuation periods."""
+    closed_by = UserSerializer(read_only=True)
+    class Meta:
+        model = ValuationPeriod
+        fields = ['id', 'method', 'period_end', 'closed_at', 'closed_by', 'quantity', 'inventory_value', 'cogs']
+
+
+class ValuationReportQuerySerializer(serializers.Serializer):
+    """Validates the query parameters of a valuation report."""
+    method = serializers.ChoiceField(choices=ValuationPeriod.Method.choices, default=ValuationPeriod.Method.FIFO)
+    as_of = serializers.DateField(required=False)
+    lines = serializers.BooleanField(default=False)
+
+
+class ClosePeriodSerializer(serializers.Serializer):
+    """Validates a request to close a valuation period."""
+    method = serializers.ChoiceField(choices=ValuationPeriod.Method.choices, default=ValuationPeriod.Method.FIFO)
+    period_end = serializers.DateField()
+
+
+
+# ============================================================================
+#  REPORT SERIALIZERS
+# ============================================================================
+class ReportQuerySerializer(serializers.Serializer):
+    """Validates the query parameters shared by all reports."""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    by = serializers.ChoiceField(choices=['revenue', 'units'], default='revenue')
+    days = serializers.IntegerField(min_value=0, max_value=365, default=DEFAULT_EXPIRY_DAYS,
+                                    help_text="How far ahead expiring-lots looks.")
+
+    def validate(self, data):
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise serializers.ValidationError({"end": "End date must not be before start date."})
+        return data
+
+
+
+# ============================================================================
+#  STOCK MOVEMENT SERIALIZERS
+# ============================================================================
+class ReceivedLotSerializer(serializers.Serializer):
+    """The lot number and expiry of one line as it arrived, when they weren't known when it was ordered."""
+    item = serializers.IntegerField(min_value=1)
+    lot_number = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    expiry_date = serializers.DateField(required=False, allow_null=True)
+
+
+class ReceivePurchaseOrderSerializer(serializers.Serializer):
+    """Validates the optional target location and lot details of a purchase order receipt."""
+    location = TenantRelatedField(queryset=Location.objects.filter(is_active=True), required=False)
+    lots = ReceivedLotSerializer(many=True, required=False)
+
+
+class StockTransferLineSerializer(serializers.Serializer):
+    """A single product line of a stock transfer."""
+    product = TenantRelatedField(queryset=Product.objects.all())
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockTransferSerializer(serializers.Serializer):
+    """Validates a transfer of stock between two locations."""
+    source = TenantRelatedField(queryset=Location.objects.filter(is_active=True))
+    destination = TenantRelatedField(queryset=Location.objects.filter(is_active=True))
+    items = StockTransferLineSerializer(many=True, allow_empty=False)
+    reason = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+    def validate(self, data):
+        if data['source'] == data['destination']:
+            raise serializers.ValidationError({"destination": "Source and destination must differ."})
+        return data
+
+
+
+# ============================================================================
+#  CYCLE COUNT SERIALIZERS
+# ============================================================================
+class ScanSerializer(serializers.Serializer):
+    """A single barcode scan: the SKU and the quantity counted on the shelf."""
+    sku = serializers.CharField(max_length=100)
+    counted_qty = serializers.IntegerField(min_value=0)
+
+
+class ScanBatchSerializer(serializers.Serializer):
+    """Validates a batch of cycle-count scans identified by a client batch id."""
+    batch_id = serializers.CharField(max_length=64)
+    location = TenantRelatedField(queryset=Location.objects.filter(is_active=True), required=False)
+    scans = ScanSerializer(many=True, allow_empty=False, max_length=20000)
@@ -1,8 +1,54 @@
-from django.db.models.signals import post_save
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
+from django.core.mail import send_mass_mail
 from django.conf import settings
-from .models import Product, User
+from .models import Product, User, Location, StockLevel, PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem
+from .orders import refresh_order_totals
+from .authentication import revoke_user_tokens
+from . import identity, tenancy
+
+
+# ============================================================================
+#  LOW STOCK ALERTS
+# ============================================================================
+def send_low_stock_alerts(products):
+    """
+    Emails the Admins and Managers of each tenant one digest of its products at or below their minimum level.
+
+    A batch of movements sends one message per tenant, all over one connection.
+    """
+    by_tenant = defaultdict(list)
+    for product in products:
+        if product.is_active and product.stock_quantity <= product.min_stock_level:
+            by_tenant[product.tenant_id].append(product)
+
+    messages = []
+    for tenant_id, low in by_tenant.items():
+        # Identify the tenant's Admins and Managers with valid email, once per request
+        recipient_emails = identity.memo(('low-stock-recipients', tenant_id), lambda: [
+            user.email for user in User.objects.filter(
+                tenant_id=tenant_id, role__in=[User.Role.ADMIN, User.Role.MANAGER],
+            ) if user.email
+        ])
+        if not recipient_emails:
+            continue
+
+        subject = f"Low Stock Alert: {low[0].name}" if len(low) == 1 else f"Low Stock Alert: {len(low)} products"
+        lines = [
+            f"- {product.name} (SKU: {product.sku}): {product.stock_quantity} in stock, minimum {product.min_stock_level}"
+            for product in low
+        ]
+        message = (
+            "The stock of these products is running low:\n\n" + "\n".join(lines) + "\n\n"
+            "Please create a purchase order to restock them."
+        )
+        messages.append((subject, message, settings.EMAIL_HOST_USER, recipient_emails))
+
+    if messages:
+        send_mass_mail(messages, fail_silently=False)
 
 
 # ============================================================================
@@ -10,29 +56,51 @@ from .models import Product, User
 # ============================================================================
 @receiver(post_save, sender=Product)
 def low_stock_alert(sender, instance, **kwargs):
+    send_low_stock_alerts([instance])
 
-    if instance.stock_quantity <= instance.min_stock_level:
 
-        # Identify all Admins and Managers with valid email
-        recipients = User.objects.filter(
-            role__in=[User.Role.ADMIN, User.Role.MANAGER]
-        )
-        recipient_emails = [user.email for user in recipients if user.email]
-        
-
-        if recipient_emails:
-            subject = f"Low Stock Alert: {instance.name}"
-            message = (
-                f"The stock for product '{instance.name}' (SKU: {instance.sku}) is running low.\n\n"
-                f"Current Stock: {instance.stock_quantity}\n"
-                f"Minimum Stock Level: {instance.min_stock_level}\n\n"
-                "Please create a purchase order to restock this item."
-            )
-            
-            send_mail(
-                subject,
-                message,
-                settings.EMAIL_HOST_USER,
-                recipient_emails,
-                fail_silently=False,
-            )
\ No newline at end of file
+# ============================================================================
+#  INITIAL STOCK SIGNAL
+# ============================================================================
+@receiver(post_save, sender=Product)
+def seed_default_stock_level(sender, instance, created, **kwargs):
+    """Places the opening stock of a new product at the default location."""
+    if created and instance.stock_quantity:
+        with tenancy.tenant_scope(instance.tenant_id):
+            location = Location.get_default()
+        StockLevel.objects.create(product=instance, location=location, quantity=instance.stock_quantity)
+
+
+# ============================================================================
+#  TOKEN REVOCATION SIGNALS
+# ============================================================================
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_credential_change(sender, instance, **kwargs):
+    """Revokes a user's tokens when the role, tenant, password or active flag embedded in them goes stale."""
+    if instance.pk is None:
+        return
+    previous = User.objects.filter(pk=instance.pk).values('role', 'tenant_id', 'password', 'is_active').first()
+    if previous and any(previous[field] != getattr(instance, field) for field in previous):
+        user_id = instance.pk
+        transaction.on_commit(lambda: revoke_user_tokens(user_id))
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user_tokens(user_id))
+
+
+# ============================================================================
+#  ORDER TOTALS SIGNALS
+# ============================================================================
+@receiver(post_save, sender=SalesOrderItem)
+@receiver(post_delete, sender=SalesOrderItem)
+def refresh_sales_order_totals(sender, instance, **kwargs):
+    refresh_order_totals(SalesOrder, [instance.sales_order_id])
+
+
+@receiver(post_save, sender=PurchaseOrderItem)
+@receiver(post_delete, sender=PurchaseOrderItem)
+def refresh_purchase_order_totals(sender, instance, **kwargs):
+    refresh_order_totals(PurchaseOrder, [instance.purchase_order_id])
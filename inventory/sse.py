@@ -0,0 +1,101 @@
+"""
+Server-sent events endpoint for live stock changes.
+
+``stock_events`` is a plain ASGI app mounted next to Django in
+``backend/asgi.py``, so an open stream costs one coroutine and a bounded
+queue instead of a worker thread. Browsers' ``EventSource`` can't send an
+Authorization header, so the access token comes in the ``token`` query
+parameter (the header is accepted too), and its ``tenant`` claim picks the
+events the stream receives. Idle streams get a comment line every
+``EVENT_KEEPALIVE`` seconds so proxies keep them open.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import is_refused
+from .conf import inventory_settings
+from .events import hub
+
+PATH = '/api/events/stock/'
+RETRY_MS = 5_000
+
+
+def _headers(scope):
+    return {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+
+def _token(scope, headers):
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[0]
+    if not token and headers.get('authorization', '').startswith('Bearer '):
+        token = headers['authorization'][len('Bearer '):]
+    return token
+
+
+async def _authenticate(scope, headers):
+    try:
+        token = AccessToken(_token(scope, headers))
+    except TokenError:
+        return None
+    return None if await sync_to_async(is_refused)(token) else token
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n".encode()
+
+
+async def _respond(send, status, headers, body=b'', more_body=False):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+# ============================================================================
+#  ASGI APP
+# ============================================================================
+async def stock_events(scope, receive, send):
+    headers = _headers(scope)
+    response_headers = []
+    origin = headers.get('origin')
+    if origin and origin in inventory_settings.CORS_ALLOWED_ORIGINS:
+        response_headers.append((b'access-control-allow-origin', origin.encode()))
+
+    if scope['method'] != 'GET':
+        return await _respond(send, 405, response_headers + [(b'allow', b'GET')])
+    token = await _authenticate(scope, headers)
+    if token is None:
+        body = json.dumps({'detail': 'A valid access token is required.'}).encode()
+        return await _respond(send, 401, response_headers + [(b'content-type', b'application/json')], body)
+
+    # Tokens without the claim predate tenancy and belong to the untenanted deployment.
+    subscription = hub.subscribe(tenant_id=token.get('tenant'))
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    keepalive = inventory_settings.EVENT_KEEPALIVE
+    try:
+        await _respond(send, 200, response_headers + [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ], f'retry: {RETRY_MS}\n\n'.encode(), more_body=True)
+        while not disconnect.done():
+            event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({event, disconnect}, timeout=keepalive, return_when=asyncio.FIRST_COMPLETED)
+            if event in done:
+                body = format_event(event.result())
+            else:
+                event.cancel()
+                body = b': keepalive\n\n'
+            if not disconnect.done():
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        hub.unsubscribe(subscription)
+        disconnect.cancel()
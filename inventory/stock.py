@@ -0,0 +1,173 @@
+"""
+Stock movement service for the inventory app.
+
+Every code path that changes stock goes through ``apply_movements`` so the
+per-location StockLevel rows, the denormalized Product.stock_quantity total,
+the category rollups, the lots and the InventoryTransaction ledger always
+change together. Movements are applied with a handful of set-based statements
+regardless of how many lines they contain.
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from . import identity
+from .categories import apply_stock_deltas
+from .events import publish_stock_changes
+from .lots import draw_down
+from .models import InventoryTransaction, Product, StockLevel
+from .signals import send_low_stock_alerts
+
+# ``reason`` optionally overrides the batch reason for a single movement.
+Movement = namedtuple('Movement', ['product_id', 'location_id', 'quantity', 'reason'], defaults=[None])
+
+
+class InsufficientStock(Exception):
+    """Raised when a movement would take a location's stock below zero."""
+    def __init__(self, product_id, location_id, available, requested):
+        self.product_id = product_id
+        self.location_id = location_id
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Product {product_id} has {available} units at location {location_id}, {requested} requested."
+        )
+
+
+def _delta_case(field, deltas):
+    """A CASE expression mapping each key of ``deltas`` on ``field`` to its delta."""
+    return Case(
+        *[When(**{field: key}, then=Value(delta)) for key, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+# ============================================================================
+#  MOVEMENTS
+# ============================================================================
+def apply_movements(movements, transaction_type, user=None, reason=''):
+    """
+    Applies a batch of stock movements atomically.
+
+    ``movements`` is an iterable of ``Movement(product_id, location_id, quantity)``
+    where quantity is positive for stock in and negative for stock out. The
+    affected stock levels are locked, checked so no location goes negative,
+    then updated with one UPDATE per location plus one for the product
+    totals, and every movement is written to the ledger with ``bulk_create``.
+    Stock events for the moved products are published once it commits.
+
+    Raises ``InsufficientStock`` (rolling everything back) when a location
+    does not hold enough stock. Returns the created transactions.
+    """
+    movements = [m for m in movements if m.quantity]
+    if not movements:
+        return []
+
+    level_deltas = defaultdict(int)
+    product_deltas = defaultdict(int)
+    for movement in movements:
+        level_deltas[(movement.product_id, movement.location_id)] += movement.quantity
+        product_deltas[movement.product_id] += movement.quantity
+    location_ids = {location_id for _, location_id in level_deltas}
+
+    with transaction.atomic():
+        StockLevel.objects.bulk_create(
+            [StockLevel(product_id=product_id, location_id=location_id) for product_id, location_id in level_deltas],
+            ignore_conflicts=True,
+        )
+        current = {
+            (product_id, location_id): quantity
+            for product_id, location_id, quantity in (
+                StockLevel.objects.select_for_update()
+                .filter(product_id__in=product_deltas, location_id__in=location_ids)
+                .order_by('product_id', 'location_id')
+                .values_list('product_id', 'location_id', 'quantity')
+            )
+        }
+        for (product_id, location_id), delta in level_deltas.items():
+            available = current.get((product_id, location_id), 0)
+            if available + delta < 0:
+                raise InsufficientStock(product_id, location_id, available, -delta)
+
+        for location_id in location_ids:
+            deltas = {p: d for (p, loc), d in level_deltas.items() if loc == location_id and d}
+            if deltas:
+                StockLevel.objects.filter(location_id=location_id, product_id__in=deltas).update(
+                    quantity=F('quantity') + _delta_case('product_id', deltas)
+                )
+
+        # Transfers cancel out per product and leave the global total alone.
+        totals = {product_id: delta for product_id, delta in product_deltas.items() if delta}
+        if totals:
+            Product.all_objects.filter(pk__in=totals).update(
+                stock_quantity=F('stock_quantity') + _delta_case('pk', totals), version=F('version') + 1,
+            )
+            apply_stock_deltas(totals)
+            identity.evict(Product, totals)
+        # Sales allocate their lots themselves; units adjusted away leave the lots here.
+        if transaction_type == InventoryTransaction.TransactionType.ADJUSTMENT:
+            written_off = {product_id: -delta for product_id, delta in totals.items() if delta < 0}
+            if written_off:
+                draw_down(written_off)
+
+        created = InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(
+                product_id=movement.product_id,
+                location_id=movement.location_id,
+                transaction_type=transaction_type,
+                quantity_change=movement.quantity,
+                user_id=getattr(user, 'pk', None),
+                reason=movement.reason or reason,
+            )
+            for movement in movements
+        ])
+
+        decreased = [product_id for product_id, delta in totals.items() if delta < 0]
+        if decreased:
+            # The default manager skips inactive products, which get no alerts.
+            low = list(Product.objects.filter(pk__in=decreased, stock_quantity__lte=F('min_stock_level')))
+            if low:
+                transaction.on_commit(lambda: send_low_stock_alerts(low))
+        # A failed publish must not surface as an error of the committed request.
+        transaction.on_commit(lambda: publish_stock_changes(level_deltas, set(decreased)), robust=True)
+    return created
+
+
+def transfer_stock(lines, source_id, destination_id, user=None, reason=''):
+    """
+    Moves stock between two locations in one atomic, set-based operation.
+
+    ``lines`` is an iterable of ``(product_id, quantity)`` pairs. Product
+    totals are unchanged; each line is logged as a pair of TRANSFER entries.
+    """
+    movements = []
+    for product_id, quantity in lines:
+        movements.append(Movement(product_id, source_id, -quantity))
+        movements.append(Movement(product_id, destination_id, quantity))
+    return apply_movements(movements, InventoryTransaction.TransactionType.TRANSFER, user=user, reason=reason)
+
+
+def reconcile_counts(counts, location_id, user=None, reason=''):
+    """
+    Sets the stock at one location to physically counted quantities.
+
+    ``counts`` maps product id to the counted quantity. The current levels
+    are locked before the deltas are computed so concurrent movements can't
+    slip in between; only products whose count differs produce an
+    ADJUSTMENT entry. Returns the created transactions.
+    """
+    with transaction.atomic():
+        current = dict(
+            StockLevel.objects.select_for_update()
+            .filter(location_id=location_id, product_id__in=counts)
+            .order_by('product_id')
+            .values_list('product_id', 'quantity')
+        )
+        movements = [
+            Movement(product_id, location_id, counted - current.get(product_id, 0))
+            for product_id, counted in counts.items()
+        ]
+        return apply_movements(movements, InventoryTransaction.TransactionType.ADJUSTMENT, user=user, reason=reason)
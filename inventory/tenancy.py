@@ -0,0 +1,114 @@
+"""
+Tenant partitioning for the inventory app.
+
+One deployment serves many customers. Users, suppliers, locations,
+products, orders, the ledger, audit logs, jobs and valuation periods carry
+a ``tenant`` key; rows without one belong to the single-customer setup the
+app started as, which keeps working unchanged. Order lines, stock levels
+and other child rows are partitioned through their parent.
+
+A request's tenant comes from the ``tenant`` claim of its access token.
+``TenantMiddleware`` opens a scope for every request, authentication fills
+it in, and background jobs run in the scope of the tenant that queued
+them. Within a scope:
+
+* ``scoped(queryset)`` keeps a queryset to the current tenant's rows,
+* new rows default to the current tenant, and
+* ``cache_key`` puts cache entries under a per-tenant prefix, so tenants
+  share one cache without seeing each other's entries.
+
+Outside a scope (the admin, the shell) nothing is filtered and new rows get
+no tenant. Management commands that read or create partitioned rows run
+once per tenant through ``each_tenant``.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+UNRESOLVED = object()
+_current = ContextVar('inventory_tenant', default=None)
+
+
+class TenantScope:
+    __slots__ = ('tenant_id',)
+
+    def __init__(self, tenant_id=UNRESOLVED):
+        self.tenant_id = tenant_id
+
+
+@contextmanager
+def tenant_scope(tenant_id=UNRESOLVED):
+    """Runs the block for ``tenant_id``; left unresolved, authentication fills it in."""
+    token = _current.set(TenantScope(tenant_id))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def activate(tenant_id):
+    """Sets the tenant of the current scope; called once the request is authenticated."""
+    scope = _current.get()
+    if scope is not None:
+        scope.tenant_id = tenant_id
+
+
+def is_scoped():
+    scope = _current.get()
+    return scope is not None and scope.tenant_id is not UNRESOLVED
+
+
+def current_tenant_id():
+    """The current tenant's id; None for untenanted rows or outside a scope."""
+    return _current.get().tenant_id if is_scoped() else None
+
+
+def each_tenant(slug=None):
+    """
+    Yields every tenant, then None for the untenanted rows, each inside its scope.
+
+    ``slug`` limits the run to one tenant; an unknown slug raises ValueError.
+    """
+    from .models import Tenant
+
+    tenants = Tenant.objects.order_by('pk')
+    if slug is None:
+        tenants = [*tenants, None]
+    else:
+        tenants = list(tenants.filter(slug=slug))
+        if not tenants:
+            raise ValueError(f"No tenant with the slug {slug!r}.")
+    for tenant in tenants:
+        with tenant_scope(tenant.pk if tenant else None):
+            yield tenant
+
+
+# ============================================================================
+#  QUERIES AND CACHE KEYS
+# ============================================================================
+def scoped(queryset, field='tenant'):
+    """``queryset`` restricted to the current tenant through ``field``; unchanged outside a scope."""
+    if not is_scoped():
+        return queryset
+    return queryset.filter(**{field: current_tenant_id()})
+
+
+def owns(instance):
+    """Whether ``instance`` belongs to the current tenant; always true outside a scope."""
+    return not is_scoped() or instance.tenant_id == current_tenant_id()
+
+
+def cache_key(key):
+    """``key`` under the current tenant's cache prefix."""
+    return f'tenant:{current_tenant_id() or 0}:{key}'
+
+
+# ============================================================================
+#  VIEWS
+# ============================================================================
+class TenantScopedMixin:
+    """Restricts a viewset's queryset to the tenant of the request; ``tenant_field`` is the path to the tenant."""
+    tenant_field = 'tenant'
+
+    def get_queryset(self):
+        return scoped(super().get_queryset(), self.tenant_field)
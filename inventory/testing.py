@@ -0,0 +1,113 @@
+"""
+Test helpers for the inventory app.
+
+Factories create large datasets with a handful of bulk INSERTs instead of
+one ``save()`` per row, and ``PerformanceAssertionsMixin`` turns query
+counts and timings into assertions. Nothing here touches process-wide
+state, so test cases using them stay safe under ``manage.py test --parallel``.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import InventoryTransaction, Location, Product, StockLevel, User
+
+# Multiplies every timing budget; raise it on slow CI machines.
+TIME_FACTOR = float(os.environ.get('INVENTORY_TEST_TIME_FACTOR', '1'))
+
+
+# ============================================================================
+#  FACTORIES
+# ============================================================================
+def make_products(count, prefix='BULK', stock_quantity=0, unit_price=5, location=None, **fields):
+    """Creates ``count`` products (SKUs ``<prefix>-0`` upwards) and their opening stock levels."""
+    skus = [f'{prefix}-{i}' for i in range(count)]
+    # Product.save() keeps deactivated_at in step with is_active; bulk_create doesn't call it.
+    fields.setdefault('deactivated_at', None if fields.get('is_active', True) else timezone.now())
+    Product.objects.bulk_create([
+        Product(name=f'{prefix} product {i}', sku=sku, stock_quantity=stock_quantity, unit_price=unit_price, **fields)
+        for i, sku in enumerate(skus)
+    ])
+    # bulk_create skips post_save, so seed the stock levels the signal would have.
+    products = list(Product.all_objects.filter(sku__in=skus).order_by('id'))
+    if stock_quantity:
+        location = location or Location.get_default()
+        StockLevel.objects.bulk_create([
+            StockLevel(product=product, location=location, quantity=stock_quantity) for product in products
+        ])
+    return products
+
+
+def make_users(count, prefix='user', role='Staff', password='password123'):
+    """Creates ``count`` users sharing one password hash."""
+    password = make_password(password)
+    usernames = [f'{prefix}{i}' for i in range(count)]
+    User.objects.bulk_create([
+        User(username=username, email=f'{username}@test.com', role=role, password=password) for username in usernames
+    ])
+    return list(User.objects.filter(username__in=usernames).order_by('id'))
+
+
+def make_sales_history(products, days, quantity=1, end=None):
+    """Records a sale of ``quantity`` per product on each of the ``days`` days before ``end``."""
+    end = end or timezone.now()
+    for day in range(days):
+        last_id = InventoryTransaction.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(product=product, transaction_type='Sale', quantity_change=-quantity)
+            for product in products
+        ])
+        # auto_now_add stamps the rows; ids follow insertion, so the new ones are those past last_id.
+        InventoryTransaction.objects.filter(id__gt=last_id).update(timestamp=end - timedelta(days=day, hours=1))
+
+
+# ============================================================================
+#  PERFORMANCE ASSERTIONS
+# ============================================================================
+class PerformanceAssertionsMixin:
+    """Query-count and timing assertions for ``TestCase`` subclasses."""
+
+    def _sql(self, queries):
+        return '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(queries, start=1))
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        """Fails when the block runs more than ``limit`` queries."""
+        with CaptureQueriesContext(connections[using]) as queries:
+            yield queries
+        if len(queries) > limit:
+            self.fail(f'{len(queries)} queries executed, at most {limit} expected:\n{self._sql(queries)}')
+
+    def assertQueryCountConstant(self, func, sizes, using=DEFAULT_DB_ALIAS):
+        """
+        Fails unless ``func(size)`` runs the same number of queries for every size; returns the queries.
+
+        Warm process-wide caches (content types, say) first, or the first size pays for loading them.
+        """
+        runs = {}
+        for size in sizes:
+            with CaptureQueriesContext(connections[using]) as queries:
+                func(size)
+            runs[size] = queries.captured_queries
+        counts = {size: len(queries) for size, queries in runs.items()}
+        if len(set(counts.values())) > 1:
+            largest = max(sizes)
+            self.fail(f'Query count grows with size {counts}; queries for {largest}:\n{self._sql(runs[largest])}')
+        return runs
+
+    @contextmanager
+    def assertFasterThan(self, ms):
+        """Fails when the block takes longer than ``ms`` milliseconds, times INVENTORY_TEST_TIME_FACTOR."""
+        budget = ms * TIME_FACTOR
+        started = time.perf_counter()
+        yield
+        elapsed = (time.perf_counter() - started) * 1000
+        if elapsed > budget:
+            self.fail(f'Took {elapsed:.0f} ms, budget {budget:.0f} ms.')
@@ -1,29 +1,75 @@
-from django.test import TestCase
+import asyncio
+import io
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core import mail
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import User, Product, Supplier, PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem, InventoryTransaction
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import (
+    User, Product, Supplier, PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem, InventoryTransaction,
+    Location, StockLevel, ScanBatch, IdempotencyKey, ArchivedProduct, ArchivedInventoryTransaction,
+    AuditLog, ArchivedAuditLog, Checkpoint, Job, Tenant, Category, Lot, ValuationPeriod
+)
+from .analytics import compute_reorder_points, update_sales_velocity
+from .replenishment import generate_purchase_orders
+from .valuation import valuation_report, close_period
+from .middleware import WriteConcurrencyLimitMiddleware
+from .archive import archive_inactive_products, apply_retention
+from .jobs import HANDLERS, claim_next, requeue_stale_jobs, run_job, work
+from .events import hub, publish
+from .sse import PATH as STOCK_EVENTS_PATH, stock_events
+from .conf import inventory_settings
+from .renderers import COLUMNAR_MEDIA_TYPE, from_columns
+from .stock import Movement, apply_movements
+from .categories import move, resolve
+from .querylog import fingerprint, slow_query_log
+from .tenancy import cache_key, tenant_scope
+from .testing import PerformanceAssertionsMixin, make_products, make_sales_history
 
 # ============================================================================
 #  COMPREHENSIVE API TEST CASES
 # ============================================================================
-class ComprehensiveAPITests(TestCase):
+class ComprehensiveAPITests(PerformanceAssertionsMixin, TestCase):
 
     # ============================================================================
     #  SETUP
     # ============================================================================
-    def setUp(self):
-        """Set up the necessary objects for all tests."""
+    @classmethod
+    def setUpTestData(cls):
+        """Create the users and catalogue shared by every test, once per class."""
         # Create users with different roles
-        self.admin_user = User.objects.create_superuser(
+        cls.admin_user = User.objects.create_superuser(
             username='testadmin', password='password123', role='Admin', email='admin@test.com'
         )
-        self.manager_user = User.objects.create_user(
+        cls.manager_user = User.objects.create_user(
             username='testmanager', password='password123', role='Manager', email='manager@test.com'
         )
-        self.staff_user = User.objects.create_user(
+        cls.staff_user = User.objects.create_user(
             username='teststaff', password='password123', role='Staff', email='staff@test.com'
         )
 
+        # Create initial data
+        cls.supplier = Supplier.objects.create(name="Test Supplier", email="supplier@test.com", phone="12345")
+        cls.product = Product.objects.create(name="Test Keyboard", sku="KEY-001", stock_quantity=100, unit_price=50.00)
+
+    def setUp(self):
+        """Set up the per-test state: an empty cache and fresh API clients."""
+        # Throttle buckets live in the cache; start every test with them full.
+        cache.clear()
+
         # Create API clients
         self.client = APIClient()  # Unauthenticated client
         self.manager_client = APIClient()
@@ -32,10 +78,6 @@ class ComprehensiveAPITests(TestCase):
         # Authenticate clients
         self.manager_client.force_authenticate(user=self.manager_user)
         self.staff_client.force_authenticate(user=self.staff_user)
-        
-        # Create initial data
-        self.supplier = Supplier.objects.create(name="Test Supplier", email="supplier@test.com", phone="12345")
-        self.product = Product.objects.create(name="Test Keyboard", sku="KEY-001", stock_quantity=100, unit_price=50.00)
 
     # ============================================================================
     #  AUTHENTICATION AND ROLES TESTS
@@ -154,4 +196,1117 @@ class ComprehensiveAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Check that all returned transactions are of type 'Sale'
         for transaction in response.data:
-            self.assertEqual(transaction['transaction_type'], 'Sale')
\ No newline at end of file
+            self.assertEqual(transaction['transaction_type'], 'Sale')
+
+    # ============================================================================
+    #  REORDER POINT ANALYTICS TESTS
+    # ============================================================================
+    def test_reorder_points_from_sales_history(self):
+        """Reorder points combine daily demand with the observed PO lead time."""
+        now = timezone.now()
+        for day in range(10):
+            txn = InventoryTransaction.objects.create(
+                product=self.product, transaction_type='Sale', quantity_change=-3
+            )
+            InventoryTransaction.objects.filter(pk=txn.pk).update(timestamp=now - timedelta(days=day, hours=1))
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status='Received')
+        PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=10, unit_price=40.00)
+        PurchaseOrder.objects.filter(pk=po.pk).update(order_date=now - timedelta(days=6), received_date=now - timedelta(days=2))
+        idle = Product.objects.create(name="Idle Cable", sku="CAB-001", stock_quantity=5, unit_price=5.00)
+
+        summary = compute_reorder_points(history_days=10, review_days=30)
+        self.assertEqual(summary['products'], 2)
+        self.assertEqual(summary['products_with_demand'], 1)
+
+        self.product.refresh_from_db()
+        idle.refresh_from_db()
+        self.assertEqual(self.product.reorder_point, 12)
+        self.assertEqual(self.product.reorder_quantity, 90)
+        self.assertEqual(idle.reorder_point, 0)
+
+    def test_reorder_point_endpoint_requires_manager(self):
+        """Only managers and admins may trigger a reorder point run."""
+        response = self.staff_client.post('/api/reorder-points/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.manager_client.post('/api/reorder-points/', {'commit': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['committed'])
+
+    # ============================================================================
+    #  AUTOMATIC REPLENISHMENT TESTS
+    # ============================================================================
+    def test_auto_replenish_nets_open_orders_and_groups_by_supplier(self):
+        """Low-stock products become draft POs per supplier, minus what is already on order."""
+        other_supplier = Supplier.objects.create(name="Other Supplier", email="other@test.com", phone="999")
+        mouse = Product.objects.create(name="Mouse", sku="MOU-001", stock_quantity=2, min_stock_level=10, unit_price=15.00, supplier=self.supplier)
+        cable = Product.objects.create(name="Cable", sku="CAB-002", stock_quantity=0, min_stock_level=5, unit_price=3.00, supplier=other_supplier)
+        covered = Product.objects.create(name="Covered", sku="COV-001", stock_quantity=1, min_stock_level=10, unit_price=9.00, supplier=self.supplier)
+        open_po = PurchaseOrder.objects.create(supplier=self.supplier, status='Shipped')
+        PurchaseOrderItem.objects.create(purchase_order=open_po, product=mouse, quantity=4, unit_price=11.00)
+        PurchaseOrderItem.objects.create(purchase_order=open_po, product=covered, quantity=50, unit_price=7.00)
+
+        response = self.manager_client.post('/api/purchase-orders/auto-replenish/', {'commit': 'maybe'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.manager_client.post('/api/purchase-orders/auto-replenish/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['suppliers'], 2)
+
+        drafts = PurchaseOrder.objects.filter(status='Draft')
+        self.assertEqual(drafts.count(), 2)
+        mouse_line = PurchaseOrderItem.objects.get(purchase_order__status='Draft', product=mouse)
+        self.assertEqual(mouse_line.quantity, 10 + 10 - (2 + 4))
+        self.assertEqual(mouse_line.unit_price, 11)
+        self.assertEqual(PurchaseOrderItem.objects.get(purchase_order__status='Draft', product=cable).quantity, 10)
+        self.assertFalse(PurchaseOrderItem.objects.filter(purchase_order__status='Draft', product=covered).exists())
+
+        # Drafts count as on order, so a second run creates nothing.
+        self.assertEqual(generate_purchase_orders()['lines'], 0)
+
+    # ============================================================================
+    #  INVENTORY VALUATION TESTS
+    # ============================================================================
+    def _received_po(self, quantity, unit_price, received_at):
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status='Received')
+        PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=quantity, unit_price=unit_price)
+        PurchaseOrder.objects.filter(pk=po.pk).update(order_date=received_at - timedelta(days=1), received_date=received_at)
+        return po
+
+    def _sale(self, quantity, sold_at):
+        so = SalesOrder.objects.create(customer_name="Valuation Customer")
+        SalesOrderItem.objects.create(sales_order=so, product=self.product, quantity=quantity, unit_price=50.00)
+        SalesOrder.objects.filter(pk=so.pk).update(order_date=sold_at)
+        return so
+
+    def test_fifo_and_average_valuation(self):
+        """FIFO consumes the oldest layer first; weighted average blends them."""
+        now = timezone.now()
+        self._received_po(10, '5.00', now - timedelta(days=5))
+        self._received_po(10, '7.00', now - timedelta(days=4))
+        self._sale(15, now - timedelta(days=3))
+
+        fifo = valuation_report(now, 'FIFO')
+        self.assertEqual(fifo['cogs'], 85)
+        self.assertEqual(fifo['inventory_value'], 35)
+        self.assertEqual(fifo['quantity'], 5)
+
+        average = valuation_report(now, 'AVERAGE')
+        self.assertEqual(average['cogs'], 90)
+        self.assertEqual(average['inventory_value'], 30)
+
+    def test_closed_period_is_resumed_incrementally(self):
+        """Reports after a closed period start from its layers and only count later COGS."""
+        now = timezone.now()
+        self._received_po(10, '5.00', now - timedelta(days=10))
+        self._received_po(10, '7.00', now - timedelta(days=9))
+        close_period(now - timedelta(days=8), 'FIFO', user=self.manager_user)
+        self._sale(12, now - timedelta(days=2))
+
+        report = valuation_report(now, 'FIFO')
+        self.assertEqual(report['cogs'], 10 * 5 + 2 * 7)
+        self.assertEqual(report['inventory_value'], 8 * 7)
+        with self.assertRaises(ValueError):
+            close_period(now - timedelta(days=9), 'FIFO')
+
+    def test_valuation_endpoints(self):
+        """Managers can read the valuation report and close periods over the API."""
+        response = self.manager_client.get('/api/valuation/?method=AVERAGE&lines=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['lines'], [])
+        response = self.manager_client.post('/api/valuation/periods/', {'period_end': '2020-01-31'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.manager_client.post('/api/valuation/periods/', {'period_end': '2020-01-15'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.staff_client.get('/api/valuation/').status_code, status.HTTP_403_FORBIDDEN)
+
+    # ============================================================================
+    #  SALES AND PURCHASING REPORT TESTS
+    # ============================================================================
+    def test_reports_aggregate_sales_and_purchases(self):
+        """Reports aggregate line totals in the database and skip cancelled sales."""
+        cache.clear()
+        mouse = Product.objects.create(name="Mouse", sku="MOU-002", category=resolve("Peripherals"), unit_price=15.00)
+        fulfilled = SalesOrder.objects.create(customer_name="A", status='Fulfilled')
+        SalesOrderItem.objects.create(sales_order=fulfilled, product=self.product, quantity=2, unit_price=50.00)
+        SalesOrderItem.objects.create(sales_order=fulfilled, product=mouse, quantity=10, unit_price=15.00)
+        pending = SalesOrder.objects.create(customer_name="B")
+        SalesOrderItem.objects.create(sales_order=pending, product=mouse, quantity=1, unit_price=15.00)
+        cancelled = SalesOrder.objects.create(customer_name="C", status='Cancelled')
+        SalesOrderItem.objects.create(sales_order=cancelled, product=self.product, quantity=100, unit_price=50.00)
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status='Received')
+        PurchaseOrderItem.objects.create(purchase_order=po, product=mouse, quantity=20, unit_price=9.50)
+
+        response = self.manager_client.get('/api/reports/top-products/?limit=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['sku'] for row in response.data['results']], ['MOU-002'])
+        self.assertEqual(response.data['results'][0]['revenue'], 165)
+
+        by_day = self.manager_client.get('/api/reports/revenue-by-day/').data['results']
+        self.assertEqual(by_day[0]['revenue'], 265)
+        self.assertEqual(by_day[0]['orders'], 2)
+
+        spend = self.manager_client.get('/api/reports/supplier-spend/').data['results']
+        self.assertEqual(spend[0]['spend'], 190)
+
+        fill = self.manager_client.get('/api/reports/sales-fill-rate/').data['results']
+        self.assertEqual(fill['orders'], 3)
+        self.assertEqual(fill['fulfilled_orders'], 1)
+        self.assertEqual(fill['cancelled_orders'], 1)
+
+        # Repeated requests are served from the cache without touching the database.
+        with self.assertNumQueries(0):
+            self.manager_client.get('/api/reports/top-products/?limit=1')
+            # Parameters a report ignores don't give it another cache entry.
+            self.manager_client.get('/api/reports/revenue-by-day/?limit=5&by=units&days=7')
+
+    def test_report_validation_and_permissions(self):
+        """Unknown reports 404, inverted date ranges 400 and staff are forbidden."""
+        self.assertEqual(self.manager_client.get('/api/reports/no-such-report/').status_code, status.HTTP_404_NOT_FOUND)
+        response = self.manager_client.get('/api/reports/revenue-by-day/?start=2025-02-01&end=2025-01-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.staff_client.get('/api/reports/revenue-by-day/').status_code, status.HTTP_403_FORBIDDEN)
+
+    # ============================================================================
+    #  LOCATION AND STOCK LEVEL TESTS
+    # ============================================================================
+    def test_new_product_stock_starts_at_default_location(self):
+        """Opening stock lands at the default location so totals and levels agree."""
+        level = StockLevel.objects.get(product=self.product)
+        self.assertTrue(level.location.is_default)
+        self.assertEqual(level.quantity, self.product.stock_quantity)
+
+    def test_location_aware_receive_sale_and_transfer(self):
+        """Receipts, sales and transfers move per-location stock and keep the global total in sync."""
+        main = Location.get_default()
+        east = Location.objects.create(name="East Depot", code="EAST")
+        po = PurchaseOrder.objects.create(supplier=self.supplier)
+        PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=30, unit_price=40.00)
+
+        response = self.manager_client.post(f'/api/purchase-orders/{po.id}/receive/', {'location': east.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['items'][0]['product']['stock_quantity'], 130)
+        self.assertEqual(StockLevel.objects.get(product=self.product, location=east).quantity, 30)
+        self.assertTrue(InventoryTransaction.objects.filter(location=east, transaction_type='Purchase').exists())
+
+        # East only holds 30 units, even though 130 exist in total.
+        so_data = {"customer_name": "East Customer", "location": east.id,
+                   "items": [{"product": self.product.id, "quantity": 31, "unit_price": "50.00"}]}
+        response = self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.manager_client.post('/api/stock-transfers/', {
+            'source': main.id, 'destination': east.id,
+            'items': [{'product': self.product.id, 'quantity': 40}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(StockLevel.objects.get(product=self.product, location=main).quantity, 60)
+        self.assertEqual(StockLevel.objects.get(product=self.product, location=east).quantity, 70)
+
+        so_data['items'][0]['quantity'] = 70
+        response = self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 60)
+        self.assertEqual(sum(StockLevel.objects.filter(product=self.product).values_list('quantity', flat=True)), 60)
+
+    def test_transfer_cannot_overdraw_source(self):
+        """A transfer larger than the source stock is rejected and changes nothing."""
+        east = Location.objects.create(name="East Depot", code="EAST")
+        response = self.manager_client.post('/api/stock-transfers/', {
+            'source': east.id, 'destination': Location.get_default().id,
+            'items': [{'product': self.product.id, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(InventoryTransaction.objects.filter(transaction_type='Transfer').exists())
+
+    # ============================================================================
+    #  CYCLE COUNT BATCH TESTS
+    # ============================================================================
+    def test_scan_batch_adjusts_stock_idempotently(self):
+        """Scans become ADJUSTMENT entries once, however often the batch is posted."""
+        mouse = Product.objects.create(name="Mouse", sku="MOU-003", stock_quantity=10, unit_price=15.00)
+        payload = {
+            'batch_id': 'count-2025-06-01-a',
+            'scans': [
+                {'sku': 'KEY-001', 'counted_qty': 90},
+                {'sku': 'MOU-003', 'counted_qty': 12},
+                {'sku': 'MOU-003', 'counted_qty': 14},
+                {'sku': 'NOPE-404', 'counted_qty': 3},
+            ],
+        }
+        response = self.manager_client.post('/api/stock-adjustments/batch/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['adjusted'], 2)
+        self.assertEqual(response.data['net_change'], -10 + 4)
+        self.assertEqual(response.data['unknown_skus'], ['NOPE-404'])
+
+        retry = self.manager_client.post('/api/stock-adjustments/batch/', payload, format='json')
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data, response.data)
+
+        self.product.refresh_from_db()
+        mouse.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 90)
+        self.assertEqual(mouse.stock_quantity, 14)
+        self.assertEqual(InventoryTransaction.objects.filter(transaction_type='Adjustment').count(), 2)
+        self.assertEqual(ScanBatch.objects.count(), 1)
+
+    def test_product_stock_edit_is_logged_as_adjustment(self):
+        """Editing stock_quantity through the product API leaves a ledger entry."""
+        response = self.manager_client.patch(f'/api/products/{self.product.id}/', {'stock_quantity': 80}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_quantity'], 80)
+        self.assertTrue(InventoryTransaction.objects.filter(
+            product=self.product, transaction_type='Adjustment', quantity_change=-20).exists())
+
+    # ============================================================================
+    #  IDEMPOTENCY KEY TESTS
+    # ============================================================================
+    def test_idempotent_sales_order_retry_replays_response(self):
+        """A retried create with the same Idempotency-Key returns the first order without selling twice."""
+        so_data = {
+            "customer_name": "Retrying Customer",
+            "items": [{"product": self.product.id, "quantity": 5, "unit_price": self.product.unit_price}]
+        }
+        first = self.staff_client.post('/api/sales-orders/', so_data, format='json', HTTP_IDEMPOTENCY_KEY='so-123')
+        retry = self.staff_client.post('/api/sales-orders/', so_data, format='json', HTTP_IDEMPOTENCY_KEY='so-123')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(SalesOrder.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 95)
+
+        so_data['items'][0]['quantity'] = 6
+        reused = self.staff_client.post('/api/sales-orders/', so_data, format='json', HTTP_IDEMPOTENCY_KEY='so-123')
+        self.assertEqual(reused.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_idempotent_receive_and_failed_attempts_are_not_stored(self):
+        """A receive retry replays the 200; a rejected request leaves its key free."""
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status='Pending')
+        PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=20, unit_price=40.00)
+        url = f'/api/purchase-orders/{po.id}/receive/'
+        first = self.manager_client.post(url, HTTP_IDEMPOTENCY_KEY='po-recv-1')
+        retry = self.manager_client.post(url, HTTP_IDEMPOTENCY_KEY='po-recv-1')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 120)
+        # Returned, not raised: the order is already received.
+        again = self.manager_client.post(url, HTTP_IDEMPOTENCY_KEY='po-recv-2')
+        self.assertEqual(again.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key='po-recv-2').exists())
+
+        too_many = {"customer_name": "Greedy", "items": [{"product": self.product.id, "quantity": 500, "unit_price": 1}]}
+        response = self.staff_client.post('/api/sales-orders/', too_many, format='json', HTTP_IDEMPOTENCY_KEY='so-fail')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key='so-fail').exists())
+
+    # ============================================================================
+    #  THROTTLING AND LOAD SHEDDING TESTS
+    # ============================================================================
+    def test_login_is_throttled_per_ip(self):
+        """Login attempts beyond the bucket size get a 429 with Retry-After."""
+        rest_framework = dict(settings.REST_FRAMEWORK)
+        rest_framework['DEFAULT_THROTTLE_RATES'] = {**rest_framework['DEFAULT_THROTTLE_RATES'], 'login': '3/hour'}
+        credentials = {'username': 'teststaff', 'password': 'wrong'}
+        with self.settings(REST_FRAMEWORK=rest_framework):
+            for _ in range(3):
+                response = self.client.post('/api/token/', credentials, format='json')
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.client.post('/api/token/', credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(WRITE_CONCURRENCY_LIMIT=1, WRITE_RETRY_AFTER=3)
+    def test_write_concurrency_limit_sheds_with_503(self):
+        """A write arriving while the ceiling is reached is rejected; reads still pass."""
+        factory = RequestFactory()
+        inner = {}
+
+        def get_response(request):
+            if not inner:
+                inner['write'] = middleware(factory.post('/api/sales-orders/'))
+                inner['read'] = middleware(factory.get('/api/products/'))
+            return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+        middleware = WriteConcurrencyLimitMiddleware(get_response)
+        outer = middleware(factory.post('/api/sales-orders/'))
+        self.assertEqual(outer.status_code, 201)
+        self.assertEqual(inner['write'].status_code, 503)
+        self.assertEqual(inner['write']['Retry-After'], '3')
+        self.assertEqual(inner['read'].status_code, 200)
+        self.assertEqual(middleware.in_flight, 0)
+
+    # ============================================================================
+    #  STATELESS JWT TESTS
+    # ============================================================================
+    def test_jwt_requests_skip_the_user_lookup(self):
+        """Permission checks run from token claims without selecting the user row."""
+        tokens = self.client.post('/api/token/', {'username': 'testmanager', 'password': 'password123'}, format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/suppliers/', {'name': 'Acme', 'email': 'acme@test.com', 'phone': '1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user_selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'FROM "inventory_user"' in q['sql']]
+        # Authentication, the role check and the audit log all work from the user id.
+        self.assertEqual(user_selects, [])
+        self.assertEqual(client.get('/api/users/me/').data['username'], 'testmanager')
+
+    def test_role_change_revokes_existing_tokens(self):
+        """Tokens carrying a stale role are refused, and can't be refreshed either."""
+        tokens = self.client.post('/api/token/', {'username': 'testmanager', 'password': 'password123'}, format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(client.get('/api/products/').status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.manager_user.role = User.Role.STAFF
+            self.manager_user.save()
+        self.assertEqual(client.get('/api/products/').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_right_after_a_revocation_is_accepted(self):
+        """Revocation covers tokens issued before it, not a new login in the same second."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.manager_user.role = User.Role.STAFF
+            self.manager_user.save()
+        tokens = self.client.post('/api/token/', {'username': 'testmanager', 'password': 'password123'}, format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(client.get('/api/products/').status_code, status.HTTP_200_OK)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(STATELESS_JWT=None)
+    def test_process_local_cache_falls_back_to_the_user_lookup(self):
+        """Without a shared cache another worker's revocation is unseen, so role and activity come from the database."""
+        client = self._token_client('testmanager')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.manager_user.role = User.Role.STAFF
+            self.manager_user.save()
+        # As seen from a worker whose cache never got the revocation.
+        cache.clear()
+        response = client.post('/api/suppliers/', {'name': 'Acme', 'email': 'acme@test.com', 'phone': '1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        User.objects.filter(pk=self.manager_user.pk).update(is_active=False)
+        self.assertEqual(client.get('/api/products/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # ============================================================================
+    #  SOFT DELETE AND ARCHIVE TESTS
+    # ============================================================================
+    def test_deleting_a_product_deactivates_it(self):
+        """DELETE soft-deletes: the product disappears from the API but keeps its row and SKU."""
+        response = self.manager_client.delete(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        product = Product.all_objects.get(pk=self.product.pk)
+        self.assertFalse(product.is_active)
+        self.assertIsNotNone(product.deactivated_at)
+        self.assertFalse(Product.objects.filter(pk=product.pk).exists())
+        self.assertEqual(self.staff_client.get('/api/dashboard-stats/').data['total_products'], 0)
+
+        so_data = {"customer_name": "Late", "items": [{"product": product.id, "quantity": 1, "unit_price": 1}]}
+        self.assertEqual(self.staff_client.post('/api/sales-orders/', so_data, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        duplicate = {'name': 'Again', 'sku': 'KEY-001', 'unit_price': '1.00'}
+        self.assertEqual(self.manager_client.post('/api/products/', duplicate, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archive_moves_long_inactive_products_and_old_transactions(self):
+        """Unreferenced products are archived whole; ones with order history keep their row."""
+        long_ago = timezone.now() - timedelta(days=400)
+        sold = self.product
+        unsold = Product.objects.create(name="Old Cable", sku="CAB-009", unit_price=3.00)
+        for product in (sold, unsold):
+            InventoryTransaction.objects.create(product=product, transaction_type='Adjustment', quantity_change=0)
+        InventoryTransaction.objects.update(timestamp=long_ago)
+        order = SalesOrder.objects.create(customer_name="Past Customer")
+        SalesOrderItem.objects.create(sales_order=order, product=sold, quantity=1, unit_price=50)
+        Product.all_objects.filter(pk__in=[sold.pk, unsold.pk]).update(is_active=False, deactivated_at=long_ago, stock_quantity=0)
+        StockLevel.objects.all().delete()
+
+        summary = archive_inactive_products(inactive_days=365, chunk_size=1)
+        self.assertEqual(summary, {'candidates': 2, 'transactions_archived': 2, 'products_archived': 1})
+        self.assertFalse(InventoryTransaction.objects.exists())
+        self.assertEqual(ArchivedInventoryTransaction.objects.count(), 2)
+        self.assertTrue(Product.all_objects.filter(pk=sold.pk).exists())
+        archived = ArchivedProduct.objects.get(pk=unsold.pk)
+        self.assertEqual(archived.sku, 'CAB-009')
+        self.assertEqual(archived.data['unit_price'], '3.00')
+
+    # ============================================================================
+    #  RETENTION TESTS
+    # ============================================================================
+    def test_retention_archives_old_rows_in_resumable_chunks(self):
+        """Old transactions move to the archive table across interrupted runs and stay readable."""
+        for change in (1, 2, 3):
+            InventoryTransaction.objects.create(product=self.product, transaction_type='Adjustment', quantity_change=change)
+        recent = InventoryTransaction.objects.create(product=self.product, transaction_type='Adjustment', quantity_change=4)
+        InventoryTransaction.objects.exclude(pk=recent.pk).update(timestamp=timezone.now() - timedelta(days=800))
+
+        first = apply_retention('transactions', months=24, chunk_size=1, max_chunks=2)
+        self.assertEqual(first['archived'], 2)
+        self.assertEqual(Checkpoint.objects.get(name='retention:transactions').position,
+                         ArchivedInventoryTransaction.objects.order_by('-pk').first().pk)
+        second = apply_retention('transactions', months=24, chunk_size=1)
+        self.assertEqual(second['archived'], 1)
+        self.assertEqual(list(InventoryTransaction.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(Checkpoint.objects.get(name='retention:transactions').position, 0)
+
+        response = self.manager_client.get('/api/archive/transactions/', {'product_id': self.product.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['quantity_change'] for row in response.data], [3, 2, 1])
+        self.assertEqual(self.staff_client.get('/api/archive/transactions/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retention_can_archive_to_jsonl_files(self):
+        """The JSONL target writes one gzipped file per id range and empties the table."""
+        entry = AuditLog.objects.create(
+            user=self.manager_user, action='CREATED', content_type_id=1, object_id=self.product.id, object_repr='x')
+        AuditLog.objects.update(timestamp=timezone.now() - timedelta(days=400))
+        with tempfile.TemporaryDirectory() as archive_dir:
+            summary = apply_retention('audit-logs', months=12, target='jsonl', archive_dir=archive_dir)
+            self.assertEqual(summary['archived'], 1)
+            path = f'{archive_dir}/audit-logs/audit-logs-{entry.pk:012d}-{entry.pk:012d}.jsonl.gz'
+            with gzip.open(path, 'rt') as archive_file:
+                rows = [json.loads(line) for line in archive_file]
+        self.assertEqual(rows[0]['id'], entry.pk)
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertFalse(ArchivedAuditLog.objects.exists())
+
+    # ============================================================================
+    #  ORDER TOTALS TESTS
+    # ============================================================================
+    def test_order_lists_use_stored_totals(self):
+        """Order headers carry their totals; lines are nested only on retrieve or ?expand=items."""
+        so_data = {
+            "customer_name": "Totals Customer",
+            "items": [{"product": self.product.id, "quantity": 3, "unit_price": "50.00"},
+                      {"product": self.product.id, "quantity": 2, "unit_price": "45.50"}]
+        }
+        self.assertEqual(self.staff_client.post('/api/sales-orders/', so_data, format='json').status_code, status.HTTP_201_CREATED)
+        order = SalesOrder.objects.get()
+        self.assertEqual((order.total_amount, order.line_count, order.total_quantity), (Decimal('241.00'), 2, 5))
+
+        listing = self.staff_client.get('/api/sales-orders/').data
+        self.assertEqual(listing[0]['total_amount'], '241.00')
+        self.assertNotIn('items', listing[0])
+        self.assertEqual(len(self.staff_client.get('/api/sales-orders/', {'expand': 'items'}).data[0]['items']), 2)
+        self.assertEqual(len(self.staff_client.get(f'/api/sales-orders/{order.id}/').data['items']), 2)
+
+        # Single line writes outside the API keep the header in step too.
+        po = PurchaseOrder.objects.create(supplier=self.supplier)
+        line = PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=4, unit_price=10)
+        po.refresh_from_db()
+        self.assertEqual((po.total_amount, po.line_count, po.total_quantity), (Decimal('40.00'), 1, 4))
+        line.delete()
+        po.refresh_from_db()
+        self.assertEqual((po.total_amount, po.line_count, po.total_quantity), (Decimal('0.00'), 0, 0))
+
+    # ============================================================================
+    #  ORDER STATUS WORKFLOW TESTS
+    # ============================================================================
+    def test_bulk_cancel_restores_stock_and_skips_fulfilled_orders(self):
+        """Cancelling sales orders in bulk puts their lines back; orders past the point of no return are skipped."""
+        for customer in ("Alpha", "Beta", "Gamma"):
+            so_data = {"customer_name": customer,
+                       "items": [{"product": self.product.id, "quantity": 10, "unit_price": "50.00"}]}
+            self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        ids = list(SalesOrder.objects.order_by('pk').values_list('pk', flat=True))
+        SalesOrder.objects.filter(pk=ids[2]).update(status=SalesOrder.Status.FULFILLED)
+
+        response = self.staff_client.post('/api/sales-orders/transition/', {"status": "Cancelled", "ids": ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['transitioned'], response.data['skipped']), (ids[:2], ids[2:]))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 90)
+        self.assertTrue(InventoryTransaction.objects.filter(reason=f'Cancelled SO-{ids[0]}', quantity_change=10).exists())
+
+        # Status can't be patched around the workflow, and a cancelled order stays cancelled.
+        self.staff_client.patch(f'/api/sales-orders/{ids[0]}/', {"status": "Pending"}, format='json')
+        self.assertEqual(SalesOrder.objects.get(pk=ids[0]).status, SalesOrder.Status.CANCELLED)
+        response = self.staff_client.post('/api/sales-orders/transition/', {"status": "Fulfilled", "ids": [ids[0]]}, format='json')
+        self.assertEqual(response.data['skipped'], [ids[0]])
+
+    def test_bulk_receive_purchase_orders_by_status(self):
+        """Shipped purchase orders can be received together; drafts and cancelled orders can't be received."""
+        shipped = []
+        for _ in range(2):
+            po = PurchaseOrder.objects.create(supplier=self.supplier, status=PurchaseOrder.Status.SHIPPED)
+            PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=5, unit_price=40)
+            shipped.append(po.id)
+        draft = PurchaseOrder.objects.create(supplier=self.supplier, status=PurchaseOrder.Status.DRAFT)
+
+        data = {"status": "Received", "from_status": "Shipped"}
+        self.assertEqual(self.staff_client.post('/api/purchase-orders/transition/', data, format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        response = self.manager_client.post('/api/purchase-orders/transition/', data, format='json')
+        self.assertEqual((response.data['transitioned'], response.data['transactions']), (shipped, 2))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 110)
+        self.assertTrue(PurchaseOrder.objects.get(pk=shipped[0]).received_date)
+
+        response = self.manager_client.post(f'/api/purchase-orders/{draft.id}/receive/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.manager_client.post('/api/purchase-orders/transition/', {"status": "Cancelled", "ids": [draft.id]}, format='json')
+        self.assertEqual(PurchaseOrder.objects.get(pk=draft.id).status, PurchaseOrder.Status.CANCELLED)
+
+    # ============================================================================
+    #  BACKGROUND JOB TESTS
+    # ============================================================================
+    @override_settings(JOB_INLINE_LINE_LIMIT=1)
+    def test_large_receive_runs_as_a_background_job(self):
+        """Receiving a large order answers 202 with a job that a worker runs and reports on."""
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status=PurchaseOrder.Status.SHIPPED)
+        other = Product.objects.create(name="Test Mouse", sku="MOU-001", stock_quantity=0, unit_price=10)
+        PurchaseOrderItem.objects.create(purchase_order=po, product=self.product, quantity=5, unit_price=40)
+        PurchaseOrderItem.objects.create(purchase_order=po, product=other, quantity=7, unit_price=8)
+
+        response = self.manager_client.post(f'/api/purchase-orders/{po.id}/receive/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Location'], f"/api/jobs/{response.data['id']}/")
+        self.assertEqual(PurchaseOrder.objects.get(pk=po.pk).status, PurchaseOrder.Status.SHIPPED)
+
+        call_command('runjobs', '--once', stdout=io.StringIO())
+        job = self.manager_client.get(response['Location']).data
+        self.assertEqual((job['status'], job['percent'], job['result']['transitioned']), ('Succeeded', 100, [po.id]))
+        self.assertEqual(PurchaseOrder.objects.get(pk=po.pk).status, PurchaseOrder.Status.RECEIVED)
+        other.refresh_from_db()
+        self.assertEqual(other.stock_quantity, 7)
+        # Jobs are private to whoever queued them, apart from admins and managers.
+        self.assertEqual(self.staff_client.get(response['Location']).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_running_jobs_are_requeued_then_failed(self):
+        """A job whose worker stopped reporting goes back to the queue until it runs out of attempts."""
+        stale = timezone.now() - timedelta(hours=1)
+        retry = Job.objects.create(kind='auto_replenish', status=Job.Status.RUNNING, attempts=1, heartbeat_at=stale)
+        give_up = Job.objects.create(kind='auto_replenish', status=Job.Status.RUNNING, attempts=3, heartbeat_at=stale)
+        Job.objects.create(kind='auto_replenish', status=Job.Status.RUNNING, attempts=1, heartbeat_at=timezone.now())
+
+        self.assertEqual(requeue_stale_jobs(), (1, 1))
+        self.assertEqual(Job.objects.get(pk=retry.pk).status, Job.Status.QUEUED)
+        self.assertEqual(Job.objects.get(pk=give_up.pk).status, Job.Status.FAILED)
+
+    def test_workers_recover_stale_jobs_without_overwriting_their_retry(self):
+        """A running worker requeues stale jobs; a run given up on can't record an outcome over its retry."""
+        orphan = Job.objects.create(kind='auto_replenish', status=Job.Status.RUNNING, attempts=1, worker='gone:1',
+                                    heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(work(once=True), 1)
+        orphan.refresh_from_db()
+        self.assertEqual((orphan.status, orphan.attempts), (Job.Status.SUCCEEDED, 2))
+
+        def requeued_meanwhile(job):
+            Job.objects.filter(pk=job.pk).update(status=Job.Status.QUEUED, worker='')
+            return {'stale': True}
+        HANDLERS['requeued_meanwhile'] = requeued_meanwhile
+        self.addCleanup(HANDLERS.pop, 'requeued_meanwhile')
+        queued = Job.objects.create(kind='requeued_meanwhile')
+        self.assertFalse(run_job(claim_next('slow:1')))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.result), (Job.Status.QUEUED, None))
+
+    # ============================================================================
+    #  LIVE STOCK EVENT TESTS
+    # ============================================================================
+    def test_stock_movements_publish_events_after_commit(self):
+        """A committed sale publishes the product's new stock and a low-stock event to open streams."""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = hub.subscribe(maxsize=10, loop=loop)
+        self.addCleanup(hub.unsubscribe, subscription)
+
+        so_data = {"customer_name": "Live Customer",
+                   "items": [{"product": self.product.id, "quantity": 95, "unit_price": "50.00"}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        loop.run_until_complete(asyncio.sleep(0))
+        events = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        self.assertEqual([event['type'] for event in events], ['stock', 'low_stock'])
+        self.assertEqual(events[0]['data']['stock_quantity'], 5)
+
+        # A subscriber that falls behind gets its backlog replaced by one resync event.
+        for _ in range(11):
+            publish('stock', {'product': self.product.id})
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait()['type'], 'resync')
+
+    def test_stock_event_stream_requires_a_token(self):
+        """The ASGI stream refuses requests without a valid access token and relays published events."""
+        async def request(query_string):
+            sent, disconnected = [], asyncio.Event()
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+            async def send(message):
+                sent.append(message)
+                if len(sent) == 2 and message.get('more_body'):
+                    publish('stock', {'product': self.product.id, 'stock_quantity': 42})
+                elif len(sent) == 3:
+                    disconnected.set()
+            scope = {'type': 'http', 'method': 'GET', 'path': STOCK_EVENTS_PATH,
+                     'query_string': query_string, 'headers': []}
+            await asyncio.wait_for(stock_events(scope, receive, send), timeout=5)
+            return sent
+
+        self.assertEqual(asyncio.run(request(b'token=nope'))[0]['status'], 401)
+        sent = asyncio.run(request(f'token={AccessToken.for_user(self.staff_user)}'.encode()))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn(b'event: stock\ndata: {"product": ', sent[2]['body'])
+        self.assertFalse(hub.has_subscribers())
+
+    # ============================================================================
+    #  COLD START TESTS
+    # ============================================================================
+    def test_inventory_settings_snapshot_follows_overrides(self):
+        """Settings are read once and cached, but a changed setting is picked up."""
+        self.assertEqual(inventory_settings.JOB_STALE_AFTER, settings.JOB_STALE_AFTER)
+        with override_settings(JOB_STALE_AFTER=5):
+            self.assertEqual(inventory_settings.JOB_STALE_AFTER, 5)
+        self.assertEqual(inventory_settings.JOB_STALE_AFTER, settings.JOB_STALE_AFTER)
+        with self.assertRaises(AttributeError):
+            inventory_settings.NOT_A_SETTING
+
+    def test_api_profile_starts_without_admin_or_numpy(self):
+        """A cold start of the API-only profile neither installs the admin nor imports NumPy."""
+        output = io.StringIO()
+        call_command('benchmark_cold_start', 'backend.settings_api', runs=1, stdout=output)
+        self.assertIn('admin installed: False, numpy loaded: False', output.getvalue())
+
+    # ============================================================================
+    #  QUERY COUNT TESTS
+    # ============================================================================
+    def _token_client(self, username):
+        tokens = self.client.post('/api/token/', {'username': username, 'password': 'password123'}, format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        return client
+
+    def test_sales_order_query_count_does_not_grow_with_lines(self):
+        """Products are loaded once per request, whatever the number of lines."""
+        client = self._token_client('teststaff')
+        products = make_products(6, prefix='CAB', stock_quantity=50)
+
+        def create(lines):
+            so_data = {"customer_name": "Counted", "items": [
+                {"product": product.id, "quantity": 1, "unit_price": "5.00"} for product in products[:lines]
+            ]}
+            self.assertEqual(client.post('/api/sales-orders/', so_data, format='json').status_code, status.HTTP_201_CREATED)
+
+        large = [q['sql'] for q in self.assertQueryCountConstant(create, [1, 6])[6]]
+        # Order validation, the low-stock check and the category rollup lookup.
+        self.assertEqual(len([sql for sql in large if 'FROM "inventory_product"' in sql and sql.startswith('SELECT')]), 3)
+        self.assertFalse([sql for sql in large if 'FROM "inventory_user"' in sql])
+        # Inactive products are still refused.
+        products[0].deactivate()
+        response = client.post('/api/sales-orders/', {"customer_name": "Late", "items": [
+            {"product": products[0].id, "quantity": 1, "unit_price": "5.00"}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_receive_query_count_does_not_grow_with_lines(self):
+        """Receiving reads the order and its lines a fixed number of times."""
+        client = self._token_client('testmanager')
+        products = make_products(6, prefix='TON')
+        location = Location.get_default()
+        orders = {}
+        for lines in (1, 6):
+            orders[lines] = PurchaseOrder.objects.create(supplier=self.supplier, location=location)
+            PurchaseOrderItem.objects.bulk_create([
+                PurchaseOrderItem(purchase_order=orders[lines], product=product, quantity=2, unit_price=3)
+                for product in products[:lines]
+            ])
+
+        def receive(lines):
+            response = client.post(f'/api/purchase-orders/{orders[lines].id}/receive/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The audit log's content type is cached per process; load it so both runs start warm.
+        ContentType.objects.get_for_model(PurchaseOrder)
+        self.assertQueryCountConstant(receive, [1, 6])
+
+    # ============================================================================
+    #  TEST HARNESS TESTS
+    # ============================================================================
+    def test_product_list_stays_flat_over_a_large_catalogue(self):
+        """Bulk factories build a large catalogue cheaply, and listing it costs a fixed number of queries."""
+        products = make_products(500, stock_quantity=20)
+        make_sales_history(products[:50], days=3)
+        self.assertEqual(StockLevel.objects.filter(product__sku__startswith='BULK-').count(), 500)
+        self.assertEqual(InventoryTransaction.objects.filter(product__in=products[:50]).count(), 150)
+
+        with self.assertMaxQueries(4), self.assertFasterThan(2000):
+            response = self.staff_client.get('/api/products/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # ============================================================================
+    #  SALES VELOCITY TESTS
+    # ============================================================================
+    def test_sales_velocity_is_updated_incrementally_from_a_watermark(self):
+        """The first run covers every product; later runs only revisit products with new entries."""
+        fast, slow, idle = make_products(3, prefix='VEL', stock_quantity=60)
+        make_sales_history([fast], days=10, quantity=3)
+        make_sales_history([slow], days=2, quantity=3)
+
+        summary = update_sales_velocity()
+        self.assertTrue(summary['full'])
+        fast.refresh_from_db()
+        idle.refresh_from_db()
+        self.assertEqual(fast.sales_velocity_7d, Decimal('3.00'))
+        self.assertEqual(fast.sales_velocity_30d, Decimal('1.00'))
+        self.assertEqual(fast.days_of_cover, Decimal('60.0'))
+        self.assertIsNone(idle.days_of_cover)
+
+        self.assertEqual(update_sales_velocity()['products_refreshed'], 0)
+        self.staff_client.post('/api/sales-orders/', {"customer_name": "Rush", "items": [
+            {"product": slow.id, "quantity": 30, "unit_price": "5.00"}]}, format='json')
+        summary = update_sales_velocity()
+        self.assertFalse(summary['full'])
+        self.assertEqual(summary['products_refreshed'], 1)
+        slow.refresh_from_db()
+        self.assertEqual(slow.sales_velocity_30d, Decimal('1.20'))
+        self.assertEqual(slow.days_of_cover, Decimal('25.0'))
+
+        response = self.staff_client.get('/api/products/', {'days_of_cover__lte': 30, 'ordering': 'days_of_cover'})
+        self.assertEqual([p['sku'] for p in response.data], ['VEL-1'])
+
+    def test_sales_velocity_picks_up_entries_committed_under_the_watermark(self):
+        """An entry whose id is below the watermark but that committed after the last run is still counted."""
+        product, = make_products(1, prefix='LATE', stock_quantity=60)
+        update_sales_velocity()
+        self.staff_client.post('/api/sales-orders/', {"customer_name": "Late", "items": [
+            {"product": product.id, "quantity": 30, "unit_price": "5.00"}]}, format='json')
+        # As if the last run had already read a higher id while the sale was still uncommitted.
+        Checkpoint.objects.filter(name='sales_velocity').update(
+            position=InventoryTransaction.objects.order_by('-id').values_list('id', flat=True)[0])
+
+        self.assertEqual(update_sales_velocity()['products_refreshed'], 1)
+        product.refresh_from_db()
+        self.assertEqual(product.sales_velocity_30d, Decimal('1.00'))
+
+    # ============================================================================
+    #  RESPONSE FORMAT TESTS
+    # ============================================================================
+    def test_large_responses_are_gzipped_and_small_ones_are_not(self):
+        """Lists over the size threshold are compressed for clients that accept it."""
+        make_products(50)
+        response = self.staff_client.get('/api/products/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 51)
+        self.assertFalse(self.staff_client.get('/api/products/').has_header('Content-Encoding'))
+        small = self.staff_client.get(f'/api/products/{self.product.id}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_columnar_lists_round_trip_to_the_json_rows(self):
+        """The columnar representation sends each key once and decodes to the same rows."""
+        apply_movements([Movement(self.product.id, Location.get_default().id, -2)], 'Sale', user=self.staff_user)
+        apply_movements([Movement(self.product.id, Location.get_default().id, 5)], 'Adjustment')
+        for url in ('/api/products/', '/api/transactions/'):
+            rows = json.loads(self.staff_client.get(url).content)
+            response = self.staff_client.get(url, HTTP_ACCEPT=COLUMNAR_MEDIA_TYPE)
+            self.assertEqual(response['Content-Type'], COLUMNAR_MEDIA_TYPE)
+            self.assertIn('Accept', response['Vary'])
+            self.assertEqual(from_columns(json.loads(response.content)), rows)
+        # The ledger entry without a user becomes a null in the nested user table.
+        self.assertEqual(json.loads(response.content)['columns']['user']['nulls'], [0])
+
+    # ============================================================================
+    #  TENANCY TESTS
+    # ============================================================================
+    def _tenant_client(self, slug):
+        """A manager of a new tenant, signed in through the token endpoint, and one product of theirs."""
+        tenant = Tenant.objects.create(name=slug.title(), slug=slug)
+        User.objects.create_user(username=f'{slug}-manager', password='password123', role='Manager',
+                                 email=f'manager@{slug}.test', tenant=tenant)
+        product = Product.objects.create(name=f'{slug} widget', sku=f'{slug.upper()}-1', stock_quantity=10,
+                                         unit_price=5, tenant=tenant)
+        tokens = self.client.post('/api/token/', {'username': f'{slug}-manager', 'password': 'password123'},
+                                  format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        return tenant, product, client
+
+    def test_tenants_only_see_and_use_their_own_rows(self):
+        """Lists, the dashboard and order lines are limited to the tenant in the access token."""
+        acme, acme_product, acme_client = self._tenant_client('acme')
+        globex, globex_product, globex_client = self._tenant_client('globex')
+
+        self.assertEqual([p['sku'] for p in acme_client.get('/api/products/').data], ['ACME-1'])
+        self.assertEqual(acme_client.get('/api/dashboard-stats/').data['total_products'], 1)
+        self.assertEqual(acme_client.get(f'/api/products/{globex_product.id}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(StockLevel.objects.get(product=acme_product).location.tenant, acme)
+
+        line = {"quantity": 1, "unit_price": "5.00"}
+        response = acme_client.post('/api/sales-orders/', {"customer_name": "Cross", "items": [
+            {**line, "product": globex_product.id}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = acme_client.post('/api/sales-orders/', {"customer_name": "Own", "items": [
+            {**line, "product": acme_product.id}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SalesOrder.objects.get(customer_name='Own').tenant, acme)
+        self.assertEqual(globex_client.get('/api/sales-orders/').data, [])
+
+        with tenant_scope(acme.pk):
+            acme_key = cache_key('reports:x')
+        with tenant_scope(globex.pk):
+            self.assertNotEqual(cache_key('reports:x'), acme_key)
+
+    def test_maintenance_commands_run_once_per_tenant(self):
+        """Commands create each tenant's orders and periods in that tenant, never as untenanted rows."""
+        acme, acme_product, acme_client = self._tenant_client('acme')
+        globex, globex_product, _ = self._tenant_client('globex')
+        for tenant, product in ((acme, acme_product), (globex, globex_product)):
+            product.supplier = Supplier.objects.create(name=f"{tenant.name} Supply", email=f"po@{tenant.slug}.test",
+                                                       tenant=tenant)
+            product.min_stock_level = 50
+            product.save()
+
+        call_command('replenish_stock', stdout=io.StringIO())
+        self.assertEqual(sorted(PurchaseOrder.objects.values_list('tenant__slug', flat=True)), ['acme', 'globex'])
+        self.assertEqual(len(acme_client.get('/api/purchase-orders/').data), 1)
+
+        call_command('inventory_valuation', '--close', '--as-of', '2030-01-31', stdout=io.StringIO())
+        periods = ValuationPeriod.objects.values_list('tenant__slug', flat=True)
+        self.assertEqual(sorted(map(str, periods)), ['None', 'acme', 'globex'])
+        call_command('compute_reorder_points', '--tenant', 'acme', stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command('replenish_stock', '--tenant', 'nope', stdout=io.StringIO())
+
+    def test_codes_are_unique_within_a_tenant_only(self):
+        """Two tenants can use the same SKU, supplier email and location code; one tenant can't reuse its own."""
+        _, _, acme_client = self._tenant_client('acme')
+        _, _, globex_client = self._tenant_client('globex')
+        rows = {
+            '/api/products/': {'name': 'Mouse', 'sku': 'MOUSE-1', 'stock_quantity': 1, 'unit_price': 5},
+            '/api/suppliers/': {'name': 'Parts Co', 'email': 'orders@parts.test', 'phone': '1'},
+            '/api/locations/': {'name': 'Back room', 'code': 'BACK'},
+        }
+        for url, data in rows.items():
+            self.assertEqual(acme_client.post(url, data, format='json').status_code, status.HTTP_201_CREATED)
+            self.assertEqual(globex_client.post(url, data, format='json').status_code, status.HTTP_201_CREATED)
+            self.assertEqual(acme_client.post(url, data, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = globex_client.post('/api/stock-adjustments/batch/', {
+            'batch_id': 'b1', 'scans': [{'sku': 'MOUSE-1', 'counted_qty': 3}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Product.all_objects.get(sku='MOUSE-1', tenant__slug='globex').stock_quantity, 3)
+        self.assertEqual(Product.all_objects.get(sku='MOUSE-1', tenant__slug='acme').stock_quantity, 1)
+
+    def test_low_stock_alerts_are_one_digest_per_batch(self):
+        """A count that leaves several products low emails the tenant's managers once, listing them all."""
+        acme, acme_product, acme_client = self._tenant_client('acme')
+        Product.objects.create(name='acme gadget', sku='ACME-2', stock_quantity=10, unit_price=5, tenant=acme)
+        mail.outbox.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = acme_client.post('/api/stock-adjustments/batch/', {'batch_id': 'b1', 'scans': [
+                {'sku': 'ACME-1', 'counted_qty': 2}, {'sku': 'ACME-2', 'counted_qty': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['manager@acme.test'])
+        self.assertIn('ACME-1', mail.outbox[0].body)
+        self.assertIn('ACME-2', mail.outbox[0].body)
+
+    def test_scan_batch_ids_are_not_shared_between_tenants(self):
+        """A batch id another tenant already used is applied as a new batch, not answered with theirs."""
+        _, acme_product, acme_client = self._tenant_client('acme')
+        _, globex_product, globex_client = self._tenant_client('globex')
+        response = acme_client.post('/api/stock-adjustments/batch/', {
+            'batch_id': 'b1', 'scans': [{'sku': acme_product.sku, 'counted_qty': 7}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = globex_client.post('/api/stock-adjustments/batch/', {
+            'batch_id': 'b1', 'scans': [{'sku': globex_product.sku, 'counted_qty': 4}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['net_change'], -6)
+        globex_product.refresh_from_db()
+        self.assertEqual(globex_product.stock_quantity, 4)
+
+    def test_stock_events_are_delivered_to_their_tenant_only(self):
+        """A stream subscribed for one tenant ignores another tenant's stock events."""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = hub.subscribe(maxsize=10, loop=loop, tenant_id=1)
+        self.addCleanup(hub.unsubscribe, subscription)
+
+        publish('stock', {'product': 1}, tenant_id=1)
+        publish('stock', {'product': 2}, tenant_id=2)
+        publish('stock', {'product': 3})
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait()['data'], {'product': 1})
+
+    # ============================================================================
+    #  OPTIMISTIC CONCURRENCY TESTS
+    # ============================================================================
+    def test_product_edits_are_compare_and_swap_on_the_version(self):
+        """Edits send the version as If-Match; a stale one answers 412 and only changed columns are written."""
+        url = f'/api/products/{self.product.id}/'
+        response = self.manager_client.get(url)
+        self.assertEqual((response['ETag'], response.data['version']), ('"1"', 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.manager_client.patch(url, {'name': 'Renamed'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+        update = next(q['sql'] for q in queries if q['sql'].startswith('UPDATE "inventory_product"'))
+        self.assertIn('"name"', update)
+        self.assertNotIn('"unit_price"', update)
+
+        # A sale moves the version on, so an edit based on the earlier read is refused.
+        so_data = {"customer_name": "Racer", "items": [{"product": self.product.id, "quantity": 1, "unit_price": "50.00"}]}
+        self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        response = self.manager_client.put(url, {'name': 'Stale', 'sku': 'KEY-001', 'unit_price': '50.00',
+                                                 'stock_quantity': 100}, format='json', HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.name, self.product.stock_quantity, self.product.version), ('Renamed', 99, 3))
+
+    def test_order_header_edits_check_the_version(self):
+        """Order headers are edited with the same check; lines and status can't be changed by an edit."""
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status=PurchaseOrder.Status.DRAFT)
+        other = Supplier.objects.create(name="Other Supplier", email="other@test.com")
+        url = f'/api/purchase-orders/{po.id}/'
+
+        self.manager_client.post('/api/purchase-orders/transition/', {"status": "Pending", "ids": [po.id]}, format='json')
+        response = self.manager_client.patch(url, {"supplier": other.id}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        response = self.manager_client.patch(url, {"supplier": other.id, "status": "Draft"}, format='json',
+                                             HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        po.refresh_from_db()
+        self.assertEqual((po.supplier, po.status, po.version), (other, PurchaseOrder.Status.PENDING, 3))
+
+        line = {"product": self.product.id, "quantity": 1, "unit_price": "5.00"}
+        response = self.manager_client.patch(url, {"items": [line]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ============================================================================
+    #  SLOW-QUERY LOG TESTS
+    # ============================================================================
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_with_their_origin_and_plan(self):
+        """Queries over the threshold are grouped by fingerprint, attributed and explained; admins can read them."""
+        self.addCleanup(slow_query_log.clear)
+        slow_query_log.clear()
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND sku = 'X-1' LIMIT 21"),
+                         "SELECT * FROM t WHERE id IN (...) AND sku = ? LIMIT ?")
+
+        self.staff_client.get('/api/products/')
+        self.staff_client.get('/api/products/')
+        entry = next(e for e in slow_query_log.top() if 'FROM "inventory_product"' in e['fingerprint'])
+        self.assertEqual(entry['count'], 2)
+        self.assertEqual(entry['views'], {'ProductViewSet.list': 2})
+        self.assertTrue(entry['explain'])
+
+        self.assertEqual(self.manager_client.get('/api/slow-queries/').status_code, status.HTTP_403_FORBIDDEN)
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=self.admin_user)
+        with override_settings(SLOW_QUERY_MS=None):
+            response = admin_client.get('/api/slow-queries/?limit=1')
+        self.assertEqual(len(response.data), 1)
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=2)
+    def test_slow_query_log_is_bounded_and_command_reports_it(self):
+        """The log keeps only the costliest fingerprints; the command prints what the endpoints ran."""
+        self.addCleanup(slow_query_log.clear)
+        slow_query_log.clear()
+        for i, ms in enumerate([5, 50, 20, 1]):
+            slow_query_log.record(f'SELECT {i} FROM table_{"abcd"[i]}', ms, {}, lambda: None)
+        self.assertEqual([e['total_ms'] for e in slow_query_log.top()], [50, 20])
+
+        out = io.StringIO()
+        call_command('slow_queries', '/api/products/', user='teststaff', stdout=out)
+        self.assertIn('ProductViewSet.list', out.getvalue())
+
+    # ============================================================================
+    #  CATEGORY TREE TESTS
+    # ============================================================================
+    def test_category_rollups_follow_edits_and_stock_movements(self):
+        """Subtree rollups track product edits and sales; the product list filters by subtree."""
+        cable = Product.objects.create(name="Cable", sku="CAB-001", category=resolve("Electronics > Cables"),
+                                       stock_quantity=10, unit_price=2)
+        response = self.manager_client.patch(f'/api/products/{self.product.id}/', {"category": "Electronics"},
+                                             format='json')
+        self.assertEqual(response.data['category'], "Electronics")
+        electronics, cables = resolve("Electronics"), cable.category
+
+        apply_movements([Movement(cable.id, Location.get_default().id, -4)], 'Sale')
+        electronics.refresh_from_db()
+        cables.refresh_from_db()
+        self.assertEqual((electronics.product_count, electronics.stock_quantity, electronics.stock_value),
+                         (2, 106, Decimal('5012.00')))
+        self.assertEqual((cables.product_count, cables.stock_quantity), (1, 6))
+
+        listed = self.staff_client.get(f'/api/products/?category={electronics.id}').data
+        self.assertEqual(sorted(row['sku'] for row in listed), ['CAB-001', 'KEY-001'])
+        listed = self.staff_client.get(f'/api/products/?category={cables.id}').data
+        self.assertEqual([row['sku'] for row in listed], ['CAB-001'])
+
+    def test_moving_a_category_rewrites_its_subtree(self):
+        """Moves rewrite descendant paths and names and move the rollups with them."""
+        usb = resolve("Electronics > Cables > USB")
+        Product.objects.create(name="USB-C", sku="USB-001", category=usb, stock_quantity=5, unit_price=3)
+        cables, office = usb.parent, resolve("Office")
+
+        move(cables, parent=office, name="Wiring")
+        usb.refresh_from_db()
+        office.refresh_from_db()
+        self.assertEqual(usb.full_name, "Office > Wiring > USB")
+        self.assertTrue(usb.path.startswith(office.path))
+        self.assertEqual((usb.depth, office.stock_quantity), (2, 5))
+        self.assertEqual(Category.objects.get(name="Electronics").stock_quantity, 0)
+        with self.assertRaises(ValueError):
+            move(office, parent=usb)
+        # Untenanted roots have neither tenant nor parent and must still be unique.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Category.objects.create(name="Office")
+
+    # ============================================================================
+    #  LOT AND EXPIRY TESTS
+    # ============================================================================
+    def test_sales_draw_lots_first_expiry_first_out(self):
+        """Received lines become lots; sales take the soonest-expiring first, cancellations put them back."""
+        today = timezone.localdate()
+        milk = Product.objects.create(name="Milk", sku="MLK-001", unit_price=2)
+        line = {"product": milk.id, "unit_price": "1.00"}
+        self.manager_client.post('/api/purchase-orders/', {"supplier": self.supplier.id, "status": "Pending", "items": [
+            {**line, "quantity": 5, "lot_number": "LATE", "expiry_date": today + timedelta(days=60)},
+            {**line, "quantity": 3, "lot_number": "SOON"},
+            {**line, "quantity": 4, "lot_number": "NEVER"},
+        ]}, format='json')
+        po = PurchaseOrder.objects.latest('pk')
+        soon = po.items.get(lot_number="SOON")
+        response = self.manager_client.post(f'/api/purchase-orders/{po.id}/receive/', {"lots": [
+            {"item": soon.id, "expiry_date": today + timedelta(days=5)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        so_data = {"customer_name": "Cafe", "items": [{"product": milk.id, "quantity": 6, "unit_price": "2.00"}]}
+        with CaptureQueriesContext(connection) as queries:
+            self.staff_client.post('/api/sales-orders/', so_data, format='json')
+        self.assertEqual(len([q for q in queries if 'FROM "inventory_lot"' in q['sql']]), 1)
+        remaining = dict(Lot.objects.values_list('lot_number', 'remaining'))
+        self.assertEqual(remaining, {"SOON": 0, "LATE": 2, "NEVER": 4})
+
+        report = self.manager_client.get('/api/reports/expiring-lots/?days=90').data['results']
+        self.assertEqual([row['lot_number'] for row in report], ["LATE"])
+
+        so = SalesOrder.objects.latest('pk')
+        self.staff_client.post('/api/sales-orders/transition/', {"status": "Cancelled", "ids": [so.id]}, format='json')
+        self.assertEqual(dict(Lot.objects.values_list('lot_number', 'remaining')), {"SOON": 3, "LATE": 5, "NEVER": 4})
+
+    def test_negative_adjustments_draw_lots_down_first_expiry_first_out(self):
+        """Stock written off by a count or a stock edit leaves the lots too, soonest expiry first."""
+        today = timezone.localdate()
+        milk = Product.objects.create(name="Milk", sku="MLK-002", unit_price=2)
+        po = PurchaseOrder.objects.create(supplier=self.supplier, status=PurchaseOrder.Status.SHIPPED)
+        for lot_number, days in (("SOON", 5), ("LATE", 60)):
+            PurchaseOrderItem.objects.create(purchase_order=po, product=milk, quantity=5, unit_price=1,
+                                             lot_number=lot_number, expiry_date=today + timedelta(days=days))
+        self.manager_client.post(f'/api/purchase-orders/{po.id}/receive/')
+
+        response = self.manager_client.patch(f'/api/products/{milk.id}/', {'stock_quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(dict(Lot.objects.values_list('lot_number', 'remaining')), {"SOON": 0, "LATE": 3})
+        self.manager_client.patch(f'/api/products/{milk.id}/', {'stock_quantity': 8}, format='json')
+        self.assertEqual(Lot.objects.get(lot_number="LATE").remaining, 3)
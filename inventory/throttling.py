@@ -0,0 +1,151 @@
+"""
+Token-bucket throttles for the inventory API.
+
+Each scope's rate in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` (for
+example ``'10/min'``) sets both the bucket size and its refill speed, so a
+client may burst up to the full rate and is then held to a steady trickle.
+Buckets live in the cache named by ``THROTTLE_CACHE`` so every worker shares
+them; if that cache is unreachable a per-process cache is used instead,
+which keeps limiting each worker rather than failing open or erroring.
+"""
+
+import logging
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .conf import inventory_settings
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_local_cache = LocMemCache('inventory-throttle-fallback', {})
+
+
+def throttle_cache():
+    return caches[inventory_settings.THROTTLE_CACHE]
+
+
+def parse_rate(rate):
+    """``'10/min'`` -> ``(10, 60)``: the bucket capacity and the seconds it takes to refill."""
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+# ============================================================================
+#  TOKEN BUCKET
+# ============================================================================
+class TokenBucketThrottle(BaseThrottle):
+    """Allows ``capacity`` requests at once, refilled evenly over the rate's period."""
+    scope = None
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def get_cache_key(self, request, view):
+        """The bucket key for this request, or None to let it through unthrottled."""
+        raise NotImplementedError
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        rate = self.get_rate()
+        key = self.get_cache_key(request, view)
+        if rate is None or key is None:
+            return True
+        capacity, period = parse_rate(rate)
+        refill = capacity / period
+
+        now = time.time()
+        tokens, stamp = self._get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - stamp) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) / refill
+        self._set(key, (tokens, now), period)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+    def _get(self, key):
+        try:
+            return throttle_cache().get(key)
+        except Exception:
+            logger.warning("Throttle cache unavailable, using the local fallback.", exc_info=True)
+            return _local_cache.get(key)
+
+    def _set(self, key, value, timeout):
+        try:
+            throttle_cache().set(key, value, timeout)
+        except Exception:
+            _local_cache.set(key, value, timeout)
+
+    def key_for(self, ident):
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+# ============================================================================
+#  SCOPES
+# ============================================================================
+class UserThrottle(TokenBucketThrottle):
+    """Per-user bucket for authenticated requests."""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.key_for(request.user.pk)
+
+
+class AnonThrottle(TokenBucketThrottle):
+    """Per-IP bucket for unauthenticated requests."""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.key_for(self.get_ident(request))
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Per-user (or per-IP) bucket shared by every unsafe request."""
+    scope = 'write'
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user and request.user.is_authenticated:
+            return self.key_for(f'user-{request.user.pk}')
+        return self.key_for(f'ip-{self.get_ident(request)}')
+
+
+class BulkWriteThrottle(WriteThrottle):
+    """Tighter bucket for endpoints that write many rows per request."""
+    scope = 'bulk_write'
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Per-IP bucket for endpoints that run before anyone is authenticated."""
+
+    def get_cache_key(self, request, view):
+        return self.key_for(self.get_ident(request))
+
+
+class LoginThrottle(IPThrottle):
+    scope = 'login'
+
+
+class RegisterThrottle(IPThrottle):
+    scope = 'register'
+
+
+class PasswordResetThrottle(IPThrottle):
+    scope = 'password_reset'
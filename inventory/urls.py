@@ -1,9 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AuditLogViewSet
+from .views import AuditLogViewSet, ArchivedInventoryTransactionViewSet, ArchivedAuditLogViewSet, JobViewSet
 
 from .views import (
     DashboardStatsView,
+    ReorderPointView,
+    ValuationReportView,
+    ValuationPeriodListView,
+    ReportIndexView,
+    ReportView,
+    SlowQueryView,
+    StockTransferView,
+    StockAdjustmentBatchView,
+    CategoryViewSet,
+    LocationViewSet,
+    StockLevelViewSet,
     InventoryTransactionViewSet,
     ProductViewSet,
     PurchaseOrderViewSet,
@@ -21,16 +32,30 @@ router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'suppliers', SupplierViewSet, basename='supplier')
 router.register(r'products', ProductViewSet, basename='product')
+router.register(r'categories', CategoryViewSet, basename='category')
+router.register(r'locations', LocationViewSet, basename='location')
+router.register(r'stock-levels', StockLevelViewSet, basename='stocklevel')
 router.register(r'purchase-orders', PurchaseOrderViewSet, basename='purchaseorder')
 router.register(r'sales-orders', SalesOrderViewSet, basename='salesorder')
 router.register(r'transactions', InventoryTransactionViewSet, basename='inventorytransaction')
 router.register(r'audit-logs', AuditLogViewSet, basename='auditlog')
+router.register(r'archive/transactions', ArchivedInventoryTransactionViewSet, basename='archivedtransaction')
+router.register(r'archive/audit-logs', ArchivedAuditLogViewSet, basename='archivedauditlog')
+router.register(r'jobs', JobViewSet, basename='job')
 
 # ============================================================================
 #  URL PATTERNS
 # ============================================================================
 urlpatterns = [
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('reorder-points/', ReorderPointView.as_view(), name='reorder-points'),
+    path('valuation/', ValuationReportView.as_view(), name='valuation-report'),
+    path('valuation/periods/', ValuationPeriodListView.as_view(), name='valuation-periods'),
+    path('reports/', ReportIndexView.as_view(), name='report-index'),
+    path('reports/<slug:name>/', ReportView.as_view(), name='report'),
+    path('slow-queries/', SlowQueryView.as_view(), name='slow-queries'),
+    path('stock-transfers/', StockTransferView.as_view(), name='stock-transfer'),
+    path('stock-adjustments/batch/', StockAdjustmentBatchView.as_view(), name='stock-adjustment-batch'),
     path('users/me/', UserProfileView.as_view(), name='user-profile'),
     path('change-password/', ChangePasswordView.as_view(), name='change-password'),
     path('', include(router.urls)),
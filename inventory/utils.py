@@ -1,4 +1,6 @@
+from datetime import datetime, time
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from .models import AuditLog
 
 # ============================================================================
@@ -7,9 +9,36 @@ from .models import AuditLog
 def log_activity(user, action, instance):
     """A helper function to create an AuditLog entry."""
     AuditLog.objects.create(
-        user=user,
+        user_id=getattr(user, 'pk', None),
         action=action,
         content_type=ContentType.objects.get_for_model(instance),
         object_id=instance.pk,
         object_repr=str(instance)
-    )
\ No newline at end of file
+    )
+
+
+def log_activity_bulk(user, action, instances):
+    """Creates AuditLog entries for many instances with a single insert."""
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            user_id=getattr(user, 'pk', None),
+            action=action,
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            object_repr=str(instance)
+        )
+        for instance in instances
+    ])
+
+
+# ============================================================================
+#  DATE RANGE HELPERS
+# ============================================================================
+def start_of_day(day):
+    """The first instant of ``day`` in the current timezone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def end_of_day(day):
+    """The last instant of ``day`` in the current timezone."""
+    return timezone.make_aware(datetime.combine(day, time.max))
@@ -0,0 +1,285 @@
+"""
+Inventory valuation for the inventory app.
+
+Replays received purchase lines and non-cancelled sales lines in time order
+and values the stock on hand with FIFO or weighted-average costing. Closing
+a period stores each product's closing cost layers, so later reports only
+replay the movements made after the last closed period.
+
+Money is handled internally as integer cents to keep the layer queues
+compact and the arithmetic exact.
+"""
+
+import heapq
+from array import array
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from .models import (
+    PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem,
+    ValuationPeriod, ProductValuation,
+)
+from .tenancy import scoped
+
+CHUNK_SIZE = 5_000
+PURCHASE, SALE = 0, 1
+
+
+def _to_cents(amount):
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _from_cents(cents):
+    return Decimal(cents) / 100
+
+
+# ============================================================================
+#  COST BOOKS
+# ============================================================================
+class FifoLayers:
+    """A FIFO queue of cost layers stored in two parallel integer arrays."""
+    __slots__ = ('quantities', 'costs', 'head', 'quantity', 'value')
+
+    def __init__(self, layers=()):
+        self.quantities = array('q')
+        self.costs = array('q')
+        self.head = 0
+        self.quantity = 0
+        self.value = 0
+        for quantity, cost in layers:
+            self.push(quantity, cost)
+
+    def push(self, quantity, cost):
+        self.quantities.append(quantity)
+        self.costs.append(cost)
+        self.quantity += quantity
+        self.value += quantity * cost
+
+    def consume(self, quantity):
+        """Removes up to ``quantity`` units oldest-first; returns ``(cost, shortfall)``."""
+        cost = 0
+        while quantity and self.head < len(self.quantities):
+            available = self.quantities[self.head]
+            taken = min(available, quantity)
+            cost += taken * self.costs[self.head]
+            quantity -= taken
+            if taken == available:
+                self.head += 1
+            else:
+                self.quantities[self.head] = available - taken
+            self.quantity -= taken
+        self.value -= cost
+        # Drop consumed layers once they make up most of the arrays.
+        if self.head > 64 and self.head * 2 > len(self.quantities):
+            del self.quantities[:self.head]
+            del self.costs[:self.head]
+            self.head = 0
+        return cost, quantity
+
+    def layers(self):
+        return [[q, c] for q, c in zip(self.quantities[self.head:], self.costs[self.head:])]
+
+
+class AverageCost:
+    """A running weighted-average cost book."""
+    __slots__ = ('quantity', 'value')
+
+    def __init__(self, quantity=0, value=0):
+        self.quantity = quantity
+        self.value = value
+
+    def push(self, quantity, cost):
+        self.quantity += quantity
+        self.value += quantity * cost
+
+    def consume(self, quantity):
+        """Removes up to ``quantity`` units at the average cost; returns ``(cost, shortfall)``."""
+        taken = min(self.quantity, quantity)
+        if not taken:
+            return 0, quantity
+        cost = (self.value * taken + self.quantity // 2) // self.quantity
+        self.quantity -= taken
+        self.value -= cost
+        return cost, quantity - taken
+
+    def layers(self):
+        return []
+
+
+class ProductPosition:
+    """The running valuation state of one product."""
+    __slots__ = ('book', 'cogs', 'uncosted', 'last_cost')
+
+    def __init__(self, book, last_cost=0):
+        self.book = book
+        self.cogs = 0
+        self.uncosted = 0
+        self.last_cost = last_cost
+
+    def receive(self, quantity, cost):
+        self.book.push(quantity, cost)
+        self.last_cost = cost
+
+    def sell(self, quantity):
+        cost, shortfall = self.book.consume(quantity)
+        # Stock that never came in through a PO is costed at the last known price.
+        self.cogs += cost + shortfall * self.last_cost
+        self.uncosted += shortfall
+
+
+def _new_position(method, line=None):
+    if method == ValuationPeriod.Method.FIFO:
+        book = FifoLayers(line.layers if line else ())
+        last_cost = line.layers[-1][1] if line and line.layers else 0
+    else:
+        book = AverageCost(line.quantity, _to_cents(line.value)) if line else AverageCost()
+        last_cost = book.value // book.quantity if book.quantity else 0
+    return ProductPosition(book, last_cost)
+
+
+# ============================================================================
+#  MOVEMENT STREAM
+# ============================================================================
+def _movements(start, end):
+    """
+    Yields ``(moved_at, kind, product_id, quantity, unit_price)`` in time order.
+
+    Purchases are dated when they were received and sales when they were
+    ordered; purchases sort first on ties so stock is available to sell.
+    """
+    purchases = (
+        scoped(PurchaseOrderItem.objects.all(), 'purchase_order__tenant')
+        .filter(purchase_order__status=PurchaseOrder.Status.RECEIVED)
+        .annotate(moved_at=Coalesce('purchase_order__received_date', 'purchase_order__order_date'))
+        .filter(moved_at__lte=end)
+    )
+    sales = (
+        scoped(SalesOrderItem.objects.all(), 'sales_order__tenant')
+        .exclude(sales_order__status=SalesOrder.Status.CANCELLED)
+        .annotate(moved_at=F('sales_order__order_date'))
+        .filter(moved_at__lte=end)
+    )
+    if start is not None:
+        purchases = purchases.filter(moved_at__gt=start)
+        sales = sales.filter(moved_at__gt=start)
+
+    def stream(queryset, kind):
+        rows = (
+            queryset.order_by('moved_at', 'pk')
+            .values_list('moved_at', 'product_id', 'quantity', 'unit_price')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for moved_at, product_id, quantity, unit_price in rows:
+            yield moved_at, kind, product_id, quantity, unit_price
+
+    return heapq.merge(stream(purchases, PURCHASE), stream(sales, SALE))
+
+
+# ============================================================================
+#  VALUATION ENGINE
+# ============================================================================
+def last_closed_period(method, before=None):
+    """The most recent closed period for ``method``, optionally ending at or before ``before``."""
+    periods = scoped(ValuationPeriod.objects.filter(method=method))
+    if before is not None:
+        periods = periods.filter(period_end__lte=before)
+    return periods.order_by('-period_end').first()
+
+
+def run_valuation(method, as_of, base_period=None):
+    """
+    Values inventory as of ``as_of`` starting from ``base_period``'s closing state.
+
+    Returns a dict mapping product id to its ``ProductPosition``; ``cogs`` and
+    ``uncosted`` only cover movements after the base period.
+    """
+    positions = {}
+    start = None
+    if base_period is not None:
+        start = base_period.period_end
+        for line in base_period.lines.all().iterator(chunk_size=CHUNK_SIZE):
+            positions[line.product_id] = _new_position(method, line)
+
+    for _, kind, product_id, quantity, unit_price in _movements(start, as_of):
+        position = positions.get(product_id)
+        if position is None:
+            position = positions[product_id] = _new_position(method)
+        if kind == PURCHASE:
+            position.receive(quantity, _to_cents(unit_price))
+        else:
+            position.sell(quantity)
+    return positions
+
+
+def _summarize(method, as_of, base_period, positions, include_lines):
+    summary = {
+        'method': method,
+        'as_of': as_of,
+        'since': base_period.period_end if base_period else None,
+        'quantity': sum(p.book.quantity for p in positions.values()),
+        'inventory_value': _from_cents(sum(p.book.value for p in positions.values())),
+        'cogs': _from_cents(sum(p.cogs for p in positions.values())),
+        'uncosted_quantity': sum(p.uncosted for p in positions.values()),
+    }
+    if include_lines:
+        summary['lines'] = [
+            {
+                'product': product_id,
+                'quantity': p.book.quantity,
+                'value': _from_cents(p.book.value),
+                'cogs': _from_cents(p.cogs),
+                'uncosted_quantity': p.uncosted,
+            }
+            for product_id, p in sorted(positions.items())
+        ]
+    return summary
+
+
+def valuation_report(as_of, method=ValuationPeriod.Method.FIFO, include_lines=False):
+    """On-hand value and COGS since the last closed period, without persisting anything."""
+    base_period = last_closed_period(method, before=as_of)
+    positions = run_valuation(method, as_of, base_period)
+    return _summarize(method, as_of, base_period, positions, include_lines)
+
+
+def close_period(period_end, method=ValuationPeriod.Method.FIFO, user=None):
+    """
+    Closes a valuation period ending at ``period_end`` and persists its results.
+
+    Periods must be closed in order: ``period_end`` has to be later than the
+    last closed period for the same method.
+    """
+    base_period = last_closed_period(method)
+    if base_period is not None and base_period.period_end >= period_end:
+        raise ValueError(f"Periods up to {base_period.period_end:%Y-%m-%d} are already closed.")
+    positions = run_valuation(method, period_end, base_period)
+
+    with transaction.atomic():
+        period = ValuationPeriod.objects.create(
+            method=method,
+            period_end=period_end,
+            closed_by=user,
+            quantity=sum(p.book.quantity for p in positions.values()),
+            inventory_value=_from_cents(sum(p.book.value for p in positions.values())),
+            cogs=_from_cents(sum(p.cogs for p in positions.values())),
+        )
+        ProductValuation.objects.bulk_create(
+            (
+                ProductValuation(
+                    period=period,
+                    product_id=product_id,
+                    quantity=p.book.quantity,
+                    value=_from_cents(p.book.value),
+                    cogs=_from_cents(p.cogs),
+                    uncosted_quantity=p.uncosted,
+                    layers=p.book.layers(),
+                )
+                for product_id, p in positions.items()
+                if p.book.quantity or p.cogs or p.uncosted
+            ),
+            batch_size=CHUNK_SIZE,
+        )
+    return period
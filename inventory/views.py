@@ -4,23 +4,50 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db import transaction, models
+from django.db import transaction, models, IntegrityError
 from django.http import HttpResponse, Http404
+from django.urls import reverse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from django.dispatch import receiver
 from django_rest_passwordreset.signals import reset_password_token_created
-from .utils import log_activity
+from .utils import log_activity, end_of_day
+from .analytics import compute_reorder_points
+from .categories import ancestor_ids, move, refresh_category_totals
+from .replenishment import generate_purchase_orders
+from .valuation import valuation_report, close_period
+from .reports import REPORTS, run_report
+from .conf import inventory_settings
+from .idempotency import idempotent
+from .concurrency import OptimisticConcurrencyMixin
+from .querylog import slow_query_log
+from .renderers import ColumnarRenderingMixin
+from .tenancy import TenantScopedMixin, is_scoped, scoped
+from .jobs import enqueue
+from .workflow import can_transition, transition_orders
+from .throttling import UserThrottle, BulkWriteThrottle, LoginThrottle, RegisterThrottle
+from .stock import Movement, InsufficientStock, apply_movements, transfer_stock, reconcile_counts
 from .models import AuditLog
 
-from .models import User, Supplier, Product, PurchaseOrder, SalesOrder, InventoryTransaction
-from .permissions import IsAdminOrManager, IsStaffReadOnly
+from .models import (
+    User, Supplier, Product, PurchaseOrder, PurchaseOrderItem, SalesOrder, InventoryTransaction, ValuationPeriod,
+    Location, StockLevel, ScanBatch, ArchivedInventoryTransaction, ArchivedAuditLog, Job, Category
+)
+from .permissions import IsAdmin, IsAdminOrManager, IsStaffReadOnly
 from .serializers import (
     UserSerializer, SupplierSerializer, ProductSerializer, RegisterSerializer,
     PurchaseOrderSerializer, PurchaseOrderWriteSerializer,
     SalesOrderSerializer, SalesOrderWriteSerializer, InventoryTransactionSerializer,
-    MyTokenObtainPairSerializer, UserProfileSerializer, ChangePasswordSerializer
+    PurchaseOrderSummarySerializer, SalesOrderSummarySerializer,
+    MyTokenObtainPairSerializer, UserProfileSerializer, ChangePasswordSerializer,
+    ReorderPointRunSerializer, AutoReplenishSerializer, ValuationPeriodSerializer, ValuationReportQuerySerializer,
+    ClosePeriodSerializer, ReportQuerySerializer, LocationSerializer, StockLevelSerializer,
+    ReceivePurchaseOrderSerializer, StockTransferSerializer, ScanBatchSerializer,
+    ArchivedInventoryTransactionSerializer, ArchivedAuditLogSerializer, OrderTransitionSerializer, JobSerializer,
+    CategorySerializer,
 )
 
 # ============================================================================
@@ -28,11 +55,13 @@ from .serializers import (
 # ============================================================================
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    throttle_classes = [LoginThrottle]
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
+    throttle_classes = [RegisterThrottle]
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     queryset = User.objects.all()
@@ -56,9 +85,10 @@ class ChangePasswordView(APIView):
 class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
-        total_products = Product.objects.count()
-        low_stock_items = Product.objects.filter(stock_quantity__lte=models.F('min_stock_level'))
-        recent_transactions = InventoryTransaction.objects.order_by('-timestamp')[:5]
+        products = scoped(Product.objects.all())
+        total_products = products.count()
+        low_stock_items = products.filter(stock_quantity__lte=models.F('min_stock_level')).select_related('category')
+        recent_transactions = scoped(InventoryTransaction.objects.all())[:5]
         data = {
             'total_products': total_products,
             'low_stock_items': ProductSerializer(low_stock_items, many=True).data,
@@ -66,15 +96,147 @@ class DashboardStatsView(APIView):
         }
         return Response(data)
 
+class ReorderPointView(APIView):
+    """Recomputes suggested reorder points for all active products."""
+    permission_classes = [IsAdminOrManager]
+    throttle_classes = [UserThrottle, BulkWriteThrottle]
+    def post(self, request, *args, **kwargs):
+        serializer = ReorderPointRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        summary = compute_reorder_points(**serializer.validated_data)
+        return Response(summary, status=status.HTTP_200_OK)
+
+class ValuationReportView(APIView):
+    """On-hand inventory value and COGS since the last closed period."""
+    permission_classes = [IsAdminOrManager]
+    def get(self, request, *args, **kwargs):
+        query = ValuationReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        as_of_day = query.validated_data.get('as_of')
+        as_of = end_of_day(as_of_day) if as_of_day else timezone.now()
+        report = valuation_report(as_of, query.validated_data['method'], include_lines=query.validated_data['lines'])
+        return Response(report)
+
+class ValuationPeriodListView(TenantScopedMixin, generics.ListCreateAPIView):
+    """Lists closed valuation periods and closes new ones."""
+    queryset = ValuationPeriod.objects.select_related('closed_by')
+    serializer_class = ValuationPeriodSerializer
+    permission_classes = [IsAdminOrManager]
+    def create(self, request, *args, **kwargs):
+        serializer = ClosePeriodSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            period = close_period(
+                end_of_day(serializer.validated_data['period_end']),
+                serializer.validated_data['method'],
+                user=request.user,
+            )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ValuationPeriodSerializer(period).data, status=status.HTTP_201_CREATED)
+
+class ReportIndexView(APIView):
+    """Lists the available reports."""
+    permission_classes = [IsAdminOrManager]
+    def get(self, request, *args, **kwargs):
+        return Response({name: request.build_absolute_uri(f'{name}/') for name in REPORTS})
+
+class ReportView(APIView):
+    """Runs one sales or purchasing report with optional date filters."""
+    permission_classes = [IsAdminOrManager]
+    def get(self, request, name, *args, **kwargs):
+        if name not in REPORTS:
+            raise Http404
+        query = ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response({'report': name, 'results': run_report(name, **query.validated_data)})
+
+class SlowQueryView(APIView):
+    """The slowest queries this server process has seen, with their plans; DELETE clears the log."""
+    permission_classes = [IsAdmin]
+    def get(self, request, *args, **kwargs):
+        limit = request.query_params.get('limit')
+        return Response(slow_query_log.top(int(limit) if limit and limit.isdigit() else None))
+    def delete(self, request, *args, **kwargs):
+        slow_query_log.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class StockTransferView(APIView):
+    """Moves stock of one or more products between two locations."""
+    permission_classes = [IsAdminOrManager]
+    throttle_classes = [UserThrottle, BulkWriteThrottle]
+    def post(self, request, *args, **kwargs):
+        serializer = StockTransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            with transaction.atomic():
+                transactions = transfer_stock(
+                    [(line['product'].pk, line['quantity']) for line in data['items']],
+                    data['source'].pk,
+                    data['destination'].pk,
+                    user=request.user,
+                    reason=data.get('reason') or f"Transfer {data['source'].code} -> {data['destination'].code}",
+                )
+        except InsufficientStock as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'transactions': len(transactions)}, status=status.HTTP_201_CREATED)
+
+class StockAdjustmentBatchView(APIView):
+    """
+    Applies a batch of cycle-count scans as ADJUSTMENT transactions.
+    Re-posting a batch id returns the original result without applying it again.
+    """
+    permission_classes = [IsAdminOrManager]
+    throttle_classes = [UserThrottle, BulkWriteThrottle]
+    def post(self, request, *args, **kwargs):
+        serializer = ScanBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        batch_id = data['batch_id']
+        batches = ScanBatch.objects.filter(user=request.user, batch_id=batch_id)
+        existing = batches.first()
+        if existing:
+            return Response(existing.result, status=status.HTTP_200_OK)
+
+        location = data.get('location') or Location.get_default()
+        # A SKU scanned more than once keeps its last count.
+        counts_by_sku = {scan['sku']: scan['counted_qty'] for scan in data['scans']}
+        # in_bulk(field_name='sku') wants a unique field; SKUs are only unique within a tenant.
+        products = {product.sku: product for product in scoped(Product.objects.filter(sku__in=counts_by_sku))}
+        try:
+            with transaction.atomic():
+                batch = ScanBatch.objects.create(batch_id=batch_id, user=request.user, location=location)
+                transactions = reconcile_counts(
+                    {products[sku].pk: counted for sku, counted in counts_by_sku.items() if sku in products},
+                    location.pk,
+                    user=request.user,
+                    reason=f'Cycle count {batch_id}',
+                )
+                batch.result = {
+                    'batch_id': batch_id,
+                    'location': location.pk,
+                    'scans': len(data['scans']),
+                    'products': len(counts_by_sku),
+                    'adjusted': len(transactions),
+                    'net_change': sum(t.quantity_change for t in transactions),
+                    'unknown_skus': sorted(sku for sku in counts_by_sku if sku not in products),
+                }
+                batch.save(update_fields=['result'])
+        except IntegrityError:
+            # A concurrent request with the same batch id committed first.
+            return Response(batches.get().result, status=status.HTTP_200_OK)
+        return Response(batch.result, status=status.HTTP_201_CREATED)
+
 # ============================================================================
 #  CORE MODEL VIEWSETS
 # ============================================================================
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
     permission_classes = [IsStaffReadOnly]
@@ -91,58 +253,196 @@ class SupplierViewSet(viewsets.ModelViewSet):
         log_activity(self.request.user, AuditLog.Action.DELETED, instance)
         instance.delete()
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.filter(is_active=True)
+class LocationViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    queryset = Location.objects.all()
+    serializer_class = LocationSerializer
+    permission_classes = [IsStaffReadOnly]
+    ordering = ['code']
+    search_fields = ['name', 'code']
+
+class StockLevelViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = StockLevel.objects.all()
+    serializer_class = StockLevelSerializer
+    tenant_field = 'product__tenant'
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['product', 'location']
+    ordering = ['product', 'location']
+
+class CategoryViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    """The category tree in path order, with stock rollups per subtree."""
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    permission_classes = [IsStaffReadOnly]
+    ordering = ['path']
+    search_fields = ['full_name']
+    filterset_fields = ['parent', 'depth']
+    def perform_update(self, serializer):
+        category = serializer.instance
+        try:
+            move(category, serializer.validated_data.get('parent', category.parent),
+                 serializer.validated_data.get('name'))
+        except ValueError as exc:
+            raise ValidationError({'parent': str(exc)})
+    def perform_destroy(self, instance):
+        if instance.children.exists():
+            raise ValidationError({'detail': 'Move or delete the sub-categories first.'})
+        ancestors = ancestor_ids(instance.path)[:-1]
+        instance.delete()
+        refresh_category_totals(ancestors)
+
+class ProductViewSet(TenantScopedMixin, OptimisticConcurrencyMixin, ColumnarRenderingMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.select_related('category')
     serializer_class = ProductSerializer
     permission_classes = [IsStaffReadOnly]
-    ordering_fields = ['id', 'name', 'stock_quantity']
+    ordering_fields = ['id', 'name', 'stock_quantity', 'sales_velocity_7d', 'sales_velocity_30d', 'days_of_cover']
     ordering = ['-id']
-    def get_queryset(self):
-        print("--- Custom get_queryset in ProductViewSet is RUNNING! ---")
-        qs = super().get_queryset()
-        print(f"The filter is finding {qs.count()} active products.")
-        return qs
+    # "Runs out this week" is ?days_of_cover__lte=7&ordering=days_of_cover, a range scan on product_cover_idx.
+    filterset_fields = {
+        'days_of_cover': ['lte', 'gte', 'isnull'],
+        'sales_velocity_7d': ['gte', 'lte'],
+        'sales_velocity_30d': ['gte', 'lte'],
+    }
+    def filter_queryset(self, queryset):
+        # ?category=<id> lists the whole subtree: a range scan on the category path index.
+        queryset = super().filter_queryset(queryset)
+        category = self.request.query_params.get('category')
+        if category:
+            nodes = scoped(Category.objects.filter(pk=category if category.isdigit() else 0))
+            path = nodes.values_list('path', flat=True).first()
+            queryset = queryset.filter(category__path__startswith=path) if path else queryset.none()
+        return queryset
+    def perform_destroy(self, instance):
+        # Products are soft-deleted so their orders and ledger entries stay intact.
+        instance.deactivate()
+        log_activity(self.request.user, AuditLog.Action.DELETED, instance)
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Stock edits are booked as an adjustment at the default location so the ledger stays complete.
+        new_quantity = serializer.validated_data.pop('stock_quantity', None)
+        instance = super().perform_update(serializer)
+        if new_quantity is not None and new_quantity != instance.stock_quantity:
+            try:
+                apply_movements(
+                    [Movement(instance.pk, Location.get_default().pk, new_quantity - instance.stock_quantity)],
+                    InventoryTransaction.TransactionType.ADJUSTMENT,
+                    user=self.request.user,
+                    reason='Manual stock edit',
+                )
+            except InsufficientStock as exc:
+                raise ValidationError({'stock_quantity': str(exc)})
+            instance.refresh_from_db(fields=['stock_quantity', 'version'])
+
+def expands_items(view):
+    """Whether a list request asked for full order lines with ``?expand=items``."""
+    return 'items' in view.request.query_params.get('expand', '').split(',')
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
-    queryset = PurchaseOrder.objects.all().prefetch_related('items__product', 'supplier')
+def job_accepted(job):
+    """The 202 response for an action handed to a background job."""
+    url = reverse('job-detail', args=[job.pk])
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers={'Location': url})
+
+def bulk_transition(request, model):
+    """Moves the selected orders to a new status; orders that can't make the move are reported as skipped."""
+    serializer = OrderTransitionSerializer(data=request.data, context={'model': model})
+    serializer.is_valid(raise_exception=True)
+    options = serializer.validated_data
+    target = options.pop('status')
+    if options.pop('background'):
+        location = options.pop('location', None)
+        return job_accepted(enqueue(
+            'order_transition', user=request.user, status=target,
+            model='purchase' if model is PurchaseOrder else 'sales', location=location and location.pk, **options,
+        ))
+    return Response(transition_orders(model, target, user=request.user, **options))
+
+class PurchaseOrderViewSet(TenantScopedMixin, OptimisticConcurrencyMixin, viewsets.ModelViewSet):
+    queryset = PurchaseOrder.objects.all().select_related('supplier')
     permission_classes = [IsStaffReadOnly]
+    def get_queryset(self):
+        # Lists show the stored header totals; lines are only loaded when they are returned.
+        # Receive re-reads the order for its response, so it doesn't need them up front either.
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'receive') or expands_items(self):
+            queryset = queryset.prefetch_related('items__product__category')
+        return queryset
     def get_serializer_class(self):
-        if self.action in ['create', 'update']:
+        if self.action in ['create', 'update', 'partial_update']:
             return PurchaseOrderWriteSerializer
+        if self.action == 'list' and not expands_items(self):
+            return PurchaseOrderSummarySerializer
         return PurchaseOrderSerializer
     @action(detail=True, methods=['post'])
+    @idempotent
     @transaction.atomic
     def receive(self, request, pk=None):
         purchase_order = self.get_object()
         if purchase_order.status == PurchaseOrder.Status.RECEIVED:
             return Response({'error': 'This order has already been received.'}, status=status.HTTP_400_BAD_REQUEST)
-        for item in purchase_order.items.all():
-            product = item.product
-            product.stock_quantity += item.quantity
-            product.save()
-            InventoryTransaction.objects.create(
-                product=product,
-                transaction_type=InventoryTransaction.TransactionType.PURCHASE,
-                quantity_change=item.quantity,
-                user=request.user,
-                reason=f'Received from PO-{purchase_order.id}'
-            )
-        purchase_order.status = PurchaseOrder.Status.RECEIVED
-        purchase_order.save()
-        return Response(self.get_serializer(purchase_order).data)
+        if not can_transition(PurchaseOrder, purchase_order.status, PurchaseOrder.Status.RECEIVED):
+            return Response({'error': f'A {purchase_order.status.lower()} order cannot be received.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = ReceivePurchaseOrderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        location = serializer.validated_data.get('location')
+        received_lots = {lot.pop('item'): lot for lot in serializer.validated_data.get('lots', [])}
+        if received_lots:
+            lines = list(purchase_order.items.filter(pk__in=received_lots))
+            if len(lines) != len(received_lots):
+                return Response({'error': 'Lots must name lines of this order.'}, status=status.HTTP_400_BAD_REQUEST)
+            for line in lines:
+                for field, value in received_lots[line.pk].items():
+                    setattr(line, field, value)
+            PurchaseOrderItem.objects.bulk_update(lines, ['lot_number', 'expiry_date'])
+        if purchase_order.line_count > inventory_settings.JOB_INLINE_LINE_LIMIT:
+            return job_accepted(enqueue(
+                'order_transition', user=request.user, model='purchase', status=PurchaseOrder.Status.RECEIVED,
+                ids=[purchase_order.pk], location=location and location.pk,
+            ))
+        transition_orders(PurchaseOrder, PurchaseOrder.Status.RECEIVED, ids=[purchase_order.pk], user=request.user,
+                          location=location)
+        # Re-read so the nested products show their new stock.
+        received = self.get_queryset().prefetch_related('items__product__category').get(pk=purchase_order.pk)
+        return Response(self.get_serializer(received).data)
+    @action(detail=False, methods=['post'], url_path='auto-replenish', permission_classes=[IsAdminOrManager],
+            throttle_classes=[UserThrottle, BulkWriteThrottle])
+    def auto_replenish(self, request):
+        options = AutoReplenishSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        commit = options.validated_data['commit']
+        if options.validated_data['background']:
+            return job_accepted(enqueue('auto_replenish', user=request.user, commit=commit))
+        summary = generate_purchase_orders(user=request.user, commit=commit)
+        code = status.HTTP_201_CREATED if summary['purchase_orders'] else status.HTTP_200_OK
+        return Response(summary, status=code)
+    @action(detail=False, methods=['post'], throttle_classes=[UserThrottle, BulkWriteThrottle])
+    def transition(self, request):
+        return bulk_transition(request, PurchaseOrder)
 
-class SalesOrderViewSet(viewsets.ModelViewSet):
-    queryset = SalesOrder.objects.all().prefetch_related('items__product')
+class SalesOrderViewSet(TenantScopedMixin, OptimisticConcurrencyMixin, viewsets.ModelViewSet):
+    queryset = SalesOrder.objects.all()
     permission_classes = [IsAuthenticated]
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list' or expands_items(self):
+            queryset = queryset.prefetch_related('items__product__category')
+        return queryset
     def get_serializer_class(self):
-        if self.action in ['create', 'update']:
+        if self.action in ['create', 'update', 'partial_update']:
             return SalesOrderWriteSerializer
+        if self.action == 'list' and not expands_items(self):
+            return SalesOrderSummarySerializer
         return SalesOrderSerializer
     def get_serializer_context(self):
         return {'request': self.request}
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+    @action(detail=False, methods=['post'], throttle_classes=[UserThrottle, BulkWriteThrottle])
+    def transition(self, request):
+        return bulk_transition(request, SalesOrder)
 
-class InventoryTransactionViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = InventoryTransaction.objects.all()
+class InventoryTransactionViewSet(TenantScopedMixin, ColumnarRenderingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = InventoryTransaction.objects.select_related('product__category', 'user')
     serializer_class = InventoryTransactionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -162,7 +462,50 @@ def password_reset_token_created(sender, instance, reset_password_token, *args,
 # ============================================================================
 #  AUDIT LOG VIEWSET
 # ============================================================================
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all()
     serializer_class = AuditLogSerializer
-    permission_classes = [IsAdminOrManager]
\ No newline at end of file
+    permission_classes = [IsAdminOrManager]
+
+# ============================================================================
+#  ARCHIVE VIEWSETS
+# ============================================================================
+class ArchivedInventoryTransactionViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only access to transactions moved out by the retention policies."""
+    queryset = ArchivedInventoryTransaction.objects.all()
+    serializer_class = ArchivedInventoryTransactionSerializer
+    permission_classes = [IsAdminOrManager]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'timestamp': ['gte', 'lte'], 'transaction_type': ['exact'], 'product_id': ['exact']}
+    def get_queryset(self):
+        # Archived rows keep plain ids, so they follow the tenant of the product they reference.
+        queryset = super().get_queryset()
+        if is_scoped():
+            queryset = queryset.filter(product_id__in=scoped(Product.all_objects.values('pk')))
+        return queryset
+
+class ArchivedAuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """Read-only access to audit logs moved out by the retention policies."""
+    queryset = ArchivedAuditLog.objects.all()
+    serializer_class = ArchivedAuditLogSerializer
+    permission_classes = [IsAdminOrManager]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'timestamp': ['gte', 'lte'], 'action': ['exact'], 'user_id': ['exact']}
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if is_scoped():
+            queryset = queryset.filter(user_id__in=scoped(User.objects.values('pk')))
+        return queryset
+
+class JobViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """Status and progress of background jobs; users see their own, admins and managers see all."""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'status': ['exact'], 'kind': ['exact']}
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.role not in ['Admin', 'Manager']:
+            queryset = queryset.filter(created_by_id=self.request.user.pk)
+        return queryset
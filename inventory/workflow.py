@@ -0,0 +1,158 @@
+"""
+Order status workflow for the inventory app.
+
+Each order type has an explicit table of allowed status transitions, and the
+transitions that move stock do so through the stock service:
+
+* Sales orders take their stock when they are created, so cancelling one
+  puts its lines back at the order's location and on the lots they were
+  allocated from; picking and fulfilling only change the status.
+* Purchase orders add their lines to stock, as lots, when they are
+  received; cancelling one that was never received has no stock effect.
+
+``transition_orders`` moves any number of orders at once. They are handled
+in batches, each in its own transaction: the batch is locked, orders whose
+current status doesn't allow the move are skipped, the stock movements of
+the whole batch go through one ``apply_movements`` call, and the statuses
+change with a single UPDATE.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    AuditLog, InventoryTransaction, Location, PurchaseOrder, PurchaseOrderItem, SalesOrder, SalesOrderItem,
+)
+from .lots import receive_lots, release
+from .stock import Movement, apply_movements
+from .tenancy import scoped
+from .utils import log_activity_bulk
+
+BATCH_SIZE = 500
+
+SALES_TRANSITIONS = {
+    SalesOrder.Status.PENDING: {SalesOrder.Status.PICKED, SalesOrder.Status.FULFILLED, SalesOrder.Status.CANCELLED},
+    SalesOrder.Status.PICKED: {SalesOrder.Status.FULFILLED, SalesOrder.Status.CANCELLED},
+}
+PURCHASE_TRANSITIONS = {
+    PurchaseOrder.Status.DRAFT: {PurchaseOrder.Status.PENDING, PurchaseOrder.Status.CANCELLED},
+    PurchaseOrder.Status.PENDING: {PurchaseOrder.Status.SHIPPED, PurchaseOrder.Status.RECEIVED, PurchaseOrder.Status.CANCELLED},
+    PurchaseOrder.Status.SHIPPED: {PurchaseOrder.Status.RECEIVED, PurchaseOrder.Status.CANCELLED},
+}
+TRANSITIONS = {SalesOrder: SALES_TRANSITIONS, PurchaseOrder: PURCHASE_TRANSITIONS}
+
+# Statuses a new order may start in; the others are only reached by a transition.
+INITIAL_STATUSES = {
+    SalesOrder: [SalesOrder.Status.PENDING, SalesOrder.Status.PICKED, SalesOrder.Status.FULFILLED],
+    PurchaseOrder: [PurchaseOrder.Status.DRAFT, PurchaseOrder.Status.PENDING, PurchaseOrder.Status.SHIPPED],
+}
+
+
+def can_transition(model, current, target):
+    return target in TRANSITIONS[model].get(current, ())
+
+
+def sources_for(model, target):
+    """The statuses an order of ``model`` may move to ``target`` from."""
+    return [current for current, targets in TRANSITIONS[model].items() if target in targets]
+
+
+# ============================================================================
+#  STOCK SIDE EFFECTS
+# ============================================================================
+def _restock_cancelled_sales(orders, location_of):
+    lines = SalesOrderItem.objects.filter(sales_order_id__in=[o.pk for o in orders]).values_list(
+        'sales_order_id', 'product_id', 'quantity')
+    return [
+        Movement(product_id, location_of[order_id], quantity, f'Cancelled SO-{order_id}')
+        for order_id, product_id, quantity in lines
+    ], InventoryTransaction.TransactionType.SALE
+
+
+def _receive_purchases(orders, location_of):
+    lines = PurchaseOrderItem.objects.filter(purchase_order_id__in=[o.pk for o in orders]).values_list(
+        'purchase_order_id', 'product_id', 'quantity')
+    return [
+        Movement(product_id, location_of[order_id], quantity, f'Received from PO-{order_id}')
+        for order_id, product_id, quantity in lines
+    ], InventoryTransaction.TransactionType.PURCHASE
+
+
+# ============================================================================
+#  TRANSITIONS
+# ============================================================================
+def _transition_batch(model, ids, target, user, location):
+    queryset = model.objects.select_for_update(of=('self',)).filter(pk__in=ids).order_by('pk')
+    if model is PurchaseOrder:
+        queryset = queryset.select_related('supplier')
+    orders = [order for order in queryset if can_transition(model, order.status, target)]
+    if not orders:
+        return [], []
+
+    movements, transaction_type = [], None
+    # Bumping the version turns edits based on the old status into conflicts.
+    changes = {'status': target, 'version': F('version') + 1}
+    restock = model is SalesOrder and target == SalesOrder.Status.CANCELLED
+    receive = model is PurchaseOrder and target == PurchaseOrder.Status.RECEIVED
+    if restock or receive:
+        # Stock moves at the given location, else the order's own, else the default one.
+        location_of = {o.pk: location.pk if location else o.location_id or Location.get_default().pk for o in orders}
+        side_effect = _restock_cancelled_sales if restock else _receive_purchases
+        movements, transaction_type = side_effect(orders, location_of)
+    if receive:
+        changes['received_date'] = timezone.now()
+
+    created = apply_movements(movements, transaction_type, user=user) if movements else []
+    if receive:
+        receive_lots([o.pk for o in orders])
+    elif restock:
+        release([o.pk for o in orders])
+    model.objects.filter(pk__in=[o.pk for o in orders]).update(**changes)
+    if receive:
+        relocated = {}
+        for order in orders:
+            if order.location_id != location_of[order.pk]:
+                relocated.setdefault(location_of[order.pk], []).append(order.pk)
+        for location_id, order_ids in relocated.items():
+            model.objects.filter(pk__in=order_ids).update(location_id=location_id)
+    if user is not None:
+        action = AuditLog.Action.RECEIVED if receive else AuditLog.Action.UPDATED
+        log_activity_bulk(user, action, orders)
+    return [o.pk for o in orders], created
+
+
+def transition_orders(model, target, ids=None, from_status=None, user=None, location=None, batch_size=BATCH_SIZE,
+                      progress=None):
+    """
+    Moves orders of ``model`` to status ``target``, applying stock side effects.
+
+    Orders are picked by ``ids``, by ``from_status``, or both. Orders that
+    can't make the transition from their current status are left alone and
+    reported as skipped. ``location`` overrides where stock moves.
+    ``progress(done, total)`` is called after every batch. Returns a summary
+    dict.
+    """
+    queryset = scoped(model.objects.filter(status__in=sources_for(model, target)))
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    if from_status is not None:
+        queryset = queryset.filter(status=from_status)
+    candidates = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    moved, transactions = [], 0
+    for start in range(0, len(candidates), batch_size):
+        with transaction.atomic():
+            done, created = _transition_batch(model, candidates[start:start + batch_size], target, user, location)
+        moved.extend(done)
+        transactions += len(created)
+        if progress is not None:
+            progress(min(start + batch_size, len(candidates)), len(candidates))
+
+    requested = set(ids) if ids is not None else set(candidates)
+    return {
+        'status': target,
+        'transitioned': moved,
+        'skipped': sorted(requested - set(moved)),
+        'transactions': transactions,
+    }
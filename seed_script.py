@@ -10,8 +10,9 @@ django.setup()
 
 from inventory.models import (
     Supplier, Product, PurchaseOrder, PurchaseOrderItem, 
-    SalesOrder, SalesOrderItem, InventoryTransaction
+    SalesOrder, SalesOrderItem, InventoryTransaction, Location
 )
+from inventory.stock import Movement, apply_movements
 
 def seed_data(num_suppliers=15, num_products=50, num_po=20, num_so=35):
     """
@@ -27,7 +28,7 @@ def seed_data(num_suppliers=15, num_products=50, num_po=20, num_so=35):
     InventoryTransaction.objects.all().delete()
     SalesOrder.objects.all().delete()
     PurchaseOrder.objects.all().delete()
-    Product.objects.all().delete()
+    Product.all_objects.all().delete()
     Supplier.objects.all().delete()
     
     # --- Create Suppliers ---
@@ -57,6 +58,8 @@ def seed_data(num_suppliers=15, num_products=50, num_po=20, num_so=35):
         products.append(product)
     print(f"Successfully created {num_products} products.")
 
+    location = Location.get_default()
+
     # --- Create Purchase Orders ---
     for _ in range(num_po):
         supplier = random.choice(suppliers)
@@ -80,14 +83,12 @@ def seed_data(num_suppliers=15, num_products=50, num_po=20, num_so=35):
                 unit_price=product_price * discount
             )
             if po.status == 'Received':
-                product.stock_quantity += quantity
-                product.save()
-                InventoryTransaction.objects.create(
-                    product=product,
-                    transaction_type='Purchase',
-                    quantity_change=quantity,
+                apply_movements(
+                    [Movement(product.pk, location.pk, quantity)],
+                    InventoryTransaction.TransactionType.PURCHASE,
                     reason=f'Stock from PO-{po.id}'
                 )
+                product.refresh_from_db()
     print(f"Successfully created {num_po} purchase orders.")
 
     # --- Create Sales Orders ---
@@ -107,13 +108,11 @@ def seed_data(num_suppliers=15, num_products=50, num_po=20, num_so=35):
                     unit_price=product.unit_price
                 )
                 if so.status == 'Fulfilled':
-                    product.stock_quantity -= quantity_to_sell
-                    product.save()
-                    InventoryTransaction.objects.create(
-                        product=product,
-                        transaction_type='Sale',
-                        quantity_change=-quantity_to_sell,
+                    apply_movements(
+                        [Movement(product.pk, location.pk, -quantity_to_sell)],
+                        InventoryTransaction.TransactionType.SALE,
                     )
+                    product.refresh_from_db()
     print(f"Successfully created {num_so} sales orders and updated stock.")
 
     print("Data seeding complete!")